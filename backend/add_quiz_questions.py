@@ -1,5 +1,6 @@
 from flask import Flask
 from models import db, ModuleContent, QuizQuestion, QuizOption
+from ordering import next_order
 import os
 
 app = Flask(__name__)
@@ -22,29 +23,25 @@ def add_quiz_question(quiz_id):
         print(f"Found quiz: {quiz_content.title}")
         
         # Check if there are already questions
-        existing_questions = list(quiz_content.questions)
-        print(f"Current question count: {len(existing_questions)}")
+        print(f"Current question count: {quiz_content.question_count}")
         
-        # Add a new question
+        # Add a new question after the existing ones. The options are attached
+        # to it, so the whole question goes out in one flush instead of a flush
+        # per row (on PostgreSQL the options are a single batched INSERT)
+        options = [
+            QuizOption(option_text="Reinforcing learning through knowledge recall", is_correct=True),
+            QuizOption(option_text="Earning points for leaderboards", is_correct=False),
+            QuizOption(option_text="Making the course longer", is_correct=False),
+            QuizOption(option_text="Avoiding practical exercises", is_correct=False)
+        ]
         new_question = QuizQuestion(
             content_id=quiz_id,
             question_text="What is the primary benefit of completing quizzes in an LMS?",
             question_type="multiple_choice",
-            order=1
+            order=next_order(QuizQuestion.order, QuizQuestion.content_id, quiz_id),
+            options=options
         )
         db.session.add(new_question)
-        db.session.flush()  # Get the ID for the new question
-        
-        # Add options for the question
-        options = [
-            QuizOption(question_id=new_question.id, option_text="Reinforcing learning through knowledge recall", is_correct=True),
-            QuizOption(question_id=new_question.id, option_text="Earning points for leaderboards", is_correct=False),
-            QuizOption(question_id=new_question.id, option_text="Making the course longer", is_correct=False),
-            QuizOption(question_id=new_question.id, option_text="Avoiding practical exercises", is_correct=False)
-        ]
-        
-        for option in options:
-            db.session.add(option)
             
         db.session.commit()
         
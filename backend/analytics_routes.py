@@ -0,0 +1,545 @@
+from flask import Blueprint, jsonify, request
+import datetime
+from sqlalchemy import func, case
+from models import db, User, Organization, Course, organization_courses, UserSession, PageView, QuizAttempt, ContentInteraction, CourseEnrollment, SystemMetrics, APIUsage
+from principal_cache import resolve_principal
+from db_routing import read_replica
+from module_completion import module_completion_summary, module_completers
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/api/admin/system_stats', methods=['GET'])
+@read_replica
+def get_admin_system_stats():
+    """Get comprehensive system statistics for admin dashboard"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+            
+        # Verify admin role (either superadmin or portal_admin)
+        user = resolve_principal(username)
+        if not user or user.role not in ['admin', 'portal_admin']:
+            return jsonify({'error': 'Unauthorized access'}), 403
+            
+        # Import and use the statistics module
+        from admin_stats import get_system_statistics
+        stats = get_system_statistics(user.id, user.role)
+        
+        return jsonify({
+            'success': True,
+            'data': stats
+        })
+            
+    except Exception as e:
+        print(f"Error getting system stats: {str(e)}")
+        return jsonify({
+            'error': f'Failed to get system statistics: {str(e)}'
+        }), 500
+
+@analytics_bp.route('/api/analytics/overview', methods=['GET'])
+@read_replica
+def get_analytics_overview():
+    """Get comprehensive analytics overview"""
+    try:
+        # User Analytics
+        total_users = User.query.count()
+        active_users_7d = UserSession.query.filter(
+            UserSession.login_time >= datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        ).distinct(UserSession.user_id).count()
+        
+        total_organizations = Organization.query.count()
+        total_courses = Course.query.count()
+        total_course_enrollments = CourseEnrollment.query.count()
+        
+        # Course Analytics
+        completed_courses = CourseEnrollment.query.filter(
+            CourseEnrollment.completed_at.isnot(None)
+        ).count()
+        
+        avg_completion_rate = (completed_courses / total_course_enrollments * 100) if total_course_enrollments > 0 else 0
+        
+        # Recent activity
+        recent_logins = UserSession.query.filter(
+            UserSession.login_time >= datetime.datetime.utcnow() - datetime.timedelta(hours=24)
+        ).count()
+        
+        # Quiz stats
+        total_quiz_attempts = QuizAttempt.query.count()
+        avg_quiz_score = db.session.query(func.avg(QuizAttempt.score)).scalar() or 0
+        
+        return jsonify({
+            'success': True,
+            'overview': {
+                'users': {
+                    'total': total_users,
+                    'active_7d': active_users_7d,
+                    'recent_logins_24h': recent_logins
+                },
+                'organizations': {
+                    'total': total_organizations
+                },
+                'courses': {
+                    'total': total_courses,
+                    'enrollments': total_course_enrollments,
+                    'completed': completed_courses,
+                    'completion_rate': round(avg_completion_rate, 2)
+                },
+                'quizzes': {
+                    'total_attempts': total_quiz_attempts,
+                    'average_score': round(avg_quiz_score, 2)
+                }
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/users', methods=['GET'])
+@read_replica
+def get_user_analytics():
+    """Get detailed user analytics"""
+    try:
+        # User registration trends (last 30 days)
+        thirty_days_ago = datetime.datetime.utcnow() - datetime.timedelta(days=30)
+        
+        registrations = db.session.query(
+            func.date(User.created_at).label('date'),
+            func.count(User.id).label('count')
+        ).filter(
+            User.created_at >= thirty_days_ago
+        ).group_by(func.date(User.created_at)).all()
+        
+        registration_data = [{'date': str(reg.date), 'count': reg.count} for reg in registrations]
+        
+        # User activity by role
+        role_stats = db.session.query(
+            User.role,
+            func.count(User.id).label('count')
+        ).group_by(User.role).all()
+        
+        role_data = [{'role': role.role, 'count': role.count} for role in role_stats]
+        
+        # Top active users (by session count)
+        top_users = db.session.query(
+            User.username,
+            User.email,
+            func.count(UserSession.id).label('session_count')
+        ).join(
+            UserSession, User.id == UserSession.user_id
+        ).group_by(
+            User.id, User.username, User.email
+        ).order_by(
+            func.count(UserSession.id).desc()
+        ).limit(10).all()
+        
+        top_users_data = [{
+            'username': user.username,
+            'email': user.email,
+            'session_count': user.session_count
+        } for user in top_users]
+        
+        # Login patterns by hour
+        login_patterns = db.session.query(
+            func.extract('hour', UserSession.login_time).label('hour'),
+            func.count(UserSession.id).label('count')
+        ).filter(
+            UserSession.login_time >= thirty_days_ago
+        ).group_by(func.extract('hour', UserSession.login_time)).all()
+        
+        login_pattern_data = [{'hour': int(pattern.hour), 'count': pattern.count} for pattern in login_patterns]
+        
+        return jsonify({
+            'success': True,
+            'user_analytics': {
+                'registration_trends': registration_data,
+                'role_distribution': role_data,
+                'top_active_users': top_users_data,
+                'login_patterns': login_pattern_data
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/courses', methods=['GET'])
+@read_replica
+def get_course_analytics():
+    """Get detailed course analytics"""
+    try:
+        # Popular courses by enrollment
+        popular_courses = db.session.query(
+            Course.title,
+            Course.id,
+            func.count(CourseEnrollment.id).label('enrollment_count')
+        ).join(
+            CourseEnrollment, Course.id == CourseEnrollment.course_id
+        ).group_by(
+            Course.id, Course.title
+        ).order_by(
+            func.count(CourseEnrollment.id).desc()
+        ).limit(10).all()
+        
+        popular_courses_data = [{
+            'course_title': course.title,
+            'course_id': course.id,
+            'enrollment_count': course.enrollment_count
+        } for course in popular_courses]
+        
+        # Course completion rates
+        completion_stats = db.session.query(
+            Course.title,
+            Course.id,
+            func.count(CourseEnrollment.id).label('total_enrollments'),
+            func.count(case((CourseEnrollment.completed_at != None, 1))).label('completed_count')
+        ).join(
+            CourseEnrollment, Course.id == CourseEnrollment.course_id
+        ).group_by(
+            Course.id, Course.title
+        ).all()
+        
+        completion_data = []
+        for stat in completion_stats:
+            completion_rate = (stat.completed_count / stat.total_enrollments * 100) if stat.total_enrollments > 0 else 0
+            completion_data.append({
+                'course_title': stat.title,
+                'course_id': stat.id,
+                'total_enrollments': stat.total_enrollments,
+                'completed_count': stat.completed_count,
+                'completion_rate': round(completion_rate, 2)
+            })
+        
+        # Average time spent per course
+        time_stats = db.session.query(
+            Course.title,
+            func.avg(CourseEnrollment.time_spent_minutes).label('avg_time')
+        ).join(
+            CourseEnrollment, Course.id == CourseEnrollment.course_id
+        ).group_by(
+            Course.id, Course.title
+        ).all()
+        
+        time_data = [{
+            'course_title': stat.title,
+            'avg_time_minutes': round(stat.avg_time or 0, 2)
+        } for stat in time_stats]
+        
+        return jsonify({
+            'success': True,
+            'course_analytics': {
+                'popular_courses': popular_courses_data,
+                'completion_rates': completion_data,
+                'time_spent': time_data
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/organizations', methods=['GET'])
+@read_replica
+def get_organization_analytics():
+    """Get organization analytics"""
+    try:
+        # Organization sizes
+        org_sizes = db.session.query(
+            Organization.name,
+            func.count(User.id).label('employee_count')
+        ).join(
+            User, Organization.id == User.org_id
+        ).group_by(
+            Organization.id, Organization.name
+        ).all()
+        
+        org_data = [{
+            'organization': org.name,
+            'employee_count': org.employee_count
+        } for org in org_sizes]
+        
+        # Course assignments by organization
+        org_courses = db.session.query(
+            Organization.name,
+            func.count(organization_courses.c.course_id).label('course_count')
+        ).join(
+            organization_courses, Organization.id == organization_courses.c.organization_id
+        ).group_by(
+            Organization.id, Organization.name
+        ).all()
+        
+        org_course_data = [{
+            'organization': org.name,
+            'course_count': org.course_count
+        } for org in org_courses]
+        
+        return jsonify({
+            'success': True,
+            'organization_analytics': {
+                'organization_sizes': org_data,
+                'course_assignments': org_course_data
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/learning', methods=['GET'])
+@read_replica
+def get_learning_analytics():
+    """Get learning progress analytics"""
+    try:
+        # Quiz performance trends
+        quiz_trends = db.session.query(
+            func.date(QuizAttempt.started_at).label('date'),
+            func.avg(QuizAttempt.score).label('avg_score'),
+            func.count(QuizAttempt.id).label('attempt_count')
+        ).filter(
+            QuizAttempt.started_at >= datetime.datetime.utcnow() - datetime.timedelta(days=30)
+        ).group_by(func.date(QuizAttempt.started_at)).all()
+        
+        quiz_data = [{
+            'date': str(trend.date),
+            'avg_score': round(trend.avg_score or 0, 2),
+            'attempt_count': trend.attempt_count
+        } for trend in quiz_trends]
+        
+        # Content interaction patterns
+        content_interactions = db.session.query(
+            ContentInteraction.interaction_type,
+            func.count(ContentInteraction.id).label('count')
+        ).group_by(ContentInteraction.interaction_type).all()
+        
+        interaction_data = [{
+            'type': interaction.interaction_type,
+            'count': interaction.count
+        } for interaction in content_interactions]
+        
+        # Learning progress by user
+        progress_stats = db.session.query(
+            User.username,
+            func.avg(CourseEnrollment.progress_percentage).label('avg_progress')
+        ).join(
+            CourseEnrollment, User.id == CourseEnrollment.user_id
+        ).group_by(
+            User.id, User.username
+        ).order_by(
+            func.avg(CourseEnrollment.progress_percentage).desc()
+        ).limit(10).all()
+        
+        progress_data = [{
+            'username': stat.username,
+            'avg_progress': round(stat.avg_progress or 0, 2)
+        } for stat in progress_stats]
+        
+        return jsonify({
+            'success': True,
+            'learning_analytics': {
+                'quiz_trends': quiz_data,
+                'content_interactions': interaction_data,
+                'top_learners': progress_data
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/module_completions', methods=['GET'])
+@read_replica
+def get_module_completion_analytics():
+    """Get module completion counts, aggregated in the database
+
+    Optional filters: course_id, module_id, organization_id and days (completed
+    within the last N days). With module_id the most recent completers are listed too.
+    """
+    try:
+        course_id = request.args.get('course_id', type=int)
+        module_id = request.args.get('module_id', type=int)
+        org_id = request.args.get('organization_id', type=int)
+        days = request.args.get('days', type=int)
+        since = datetime.datetime.utcnow() - datetime.timedelta(days=days) if days else None
+        
+        modules = [{
+            'module_id': row.id,
+            'title': row.title,
+            'course_id': row.course_id,
+            'completions': row.completions,
+            'last_completed_at': row.last_completed_at.isoformat() if row.last_completed_at else None
+        } for row in module_completion_summary(course_id, module_id, org_id, since)]
+        
+        result = {'success': True, 'modules': modules}
+        if module_id is not None:
+            result['completers'] = [{
+                'user_id': row.id,
+                'username': row.username,
+                'completed_at': row.completed_at.isoformat()
+            } for row in module_completers(module_id, org_id, since)]
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/system', methods=['GET'])
+@read_replica
+def get_system_analytics():
+    """Get system performance analytics"""
+    try:
+        # Page views in last 7 days
+        seven_days_ago = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        
+        page_views = db.session.query(
+            func.date(PageView.timestamp).label('date'),
+            func.count(PageView.id).label('views')
+        ).filter(
+            PageView.timestamp >= seven_days_ago
+        ).group_by(func.date(PageView.timestamp)).all()
+        
+        page_view_data = [{
+            'date': str(view.date),
+            'views': view.views
+        } for view in page_views]
+        
+        # Most visited pages
+        popular_pages = db.session.query(
+            PageView.page_url,
+            func.count(PageView.id).label('visit_count')
+        ).filter(
+            PageView.timestamp >= seven_days_ago
+        ).group_by(PageView.page_url).order_by(
+            func.count(PageView.id).desc()
+        ).limit(10).all()
+        
+        popular_pages_data = [{
+            'page': page.page_url,
+            'visits': page.visit_count
+        } for page in popular_pages]
+        
+        # API usage statistics
+        api_stats = db.session.query(
+            APIUsage.endpoint,
+            func.count(APIUsage.id).label('request_count'),
+            func.avg(APIUsage.response_time_ms).label('avg_response_time')
+        ).filter(
+            APIUsage.timestamp >= seven_days_ago
+        ).group_by(APIUsage.endpoint).order_by(
+            func.count(APIUsage.id).desc()
+        ).limit(10).all()
+        
+        api_data = [{
+            'endpoint': stat.endpoint,
+            'request_count': stat.request_count,
+            'avg_response_time': round(stat.avg_response_time or 0, 2)
+        } for stat in api_stats]
+        
+        # System metrics
+        recent_metrics = SystemMetrics.query.filter(
+            SystemMetrics.timestamp >= seven_days_ago
+        ).order_by(SystemMetrics.timestamp.desc()).limit(100).all()
+        
+        metrics_data = [{
+            'name': metric.metric_name,
+            'value': metric.metric_value,
+            'unit': metric.metric_unit,
+            'timestamp': metric.timestamp.isoformat()
+        } for metric in recent_metrics]
+        
+        return jsonify({
+            'success': True,
+            'system_analytics': {
+                'page_views': page_view_data,
+                'popular_pages': popular_pages_data,
+                'api_usage': api_data,
+                'system_metrics': metrics_data
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/financial', methods=['GET'])
+@read_replica
+def get_financial_analytics():
+    """Get financial analytics (placeholder for future implementation)"""
+    try:
+        # This would integrate with payment systems
+        # For now, return basic structure
+        return jsonify({
+            'success': True,
+            'financial_analytics': {
+                'revenue': {
+                    'total': 0,
+                    'monthly': [],
+                    'by_organization': []
+                },
+                'subscriptions': {
+                    'active': 0,
+                    'pending': 0,
+                    'cancelled': 0
+                }
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/compliance', methods=['GET'])
+@read_replica
+def get_compliance_analytics():
+    """Get compliance and certification analytics"""
+    try:
+        # Certification completion rates
+        cert_stats = db.session.query(
+            Course.title,
+            func.count(CourseEnrollment.id).label('enrolled'),
+            func.count(case((CourseEnrollment.completed_at != None, 1))).label('certified')
+        ).join(
+            CourseEnrollment, Course.id == CourseEnrollment.course_id
+        ).filter(
+            Course.title.ilike('%certification%') | Course.title.ilike('%compliance%')
+        ).group_by(Course.id, Course.title).all()
+        
+        certification_data = []
+        for stat in cert_stats:
+            completion_rate = (stat.certified / stat.enrolled * 100) if stat.enrolled > 0 else 0
+            certification_data.append({
+                'course': stat.title,
+                'enrolled': stat.enrolled,
+                'certified': stat.certified,
+                'completion_rate': round(completion_rate, 2)
+            })
+        
+        # Upcoming certification expirations (if applicable)
+        # This would need additional fields in the model for expiration dates
+        
+        return jsonify({
+            'success': True,
+            'compliance_analytics': {
+                'certifications': certification_data,
+                'expiring_soon': []  # Placeholder
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/api/analytics/export', methods=['POST'])
+@read_replica
+def export_analytics():
+    """Export analytics data to CSV/Excel"""
+    try:
+        data = request.json
+        export_type = data.get('type', 'overview')
+        format_type = data.get('format', 'csv')
+        
+        # Generate filename
+        timestamp = datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        filename = f"analytics_{export_type}_{timestamp}.{format_type}"
+        
+        # This would generate and return file download
+        # For now, return success message
+        return jsonify({
+            'success': True,
+            'message': f'Analytics export prepared: {filename}',
+            'download_url': f'/api/analytics/download/{filename}'
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
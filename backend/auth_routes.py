@@ -0,0 +1,339 @@
+from flask import Blueprint, jsonify, request
+import datetime
+import jwt
+from models import db, User, Organization
+from principal_cache import resolve_principal, invalidate_principal, principal_cache_stats
+from password_hashing import hash_password, verify_password, needs_rehash, PasswordHashingBusy
+from emails import generate_temp_password, send_password_reset_email
+
+auth_bp = Blueprint('auth', __name__)
+
+# Debug endpoint to test password hashing (remove in production)
+@auth_bp.route('/api/test_password', methods=['POST'])
+def test_password():
+    data = request.get_json()
+    password = data.get('password', 'test123')
+    
+    # Hash the password
+    hashed = hash_password(password)
+    
+    # Verify the password
+    is_valid = verify_password(hashed, password)
+    
+    return jsonify({
+        'original_password': password,
+        'hashed_password': hashed,
+        'verification_result': is_valid
+    })
+
+@auth_bp.route('/api/debug_user_login', methods=['POST'])
+def debug_user_login():
+    try:
+        data = request.get_json()
+        username = data.get('username')
+        password = data.get('password')
+        
+        # Get user from database
+        user = User.query.filter_by(username=username).first()
+        
+        if not user:
+            return jsonify({
+                'found_user': False,
+                'message': 'User not found'
+            }), 404
+        
+        # Check password verification using the correct function
+        password_valid = verify_password(user.password, password)
+        
+        return jsonify({
+            'found_user': True,
+            'username': user.username,
+            'email': user.email,
+            'role': user.role,
+            'stored_password_hash': user.password,
+            'provided_password': password,
+            'password_verification': password_valid
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/api/create_test_user', methods=['POST'])
+def create_test_user():
+    data = request.get_json() or {}
+    username = data.get('username', 'admin')
+    password = data.get('password', 'admin123')
+    role = data.get('role', 'admin')
+    email = data.get('email', f'{username}@example.com')  # Generate default email if not provided
+    designation = data.get('designation')
+    org_id = data.get('org_id')
+    
+    if User.query.filter_by(username=username).first():
+        return jsonify({'success': False, 'message': 'User already exists'}), 400
+    if User.query.filter_by(email=email).first():
+        return jsonify({'success': False, 'message': 'Email already exists'}), 400
+        
+    user = User(username=username, password=hash_password(password), role=role, email=email, designation=designation, org_id=org_id)
+    db.session.add(user)
+    db.session.commit()
+    return jsonify({'success': True, 'message': f'User {username} created', 'role': role})
+
+@auth_bp.route('/api/login', methods=['POST'])
+def login():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    
+    # Find user by username only
+    user = User.query.filter_by(username=username).first()
+    
+    if not user:
+        return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
+    
+    # Verify password using bcrypt (off the request thread, bounded by the hashing pool)
+    try:
+        password_valid = verify_password(user.password, password)
+    except PasswordHashingBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
+    
+    if user and password_valid:
+        # Upgrade hashes stored with an outdated cost factor
+        if needs_rehash(user.password):
+            try:
+                user.password = hash_password(password)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        
+        # Generate JWT token with role
+        payload = {
+            'user_id': user.id,
+            'username': user.username,
+            'role': user.role,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=8)
+        }
+        token = jwt.encode(payload, 'your_secret_key', algorithm='HS256')
+        return jsonify({'success': True, 'message': 'Login successful', 'token': token, 'role': user.role})
+    else:
+        return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
+
+@auth_bp.route('/api/admin/reset_portal_admin_password', methods=['POST'])
+def admin_reset_portal_admin_password():
+    """Admin endpoint to reset portal admin password"""
+    try:
+        data = request.json
+        
+        # Validate required fields
+        if not data.get('portal_admin_username'):
+            return jsonify({'success': False, 'error': 'Portal admin username is required'}), 400
+            
+        portal_admin_username = data['portal_admin_username'].strip()
+        
+        # Find the portal admin user
+        portal_admin = User.query.filter_by(username=portal_admin_username, role='portal_admin').first()
+        if not portal_admin:
+            return jsonify({'success': False, 'error': 'Portal admin not found'}), 404
+            
+        # Get organization info
+        organization = None
+        if portal_admin.org_id:
+            organization = db.session.get(Organization, portal_admin.org_id)
+            
+        org_name = organization.name if organization else "LMS Portal"
+        
+        # Generate new password
+        new_password = generate_temp_password()
+        
+        # Update password in database with proper hashing
+        portal_admin.password = hash_password(new_password)
+        db.session.commit()
+        
+        # Send email notification
+        email_sent, email_message = send_password_reset_email(
+            portal_admin.email,
+            portal_admin.username,
+            org_name,
+            new_password,
+            "Portal Admin Password Reset"
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': f'Portal admin password reset successfully',
+            'email_sent': email_sent,
+            'email_message': email_message,
+            'new_password': new_password  # For testing - remove in production
+        })
+        
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@auth_bp.route('/api/portal_admin/reset_employee_password', methods=['POST'])
+def portal_admin_reset_employee_password():
+    """Portal admin endpoint to reset employee password"""
+    try:
+        data = request.json
+        
+        # Validate required fields
+        if not data.get('employee_username') or not data.get('portal_admin_username'):
+            return jsonify({'success': False, 'error': 'Employee username and portal admin username are required'}), 400
+            
+        employee_username = data['employee_username'].strip()
+        portal_admin_username = data['portal_admin_username'].strip()
+        
+        # Verify portal admin exists and get their organization
+        portal_admin = resolve_principal(portal_admin_username, role='portal_admin')
+        if not portal_admin or not portal_admin.org_id:
+            return jsonify({'success': False, 'error': 'Portal admin not found or not associated with organization'}), 404
+            
+        # Find the employee in the same organization
+        employee = User.query.filter_by(username=employee_username, role='employee', org_id=portal_admin.org_id).first()
+        if not employee:
+            return jsonify({'success': False, 'error': 'Employee not found in your organization'}), 404
+            
+        # Get organization info
+        organization = db.session.get(Organization, portal_admin.org_id)
+        org_name = organization.name if organization else "LMS Portal"
+        
+        # Generate new password
+        new_password = generate_temp_password()
+        
+        # Update password in database with proper hashing
+        employee.password = hash_password(new_password)
+        db.session.commit()
+        
+        # Send email notification
+        email_sent, email_message = send_password_reset_email(
+            employee.email,
+            employee.username,
+            org_name,
+            new_password,
+            "Employee Password Reset"
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': f'Employee password reset successfully',
+            'email_sent': email_sent,
+            'email_message': email_message,
+            'employee_email': employee.email
+        })
+        
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@auth_bp.route('/api/change_password', methods=['POST'])
+def change_password():
+    """Self-service password change for any user"""
+    try:
+        data = request.json
+        
+        # Validate required fields
+        required_fields = ['username', 'current_password', 'new_password']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'success': False, 'error': f'{field} is required'}), 400
+                
+        username = data['username'].strip()
+        current_password = data['current_password']
+        new_password = data['new_password']
+        
+        # Validate new password strength
+        if len(new_password) < 6:
+            return jsonify({'success': False, 'error': 'New password must be at least 6 characters long'}), 400
+            
+        # Find user and verify current password
+        user = User.query.filter_by(username=username).first()
+        if not user or not verify_password(user.password, current_password):
+            return jsonify({'success': False, 'error': 'Invalid username or current password'}), 401
+            
+        # Update password with proper hashing
+        user.password = hash_password(new_password)
+        db.session.commit()
+        invalidate_principal(user.username)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Password changed successfully'
+        })
+        
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@auth_bp.route('/api/portal_admin/reset_my_password', methods=['POST'])
+def portal_admin_reset_my_password():
+    """Portal admin self-service password reset"""
+    try:
+        data = request.json
+        
+        # Validate required fields
+        if not data.get('username'):
+            return jsonify({'success': False, 'error': 'Username is required'}), 400
+            
+        username = data['username'].strip()
+        
+        # Find the portal admin user
+        portal_admin = User.query.filter_by(username=username, role='portal_admin').first()
+        if not portal_admin:
+            return jsonify({'success': False, 'error': 'Portal admin not found'}), 404
+            
+        # Get organization info
+        organization = None
+        if portal_admin.org_id:
+            organization = db.session.get(Organization, portal_admin.org_id)
+            
+        org_name = organization.name if organization else "LMS Portal"
+        
+        # Generate new password
+        new_password = generate_temp_password()
+        
+        # Update password in database with proper hashing
+        portal_admin.password = hash_password(new_password)
+        db.session.commit()
+        
+        # Send email notification
+        email_sent, email_message = send_password_reset_email(
+            portal_admin.email,
+            portal_admin.username,
+            org_name,
+            new_password,
+            "Portal Admin Password Reset"
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': f'Your password has been reset successfully. Check your email for the new password.',
+            'email_sent': email_sent,
+            'email_message': email_message
+        })
+        
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@auth_bp.route('/api/admin/principal_cache_stats', methods=['GET'])
+def get_principal_cache_stats():
+    """Report how many user lookups the principal cache has saved in this worker"""
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Username is required'}), 400
+    
+    user = resolve_principal(username, role='admin')
+    if not user:
+        return jsonify({'error': 'Unauthorized access - Admin role required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'data': principal_cache_stats()
+    })
@@ -0,0 +1,117 @@
+"""
+Benchmark assigning a course to every employee of a large organization:
+the old per-employee ORM loop, set-based per-employee rows, and the derived
+model in course_access.py where the organization row is the assignment.
+
+Builds a throwaway SQLite database with one organization of --employees
+employees who each have --existing courses, as materialized user_courses rows
+(the layout before migration 0003_course_revocations). It then times
+assign-to-all and unassign-from-all each way, and the org sync that cleans the
+now redundant rows.
+
+    python bench_assignments.py --employees 20000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db, User, Organization, Course, user_courses
+from course_access import user_has_course
+from course_assignments import (assign_courses, unassign_courses, add_org_courses, remove_org_courses,
+                                grant_courses, revoke_courses, org_employee_ids, sync_org_courses)
+
+
+def seed(employees, existing):
+    org = Organization(name='Bench Org', portal_admin='bench_admin', org_domain='bench.test',
+                       created=datetime.date.today())
+    db.session.add(org)
+    db.session.flush()
+    courses = [Course(title=f'Course {c}', status='published') for c in range(existing + 1)]
+    db.session.add_all(courses)
+    db.session.flush()
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'bench_{i}', 'password': 'x', 'role': 'employee', 'email': f'bench_{i}@bench.test',
+         'org_id': org.id, 'created_at': datetime.datetime.utcnow()}
+        for i in range(employees)
+    ])
+    add_org_courses(org.id, [course.id for course in courses[:existing]])
+    assign_courses(org_employee_ids(org.id), [course.id for course in courses[:existing]])
+    db.session.commit()
+    return org.id, courses[-1].id
+
+
+def legacy_assign(org_id, course):
+    assigned = 0
+    for employee in User.query.filter_by(org_id=org_id, role='employee').all():
+        if course not in employee.courses:
+            employee.courses.append(course)
+            assigned += 1
+    return assigned
+
+
+def legacy_unassign(org_id, course):
+    removed = 0
+    for employee in User.query.filter_by(org_id=org_id, role='employee').all():
+        if course in employee.courses:
+            employee.courses.remove(course)
+            removed += 1
+    return removed
+
+
+def rows_synced(org_id, course_ids):
+    result = sync_org_courses(org_id, course_ids)
+    return result['rows_inserted'] + result['rows_deleted']
+
+
+def timed(label, action):
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    rows = action()
+    db.session.commit()
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', count)
+    db.session.expunge_all()
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms  {statements[0]:>7} statements  {rows} rows")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Course assignment benchmark')
+    parser.add_argument('--employees', type=int, default=20000)
+    parser.add_argument('--existing', type=int, default=5, help='courses each employee already has')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            org_id, course_id = seed(args.employees, args.existing)
+            print(f"{args.employees} employees x {args.existing} existing courses")
+
+            timed('legacy loop: assign', lambda: legacy_assign(org_id, db.session.get(Course, course_id)))
+            timed('legacy loop: unassign', lambda: legacy_unassign(org_id, db.session.get(Course, course_id)))
+            timed('set-based rows: assign', lambda: assign_courses(org_employee_ids(org_id), [course_id]))
+            timed('set-based rows: unassign', lambda: unassign_courses(org_employee_ids(org_id), [course_id]))
+            timed('org-wide: assign', lambda: add_org_courses(org_id, [course_id]))
+            timed('org-wide: unassign', lambda: remove_org_courses(org_id, [course_id]))
+            existing = list(range(1, course_id))
+            timed('org sync: clean old rows', lambda: rows_synced(org_id, existing))
+            timed('org sync: unchanged', lambda: rows_synced(org_id, existing))
+            timed('org sync: +1 course', lambda: rows_synced(org_id, existing + [course_id]))
+            employee_id = db.session.execute(org_employee_ids(org_id).limit(1)).scalar()
+            timed('revoke one employee', lambda: revoke_courses([employee_id], [course_id]))
+            assert not user_has_course(employee_id, course_id)
+            timed('grant one employee', lambda: grant_courses([employee_id], [course_id]))
+            assert user_has_course(employee_id, course_id)
+            timed('access check', lambda: int(user_has_course(employee_id, course_id)))
+            remaining = db.session.execute(db.select(db.func.count()).select_from(user_courses)).scalar()
+            assert remaining == 0, remaining
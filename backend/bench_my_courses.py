@@ -0,0 +1,112 @@
+"""
+Benchmark /api/employee/my_courses full mode vs summary mode.
+
+Builds a throwaway SQLite database with one employee assigned to --courses
+courses of --modules modules x --contents contents. It then reports median
+latency, payload size and SQL statements per request for each mode. The
+first request of each mode runs with cold principal and enrollment caches and
+must stay within the view's @query_budget (strict mode is on, so an overrun
+fails the request).
+
+    python bench_my_courses.py --courses 60 --modules 8 --contents 4
+"""
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from models import db, User, Organization, Course, Module, ModuleContent, user_courses, organization_courses
+from course_access import clear_enrollment_cache
+from course_routes import get_employee_my_courses
+from principal_cache import clear_principal_cache
+
+
+def seed(courses, modules, contents):
+    org = Organization(name='Bench Org', portal_admin='bench_admin', org_domain='bench.test',
+                       created=datetime.date.today())
+    db.session.add(org)
+    db.session.flush()
+    employee = User(username='bench_employee', password='x', role='employee',
+                    email='bench_employee@bench.test', org_id=org.id)
+    db.session.add(employee)
+    db.session.flush()
+
+    content_types = ['video', 'pdf', 'quiz']
+    for c in range(courses):
+        course = Course(title=f'Course {c}', description=f'Benchmark course {c}', status='published')
+        db.session.add(course)
+        db.session.flush()
+        for m in range(modules):
+            module = Module(title=f'Module {c}.{m}', description='Benchmark module', order=m, course_id=course.id)
+            db.session.add(module)
+            db.session.flush()
+            db.session.add_all([
+                ModuleContent(title=f'Content {c}.{m}.{i}', content_type=content_types[i % 3], order=i,
+                              file_path=f'uploads/bench/{c}/{m}/{i}', module_id=module.id)
+                for i in range(contents)
+            ])
+        db.session.execute(user_courses.insert().values(user_id=employee.id, course_id=course.id))
+        db.session.execute(organization_courses.insert().values(organization_id=org.id, course_id=course.id))
+    db.session.commit()
+    return employee.username
+
+
+def cold_queries(client, path):
+    """Statements for one request with empty per-worker caches; fails if over the view's budget."""
+    clear_principal_cache()
+    clear_enrollment_cache()
+    response = client.get(path)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    queries = int(response.headers['X-Query-Count'])
+    assert queries <= get_employee_my_courses.query_budget, f'{path} ran {queries} queries cold'
+    return queries
+
+
+def measure(client, path, runs):
+    cold = cold_queries(client, path)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'bytes': len(response.get_data()),
+        'queries': int(response.headers.get('X-Query-Count', 0)),
+        'cold_queries': cold,
+        'courses': len(response.get_json()['courses']),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='my_courses full vs summary benchmark')
+    parser.add_argument('--courses', type=int, default=60)
+    parser.add_argument('--modules', type=int, default=8)
+    parser.add_argument('--contents', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                          'QUERY_BUDGET_STRICT': True})
+        with app.app_context():
+            db.create_all()
+            username = seed(args.courses, args.modules, args.contents)
+
+        client = app.test_client()
+        base = f'/api/employee/my_courses?username={username}'
+        scenarios = [
+            ('full (all courses, all contents)', base),
+            ('summary, first page of 20', f'{base}&summary=true'),
+            ('summary, all courses', f'{base}&summary=true&limit=100'),
+            ('summary page + 1 expanded course', f'{base}&summary=true&expand=1'),
+        ]
+        print(f"{args.courses} courses x {args.modules} modules x {args.contents} contents, {args.runs} runs each")
+        for label, path in scenarios:
+            result = measure(client, path, args.runs)
+            print(f"{label:<34} {result['median_ms']:>8} ms  {result['bytes']:>8} bytes  "
+                  f"{result['queries']} queries ({result['cold_queries']} cold)  {result['courses']} courses")
@@ -0,0 +1,135 @@
+"""
+Benchmark progress ingestion: one POST /api/employee/update_progress per event
+against POST /api/employee/progress_batch with the same events in batches.
+
+Builds a throwaway SQLite database with --employees employees in one
+organization that has --courses courses of --modules modules each. Every
+employee then reports --events module events, spread over their courses the
+way a player that re-sends state on a timer does. Each strategy starts from the
+same state and is timed through the Flask test client, so request parsing,
+user lookup, access checks and commits all count.
+
+    python bench_progress_ingest.py --employees 50 --events 200 --batch-size 100
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db, User, Organization, Course, Module, CourseProgress, ModuleCompletion
+from course_assignments import add_org_courses
+from progress_ingest import PROGRESS_BATCH_MAX_EVENTS
+
+
+def seed(employees, courses, modules):
+    org = Organization(name='Bench Org', portal_admin='bench_admin', org_domain='bench.test',
+                       created=datetime.date.today())
+    db.session.add(org)
+    db.session.flush()
+    course_modules = {}
+    for c in range(courses):
+        course = Course(title=f'Course {c}', status='published')
+        db.session.add(course)
+        db.session.flush()
+        rows = [Module(title=f'Module {c}.{m}', order=m + 1, course_id=course.id) for m in range(modules)]
+        db.session.add_all(rows)
+        db.session.flush()
+        course_modules[course.id] = [module.id for module in rows]
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'bench_{i}', 'password': 'x', 'role': 'employee', 'email': f'bench_{i}@bench.test',
+         'org_id': org.id, 'created_at': datetime.datetime.utcnow()}
+        for i in range(employees)
+    ])
+    add_org_courses(org.id, list(course_modules))
+    db.session.commit()
+    return course_modules
+
+
+def make_events(employees, per_employee, course_modules):
+    rng = random.Random(42)
+    pairs = [(course_id, module_id) for course_id, ids in course_modules.items() for module_id in ids]
+    return {
+        f'bench_{i}': [
+            {'type': 'module', 'course_id': course_id, 'module_id': module_id, 'completed': rng.random() < 0.8}
+            for course_id, module_id in (rng.choice(pairs) for _ in range(per_employee))
+        ]
+        for i in range(employees)
+    }
+
+
+def reset():
+    db.session.query(ModuleCompletion).delete()
+    db.session.query(CourseProgress).delete()
+    db.session.commit()
+
+
+def single(client, events):
+    for username, user_events in events.items():
+        for e in user_events:
+            response = client.post('/api/employee/update_progress', json=dict(
+                username=username, course_id=e['course_id'], module_id=e['module_id'], completed=e['completed']))
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def batched(client, events, batch_size):
+    for username, user_events in events.items():
+        for start in range(0, len(user_events), batch_size):
+            response = client.post('/api/employee/progress_batch', json={
+                'username': username, 'events': user_events[start:start + batch_size]})
+            assert response.status_code == 200 and not response.get_json()['rejected'], response.get_data(as_text=True)
+
+
+def snapshot():
+    completions = db.session.execute(db.select(
+        ModuleCompletion.user_id, ModuleCompletion.course_id, ModuleCompletion.module_id)).all()
+    progress = db.session.execute(db.select(
+        CourseProgress.user_id, CourseProgress.course_id, CourseProgress.completed_modules)).all()
+    return sorted(completions), sorted(progress)
+
+
+def timed(label, total_events, action):
+    reset()
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', count)
+    db.session.remove()
+    print(f"{label:<24} {elapsed * 1000:>10.1f} ms  {total_events / elapsed:>9.0f} events/s  "
+          f"{statements[0]:>7} statements")
+    return snapshot()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Progress ingestion benchmark')
+    parser.add_argument('--employees', type=int, default=50)
+    parser.add_argument('--courses', type=int, default=4)
+    parser.add_argument('--modules', type=int, default=10)
+    parser.add_argument('--events', type=int, default=200, help='events per employee')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help=f'events per batch request (max {PROGRESS_BATCH_MAX_EVENTS})')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            events = make_events(args.employees, args.events, seed(args.employees, args.courses, args.modules))
+            total = args.employees * args.events
+            client = app.test_client()
+            print(f"{args.employees} employees x {args.events} events, batches of {args.batch_size}")
+
+            one_by_one = timed('single-event route', total, lambda: single(client, events))
+            in_batches = timed('batch route', total, lambda: batched(client, events, args.batch_size))
+            assert one_by_one == in_batches, 'batch ingestion produced a different end state'
+            print("✅ Both routes produced the same completions and progress rows")
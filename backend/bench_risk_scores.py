@@ -0,0 +1,104 @@
+"""
+Benchmark the nightly risk-score job (risk_scores.py) on a large progress table.
+
+Builds a throwaway SQLite database with --rows CourseProgress rows, spread over
+--courses courses with random progress, idle times and quiz attempts for
+about one learner in ten. It then times a full scoring run (every score
+changes) and a second run over the same data (nothing to write). Finally it
+checks a sample of rows against a plain-Python version of the formula.
+
+    python bench_risk_scores.py --rows 1000000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app import create_app
+from models import db, Course, Module, ModuleContent, CourseProgress, QuizAttempt
+from risk_scores import RISK_CHUNK_SIZE, compute_risk, score_all
+
+
+def seed(rows, courses, now):
+    rng = np.random.default_rng(42)
+    course_rows = [Course(title=f'Course {c}', status='published') for c in range(courses)]
+    db.session.add_all(course_rows)
+    db.session.flush()
+    quizzes = []
+    for course in course_rows:
+        module = Module(title='Module', order=1, course_id=course.id)
+        db.session.add(module)
+        db.session.flush()
+        quiz = ModuleContent(title='Quiz', content_type='quiz', order=1, module_id=module.id)
+        db.session.add(quiz)
+        db.session.flush()
+        quizzes.append(quiz.id)
+    db.session.commit()
+
+    total_modules = 10
+    completed = rng.integers(0, total_modules + 1, rows)
+    idle_seconds = rng.integers(0, 60 * 86400, rows)
+    start = time.perf_counter()
+    for offset in range(0, rows, 100000):
+        db.session.execute(CourseProgress.__table__.insert(), [
+            {'user_id': i // courses + 1, 'course_id': course_rows[i % courses].id,
+             'completed_modules': int(completed[i]), 'total_modules': total_modules,
+             'progress_percentage': completed[i] * 100.0 / total_modules,
+             'last_activity': now - datetime.timedelta(seconds=int(idle_seconds[i])), 'risk_score': 0}
+            for i in range(offset, min(rows, offset + 100000))
+        ])
+    attempts = rng.choice(rows, rows // 10, replace=False)
+    correct = rng.integers(0, 11, len(attempts))
+    db.session.execute(QuizAttempt.__table__.insert(), [
+        {'user_id': int(i) // courses + 1, 'quiz_content_id': quizzes[int(i) % courses], 'attempt_number': 1,
+         'total_questions': 10, 'correct_answers': int(c), 'score': float(c * 10)}
+        for i, c in zip(attempts, correct)
+    ])
+    db.session.commit()
+    print(f"Seeded {rows} progress rows and {len(attempts)} quiz attempts in {time.perf_counter() - start:.1f}s")
+
+
+def report(label, totals):
+    rate = totals['rows'] / totals['elapsed_s'] if totals['elapsed_s'] else 0
+    print(f"{label:<14} {totals['elapsed_s']:>8.2f} s  {rate:>10,.0f} rows/s  {totals['updated']:>9} updated  "
+          f"(load {totals['load_s']:.2f}s, compute {totals['compute_s']:.2f}s, write {totals['write_s']:.2f}s)")
+
+
+def check_sample(now, size=200):
+    rows = db.session.execute(
+        db.select(CourseProgress).order_by(db.func.random()).limit(size)
+    ).scalars().all()
+    for row in rows:
+        quiz = db.session.execute(
+            db.select(db.func.avg(QuizAttempt.correct_answers * 100.0 / QuizAttempt.total_questions))
+            .join(ModuleContent, ModuleContent.id == QuizAttempt.quiz_content_id)
+            .join(Module, Module.id == ModuleContent.module_id)
+            .where(QuizAttempt.user_id == row.user_id, Module.course_id == row.course_id)
+        ).scalar()
+        days = (now - row.last_activity).total_seconds() / 86400
+        expected = compute_risk(np.array([days]), np.array([row.progress_percentage]),
+                                np.array([np.nan if quiz is None else quiz]),
+                                np.array([row.completed_modules == row.total_modules]))[0]
+        assert row.risk_score == expected, (row.id, row.risk_score, expected)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Risk-score job benchmark')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--courses', type=int, default=20)
+    parser.add_argument('--chunk-size', type=int, default=RISK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            now = datetime.datetime.utcnow()
+            seed(args.rows, args.courses, now)
+            report('first run', score_all(args.chunk_size, now=now, verbose=False))
+            report('rerun', score_all(args.chunk_size, now=now, verbose=False))
+            check_sample(now)
+            print("✅ Sampled scores match the formula")
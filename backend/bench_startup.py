@@ -0,0 +1,68 @@
+"""
+Startup benchmark for the backend.
+
+Each run starts a fresh interpreter and measures:
+  - import_ms:        ``import app``
+  - create_app_ms:    ``create_app()`` (imports and registers the blueprints)
+  - first_request_ms: the first GET /api/hello through the test client
+
+Usage:
+    python bench_startup.py --runs 10
+    python bench_startup.py --blueprints auth,courses
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_PROBE = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+names = sys.argv[1].split(',') if sys.argv[1] else None
+flask_app = app_module.create_app(blueprints=names)
+t2 = time.perf_counter()
+response = flask_app.test_client().get('/api/hello')
+t3 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t3 - t2) * 1000,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def run_once(blueprints=''):
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE, blueprints],
+        cwd=backend_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(runs=5, blueprints=''):
+    samples = [run_once(blueprints) for _ in range(runs)]
+    result = {'runs': runs, 'blueprints': blueprints or 'all'}
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'modules'):
+        result[key] = round(statistics.median(s[key] for s in samples), 2)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backend import and first-request latency')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--blueprints', default='', help='comma separated subset, e.g. auth,courses')
+    args = parser.parse_args()
+
+    result = benchmark(args.runs, args.blueprints)
+    print(f"{result['runs']} runs, blueprints: {result['blueprints']} (medians)")
+    print(f"import app:     {result['import_ms']} ms")
+    print(f"create_app():   {result['create_app_ms']} ms")
+    print(f"first request:  {result['first_request_ms']} ms")
+    print(f"modules loaded: {result['modules']}")
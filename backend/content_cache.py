@@ -0,0 +1,128 @@
+"""
+Versioned cache for serialized course-tree responses, with ETag support.
+
+Every course has a content_version that write paths bump (in the same
+transaction) whenever its modules, contents or quiz questions change. Serialized
+payloads are cached per worker under (course_id, created, version, ...).
+Entries of an old version are simply never read again, so workers need no
+cross-process invalidation. The course's creation time is part of the key, so a
+course id reused after delete_course cannot hit an old entry.
+
+The same version token makes up the ETag, so clients revalidate with
+If-None-Match and get a 304 without the tree being rebuilt.
+"""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import Response, request
+
+from models import db, Course, Module
+from course_access import forget_course_contents
+
+COURSE_CACHE_MAX_ENTRIES = int(os.getenv('COURSE_CACHE_MAX_ENTRIES', '2000'))
+
+_payloads = OrderedDict()  # key -> serialized JSON body or payload dict
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+
+def _token(version, created):
+    return f"{int(created.timestamp())}.{version}"
+
+
+def course_version(course_id):
+    """Version token of a course, or None if it does not exist."""
+    row = db.session.execute(
+        db.select(Course.content_version, Course.created).where(Course.id == course_id)
+    ).first()
+    return _token(*row) if row else None
+
+
+def module_version(module_id):
+    """(course_id, version token) of the course a module belongs to, or (None, None)."""
+    row = db.session.execute(
+        db.select(Module.course_id, Course.content_version, Course.created)
+        .join(Course, Course.id == Module.course_id)
+        .where(Module.id == module_id)
+    ).first()
+    if not row:
+        return None, None
+    return row.course_id, _token(row.content_version, row.created)
+
+
+def bump_course_version(course_id):
+    """Invalidate cached trees of a course. Call before the commit of the change."""
+    db.session.execute(
+        db.update(Course)
+        .where(Course.id == course_id)
+        .values(content_version=Course.content_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    forget_course(course_id)
+
+
+def bump_module_course_version(module_id):
+    course_id = db.session.execute(db.select(Module.course_id).where(Module.id == module_id)).scalar()
+    if course_id is not None:
+        bump_course_version(course_id)
+
+
+def forget_course(course_id):
+    """Drop this worker's cached payloads for a course (other versions are just never read)."""
+    with _lock:
+        for key in [key for key in _payloads if key[0] == course_id]:
+            del _payloads[key]
+    forget_course_contents(course_id)
+
+
+def cached_payload(key, build):
+    """Return the cached payload (usually a serialized body) for key, building it on a miss."""
+    with _lock:
+        body = _payloads.get(key)
+        if body is not None:
+            _payloads.move_to_end(key)
+            _stats['hits'] += 1
+            return body
+        _stats['misses'] += 1
+
+    body = build()
+    with _lock:
+        _payloads[key] = body
+        while len(_payloads) > COURSE_CACHE_MAX_ENTRIES:
+            _payloads.popitem(last=False)
+    return body
+
+
+def fingerprint(*values):
+    """Short stable hash for per-user parts of an ETag (e.g. progress)."""
+    return format(zlib.crc32(repr(values).encode('utf-8')), '08x')
+
+
+def make_etag(*parts):
+    return '-'.join(str(part) for part in parts)
+
+
+def not_modified(etag):
+    """304 response if the client already has this version, else None."""
+    if request.if_none_match.contains_weak(etag):
+        _stats['not_modified'] += 1
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return None
+
+
+def json_response(body, etag):
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def content_cache_stats():
+    with _lock:
+        entries = len(_payloads)
+    return dict(_stats, entries=entries)
@@ -0,0 +1,154 @@
+"""
+Course access checks for employee-facing routes.
+
+Which courses a user can take is derived, not materialized per employee:
+
+    effective = (organization_courses of the user's org  ∪  user_courses grants)
+                − course_revocations of the user
+
+Assigning a course to an organization is therefore one organization_courses
+row, however many employees it has. user_courses holds per-user grants on top
+of that, and is the only source for users without an organization.
+course_revocations hides one of the organization's courses from one employee.
+All three tables are keyed by their lookup columns, so every check is a few
+index probes.
+
+effective_course_ids() serves the whole set from a per-worker TTL cache, so
+access checks on employee routes are a set lookup (has_course). The course a
+content item belongs to is cached the same way (content_course_id), so
+checking access to a quiz or a file needs no module or course objects. Changes
+made through this process are invalidated at once; other workers see them
+after at most ENROLLMENT_CACHE_TTL seconds, as with principal_cache.
+user_has_course() always asks the database.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import and_, exists, or_, select, union
+
+from models import db, User, Module, ModuleContent, organization_courses, user_courses, course_revocations
+
+ENROLLMENT_CACHE_TTL = float(os.getenv('ENROLLMENT_CACHE_TTL', '30'))
+ENROLLMENT_CACHE_MAX_ENTRIES = int(os.getenv('ENROLLMENT_CACHE_MAX_ENTRIES', '10000'))
+
+_entries = {}  # user_id -> (expires_at, org_id, frozenset of course ids)
+_content_courses = {}  # content_id -> (expires_at, course_id)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'content_hits': 0, 'content_misses': 0}
+
+
+def has_course_clause(user_id, org_id, course_id):
+    """SQL condition: the user (with this org) can take the course. Arguments may be columns or values."""
+    return and_(
+        or_(
+            exists().where(organization_courses.c.organization_id == org_id,
+                           organization_courses.c.course_id == course_id),
+            exists().where(user_courses.c.user_id == user_id, user_courses.c.course_id == course_id),
+        ),
+        ~exists().where(course_revocations.c.user_id == user_id, course_revocations.c.course_id == course_id),
+    )
+
+
+def effective_course_ids_select(user_id, org_id):
+    """Select of the course ids the user can take (one query: org courses ∪ grants − revocations)."""
+    granted = union(
+        select(organization_courses.c.course_id.label('course_id'))
+        .where(organization_courses.c.organization_id == org_id),
+        select(user_courses.c.course_id).where(user_courses.c.user_id == user_id),
+    ).subquery()
+    return select(granted.c.course_id).where(
+        granted.c.course_id.not_in(select(course_revocations.c.course_id).where(course_revocations.c.user_id == user_id))
+    )
+
+
+def user_has_course(user_id, course_id):
+    """Check effective access to one course with a single indexed query."""
+    return db.session.execute(
+        select(User.id).where(User.id == user_id, has_course_clause(User.id, User.org_id, course_id))
+    ).first() is not None
+
+
+def effective_course_ids(user):
+    """frozenset of the course ids a user (anything with .id and .org_id) can take, cached per worker."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(user.id)
+        if entry and entry[0] > now and entry[1] == user.org_id:
+            _stats['hits'] += 1
+            return entry[2]
+        _stats['misses'] += 1
+
+    course_ids = frozenset(db.session.execute(effective_course_ids_select(user.id, user.org_id)).scalars())
+    with _lock:
+        if len(_entries) >= ENROLLMENT_CACHE_MAX_ENTRIES:
+            for user_id in [u for u, (expires_at, _, _) in _entries.items() if expires_at <= now]:
+                del _entries[user_id]
+            if len(_entries) >= ENROLLMENT_CACHE_MAX_ENTRIES:
+                _entries.clear()
+        _entries[user.id] = (now + ENROLLMENT_CACHE_TTL, user.org_id, course_ids)
+    return course_ids
+
+
+def has_course(user, course_id):
+    """Whether a user (anything with .id and .org_id) can take a course, from the cached set."""
+    return course_id in effective_course_ids(user)
+
+
+def content_course_id(content_id):
+    """Id of the course a content item belongs to, or None if it does not exist. Cached per worker."""
+    now = time.monotonic()
+    with _lock:
+        entry = _content_courses.get(content_id)
+        if entry and entry[0] > now:
+            _stats['content_hits'] += 1
+            return entry[1]
+        _stats['content_misses'] += 1
+
+    course_id = db.session.execute(
+        select(Module.course_id).join(ModuleContent, ModuleContent.module_id == Module.id)
+        .where(ModuleContent.id == content_id)
+    ).scalar()
+    if course_id is not None:
+        with _lock:
+            if len(_content_courses) >= ENROLLMENT_CACHE_MAX_ENTRIES:
+                for key in [k for k, (expires_at, _) in _content_courses.items() if expires_at <= now]:
+                    del _content_courses[key]
+                if len(_content_courses) >= ENROLLMENT_CACHE_MAX_ENTRIES:
+                    _content_courses.clear()
+            _content_courses[content_id] = (now + ENROLLMENT_CACHE_TTL, course_id)
+    return course_id
+
+
+def forget_course_contents(course_id):
+    """Drop cached content -> course entries of a course (after its modules or contents change)."""
+    with _lock:
+        for content_id in [c for c, (_, entry_course) in _content_courses.items() if entry_course == course_id]:
+            del _content_courses[content_id]
+
+
+def invalidate_user_courses(*user_ids):
+    with _lock:
+        for user_id in user_ids:
+            if _entries.pop(user_id, None) is not None:
+                _stats['invalidations'] += 1
+
+
+def invalidate_org_courses(org_id):
+    """Drop cached sets of every user in an organization (after an org-wide change)."""
+    with _lock:
+        for user_id in [u for u, (_, entry_org, _) in _entries.items() if entry_org == org_id]:
+            del _entries[user_id]
+            _stats['invalidations'] += 1
+
+
+def clear_enrollment_cache():
+    with _lock:
+        _entries.clear()
+        _content_courses.clear()
+
+
+def enrollment_cache_stats():
+    with _lock:
+        entries, content_entries = len(_entries), len(_content_courses)
+    return dict(_stats, entries=entries, content_entries=content_entries, ttl_seconds=ENROLLMENT_CACHE_TTL)
@@ -0,0 +1,241 @@
+"""
+Set-based course assignment engine for the organization_courses,
+user_courses and course_revocations tables (see course_access.py for how they
+combine into a user's effective courses).
+
+Each call is one or two statements. Assignments are INSERT ... SELECT ... ON
+CONFLICT DO NOTHING over every (user, course) pair, and unassignments are one
+DELETE. Rows already in the desired state are never touched. No employee or
+course objects, and no ``employee.courses`` collections, are loaded. Every
+function returns the number of rows it inserted or deleted, and drops the
+affected users' cached course sets. The caller commits.
+
+Assigning a course to an organization writes one organization_courses row;
+grant_courses() and revoke_courses() are the per-user overrides on top.
+
+``users`` and ``courses`` may be lists of ids or id selects, e.g.
+org_employee_ids(org_id) or org_course_ids(org_id).
+"""
+import time
+
+from sqlalchemy import and_, func, literal, select, true
+
+from models import db, User, Course, organization_courses, user_courses, course_revocations
+from course_access import clear_enrollment_cache, invalidate_org_courses, invalidate_user_courses
+from db_upsert import insert_ignore
+
+
+def _ids(ids, column):
+    """Id select for a list of ids (only ids that exist) or an id select passed through."""
+    if isinstance(ids, (list, tuple, set)):
+        return select(column).where(column.in_(list(ids)))
+    return ids
+
+
+def _invalidate(users):
+    if isinstance(users, (list, tuple, set)):
+        invalidate_user_courses(*users)
+    else:
+        clear_enrollment_cache()
+
+
+def _pairs(users, courses):
+    """(user_id, course_id, org_id) for every user x course pair."""
+    user_ids = _ids(users, User.id).subquery()
+    course_ids = _ids(courses, Course.id).subquery()
+    return (
+        select(user_ids.c[0].label('user_id'), course_ids.c[0].label('course_id'), User.org_id)
+        .select_from(user_ids.join(course_ids, true()).join(User, User.id == user_ids.c[0]))
+    )
+
+
+def _org_covers(pairs):
+    return select(organization_courses.c.course_id).where(
+        organization_courses.c.organization_id == pairs.selected_columns.org_id,
+        organization_courses.c.course_id == pairs.selected_columns.course_id,
+    ).exists()
+
+
+def org_employee_ids(org_id):
+    return select(User.id).where(User.org_id == org_id, User.role == 'employee')
+
+
+def employee_id_chunks(org_id, chunk_size):
+    """Employee id selects covering the organization, chunk_size ids at a time (keyset on User.id)."""
+    low = 0
+    while True:
+        window = org_employee_ids(org_id).where(User.id > low).order_by(User.id).limit(chunk_size).subquery()
+        high = db.session.execute(select(func.max(window.c.id))).scalar()
+        if high is None:
+            return
+        yield org_employee_ids(org_id).where(User.id > low, User.id <= high)
+        low = high
+
+
+def org_course_ids(org_id):
+    return select(organization_courses.c.course_id).where(organization_courses.c.organization_id == org_id)
+
+
+def org_has_course(org_id, course_id):
+    return db.session.execute(
+        org_course_ids(org_id).where(organization_courses.c.course_id == course_id)
+    ).first() is not None
+
+
+def _delete_pairs(table, users, courses):
+    return db.session.execute(
+        table.delete()
+        .where(table.c.user_id.in_(_ids(users, User.id)))
+        .where(table.c.course_id.in_(_ids(courses, Course.id)))
+    ).rowcount
+
+
+def assign_courses(users, courses):
+    """Add user_courses grant rows for every user x course. Returns the number of new rows.
+
+    Low-level: use grant_courses() to give users access, which also lifts
+    revocations and skips courses their organization already provides.
+    """
+    user_ids = _ids(users, User.id).subquery()
+    course_ids = _ids(courses, Course.id).subquery()
+    pairs = select(user_ids.c[0], course_ids.c[0]).select_from(user_ids.join(course_ids, true()))
+    _invalidate(users)
+    return insert_ignore(user_courses, ['user_id', 'course_id'], pairs)
+
+
+def unassign_courses(users, courses):
+    """Delete user_courses grant rows for every user x course. Returns the number of deleted rows."""
+    _invalidate(users)
+    return _delete_pairs(user_courses, users, courses)
+
+
+def grant_courses(users, courses):
+    """Give every user access to every course. Returns the number of rows changed.
+
+    Revocations are lifted, and a grant row is only written where the user's
+    organization does not already provide the course.
+    """
+    changed = _delete_pairs(course_revocations, users, courses)
+    pairs = _pairs(users, courses)
+    changed += insert_ignore(
+        user_courses, ['user_id', 'course_id'],
+        pairs.with_only_columns(pairs.selected_columns.user_id, pairs.selected_columns.course_id)
+        .where(~_org_covers(pairs))
+    )
+    _invalidate(users)
+    return changed
+
+
+def revoke_courses(users, courses):
+    """Take every course away from every user. Returns the number of rows changed.
+
+    Grants are deleted, and a revocation is written where the user's
+    organization provides the course.
+    """
+    changed = _delete_pairs(user_courses, users, courses)
+    pairs = _pairs(users, courses)
+    changed += insert_ignore(
+        course_revocations, ['user_id', 'course_id'],
+        pairs.with_only_columns(pairs.selected_columns.user_id, pairs.selected_columns.course_id)
+        .where(_org_covers(pairs))
+    )
+    _invalidate(users)
+    return changed
+
+
+def add_org_courses(org_id, courses):
+    """Give an organization's employees courses: one row per course. Returns the number newly attached."""
+    course_ids = _ids(courses, Course.id).subquery()
+    attached = insert_ignore(organization_courses, ['organization_id', 'course_id'],
+                              select(literal(org_id), course_ids.c[0]))
+    invalidate_org_courses(org_id)
+    return attached
+
+
+def remove_org_courses(org_id, courses, employees=None):
+    """Detach courses from an organization. Returns the number of detached courses.
+
+    The employees' grants and revocations for those courses go too, so the
+    courses are gone for the whole organization. ``employees`` narrows that
+    cleanup to a chunk of org_employee_ids(org_id).
+    """
+    detached = db.session.execute(
+        organization_courses.delete()
+        .where(organization_courses.c.organization_id == org_id)
+        .where(organization_courses.c.course_id.in_(_ids(courses, Course.id)))
+    ).rowcount
+    employees = org_employee_ids(org_id) if employees is None else employees
+    for table in (user_courses, course_revocations):
+        _delete_pairs(table, employees, courses)
+    invalidate_org_courses(org_id)
+    return detached
+
+
+def delete_user_course_rows(users):
+    """Delete every grant and revocation of the users (before deleting the users)."""
+    deleted = 0
+    for table in (user_courses, course_revocations):
+        deleted += db.session.execute(table.delete().where(table.c.user_id.in_(_ids(users, User.id)))).rowcount
+    _invalidate(users)
+    return deleted
+
+
+def _stale_overrides(org_id, employees):
+    """(table, condition) for the employees' rows that sync_org_courses cleans up.
+
+    Employee grants are either redundant (the organization provides the
+    course) or outside the organization's courses; revocations are dangling
+    once the organization no longer has the course.
+    """
+    return [
+        (user_courses, user_courses.c.user_id.in_(employees)),
+        (course_revocations, and_(course_revocations.c.user_id.in_(employees),
+                                  course_revocations.c.course_id.not_in(org_course_ids(org_id)))),
+    ]
+
+
+def sync_org_courses(org_id, course_ids=None, employees=None):
+    """Replace the org's course set and clean up its employees' stale overrides.
+
+    With ``course_ids`` the organization's course set is replaced first, one
+    organization_courses row per added or removed course. Employees need no
+    rows of their own for these courses. Then each table gets one DELETE of the
+    stale overrides (see _stale_overrides). Revocations of courses the
+    organization keeps are per-employee decisions and stay.
+    ``employees`` narrows the cleanup to a chunk of org_employee_ids(org_id).
+    Returns the counts and elapsed time; the caller commits.
+    """
+    start = time.perf_counter()
+    current = set(db.session.execute(org_course_ids(org_id)).scalars())
+    if course_ids is None:
+        wanted = current
+    else:
+        wanted = set(db.session.execute(select(Course.id).where(Course.id.in_(list(course_ids)))).scalars())
+    added, removed = sorted(wanted - current), sorted(current - wanted)
+    rows_inserted = add_org_courses(org_id, added) if added else 0
+    rows_deleted = remove_org_courses(org_id, removed) if removed else 0
+
+    employees = org_employee_ids(org_id) if employees is None else employees
+    for table, stale in _stale_overrides(org_id, employees):
+        rows_deleted += db.session.execute(table.delete().where(stale)).rowcount
+    invalidate_org_courses(org_id)
+    return {
+        'course_ids': sorted(wanted),
+        'courses_added': added,
+        'courses_removed': removed,
+        'rows_inserted': rows_inserted,
+        'rows_deleted': rows_deleted,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def diff_org_courses(org_id, employees=None):
+    """What sync_org_courses would clean up, without writing: {course_id: {'add': 0, 'remove': n}}."""
+    employees = org_employee_ids(org_id) if employees is None else employees
+    diff = {}
+    for table, stale in _stale_overrides(org_id, employees):
+        for course_id, count in db.session.execute(
+            select(table.c.course_id, func.count()).where(stale).group_by(table.c.course_id)
+        ):
+            diff.setdefault(course_id, {'add': 0, 'remove': 0})['remove'] += count
+    return diff
@@ -0,0 +1,117 @@
+"""
+Server-side course cloning.
+
+clone_course() copies a course's modules, contents, quiz questions and options
+inside the database, with one INSERT ... SELECT per table. New ids are assigned
+densely above the table's current max(id): new_id = base + row_number() over
+the source ids. Each child level joins the same mapping of its parent to remap
+foreign keys, so no ids travel to Python. On PostgreSQL the three tables are
+locked against concurrent inserts for the (short) transaction and their id
+sequences are moved past the new rows afterwards.
+
+Uploaded files are shared by reference, so a cloned content points at the same
+file_path as its source. remove_unshared_file() is the guard for the delete
+paths: a file is only removed once no other content references it.
+"""
+import os
+
+from sqlalchemy import func, text
+
+from models import db, Course, Module, ModuleContent, QuizQuestion, QuizOption
+
+_modules = Module.__table__
+_contents = ModuleContent.__table__
+_questions = QuizQuestion.__table__
+_options = QuizOption.__table__
+
+
+def _id_map(table, base, source, course_id):
+    """(old_id, new_id) for the course's rows of ``table``, numbered densely above ``base``."""
+    return (
+        db.select(table.c.id.label('old_id'), (base + func.row_number().over(order_by=table.c.id)).label('new_id'))
+        .select_from(source)
+        .where(_modules.c.course_id == course_id)
+        .subquery()
+    )
+
+
+def clone_course(source, title=None):
+    """Copy a course's tree into a new draft course. Returns (new course, counts); caller commits."""
+    course_id = source.id
+
+    postgres = db.session.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        db.session.execute(text('LOCK TABLE module, module_content, quiz_question IN SHARE ROW EXCLUSIVE MODE'))
+
+    course = Course(title=title or f"{source.title} (Copy)", description=source.description, status='draft')
+    db.session.add(course)
+    db.session.flush()
+
+    bases = {
+        table.name: db.session.execute(db.select(func.coalesce(func.max(table.c.id), 0))).scalar()
+        for table in (_modules, _contents, _questions)
+    }
+    module_map = _id_map(_modules, bases['module'], _modules, course_id)
+    content_map = _id_map(
+        _contents, bases['module_content'],
+        _contents.join(_modules, _modules.c.id == _contents.c.module_id), course_id
+    )
+    question_map = _id_map(
+        _questions, bases['quiz_question'],
+        _questions.join(_contents, _contents.c.id == _questions.c.content_id)
+        .join(_modules, _modules.c.id == _contents.c.module_id), course_id
+    )
+
+    counts = {}
+    counts['modules'] = db.session.execute(_modules.insert().from_select(
+        ['id', 'title', 'description', 'order', 'course_id'],
+        db.select(module_map.c.new_id, _modules.c.title, _modules.c.description, _modules.c.order,
+                  db.literal(course.id))
+        .select_from(_modules.join(module_map, module_map.c.old_id == _modules.c.id))
+    )).rowcount
+    counts['contents'] = db.session.execute(_contents.insert().from_select(
+        ['id', 'title', 'content_type', 'file_path', 'content', 'order', 'module_id', 'question_count'],
+        db.select(content_map.c.new_id, _contents.c.title, _contents.c.content_type, _contents.c.file_path,
+                  _contents.c.content, _contents.c.order, module_map.c.new_id, _contents.c.question_count)
+        .select_from(_contents.join(content_map, content_map.c.old_id == _contents.c.id)
+                     .join(module_map, module_map.c.old_id == _contents.c.module_id))
+    )).rowcount
+    counts['questions'] = db.session.execute(_questions.insert().from_select(
+        ['id', 'question_text', 'question_type', 'order', 'content_id'],
+        db.select(question_map.c.new_id, _questions.c.question_text, _questions.c.question_type,
+                  _questions.c.order, content_map.c.new_id)
+        .select_from(_questions.join(question_map, question_map.c.old_id == _questions.c.id)
+                     .join(content_map, content_map.c.old_id == _questions.c.content_id))
+    )).rowcount
+    counts['options'] = db.session.execute(_options.insert().from_select(
+        ['option_text', 'is_correct', 'question_id'],
+        db.select(_options.c.option_text, _options.c.is_correct, question_map.c.new_id)
+        .select_from(_options.join(question_map, question_map.c.old_id == _options.c.question_id))
+        .order_by(_options.c.id)
+    )).rowcount
+
+    if postgres:
+        for table in (_modules, _contents, _questions):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+            ))
+    return course, counts
+
+
+def remove_unshared_file(file_path, *content_ids):
+    """Delete an uploaded file unless a content other than ``content_ids`` still references it."""
+    if not file_path or not os.path.exists(file_path):
+        return False
+    shared = db.session.execute(
+        db.select(ModuleContent.id)
+        .where(ModuleContent.file_path == file_path, ModuleContent.id.not_in(content_ids))
+        .limit(1)
+    ).first()
+    if shared:
+        return False
+    try:
+        os.remove(file_path)
+    except OSError:
+        return False  # Continue even if file deletion fails
+    return True
@@ -0,0 +1,893 @@
+from flask import Blueprint, Response, abort, jsonify, request, send_from_directory, stream_with_context
+import os
+from models import db, Course, Module, ModuleContent, QuizQuestion, QuizOption, Task, CourseRequest, CourseProgress, QuizAttempt, ContentInteraction, CourseEnrollment, ModuleCompletion
+from principal_cache import resolve_principal
+from course_access import content_course_id, has_course, effective_course_ids_select
+from module_completion import progress_with_completion_dates
+from course_tree import load_course_tree, load_course_trees, load_course_summaries, load_module_contents
+from query_budget import query_budget
+from ordering import next_order, reorder
+from course_transfer import CourseImportError, export_course_lines, import_course_lines
+from course_clone import clone_course, remove_unshared_file
+from content_cache import (course_version, module_version, bump_course_version, bump_module_course_version,
+                           forget_course, cached_payload, fingerprint, make_etag, not_modified, json_response)
+
+courses_bp = Blueprint('courses', __name__)
+
+# Page sizes for /api/employee/my_courses (summary mode is paginated by default)
+MY_COURSES_DEFAULT_LIMIT = 20
+MY_COURSES_MAX_LIMIT = 100
+
+# Course API endpoints
+@courses_bp.route('/api/courses', methods=['GET'])
+def get_courses():
+    courses = Course.query.order_by(Course.created.desc()).all()
+    course_list = [
+        {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "created": course.created.strftime('%Y-%m-%d %H:%M:%S'),
+            "status": course.status,
+            "module_count": len(course.modules)
+        }
+        for course in courses
+    ]
+    return jsonify({"success": True, "courses": course_list})
+
+@courses_bp.route('/api/courses', methods=['POST'])
+def create_course():
+    data = request.get_json()
+    title = data.get('title')
+    description = data.get('description', '')
+    status = data.get('status', 'draft')
+    
+    if not title:
+        return jsonify({"success": False, "message": "Title is required"}), 400
+    
+    if status not in ['draft', 'published', 'archived']:
+        return jsonify({"success": False, "message": "Invalid status"}), 400
+    
+    course = Course(
+        title=title,
+        description=description,
+        status=status
+    )
+    
+    db.session.add(course)
+    db.session.commit()
+    
+    return jsonify({
+        "success": True, 
+        "message": "Course created successfully",
+        "course": {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "created": course.created.strftime('%Y-%m-%d %H:%M:%S'),
+            "status": course.status
+        }
+    })
+
+@courses_bp.route('/api/courses/<int:course_id>', methods=['GET'])
+@query_budget(3)
+def get_course(course_id):
+    version = course_version(course_id)
+    if version is None:
+        abort(404)
+    etag = make_etag('course', course_id, version)
+    if (cached := not_modified(etag)):
+        return cached
+    body = cached_payload((course_id, version, 'course'), lambda: _build_course_body(course_id))
+    return json_response(body, etag)
+
+def _build_course_body(course_id):
+    course = db.session.get(Course, course_id)
+    
+    modules = [
+        {
+            "id": module['id'],
+            "title": module['title'],
+            "description": module['description'],
+            "order": module['order'],
+            "contents": [
+                {
+                    "id": content['id'],
+                    "title": content['title'],
+                    "content_type": content['content_type'],
+                    "order": content['order']
+                }
+                for content in module['contents']
+            ]
+        }
+        for module in load_course_tree(course.id)
+    ]
+    
+    course_data = {
+        "id": course.id,
+        "title": course.title,
+        "description": course.description,
+        "created": course.created.strftime('%Y-%m-%d %H:%M:%S'),
+        "status": course.status,
+        "modules": modules
+    }
+    
+    return jsonify({"success": True, "course": course_data}).get_data()
+
+@courses_bp.route('/api/courses/<int:course_id>', methods=['PUT'])
+def update_course(course_id):
+    """Update course details (admin only)"""
+    try:
+        course = Course.query.get_or_404(course_id)
+        data = request.get_json()
+        
+        title = data.get('title')
+        description = data.get('description')
+        status = data.get('status')
+        
+        # Validate required fields
+        if not title:
+            return jsonify({"success": False, "message": "Title is required"}), 400
+        
+        # Validate status
+        if status and status not in ['draft', 'published', 'archived']:
+            return jsonify({"success": False, "message": "Invalid status"}), 400
+        
+        # Update course fields
+        course.title = title
+        if description is not None:
+            course.description = description
+        if status:
+            course.status = status
+        
+        bump_course_version(course.id)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": "Course updated successfully",
+            "course": {
+                "id": course.id,
+                "title": course.title,
+                "description": course.description,
+                "status": course.status,
+                "created": course.created.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error updating course: {str(e)}"}), 500
+
+@courses_bp.route('/api/courses/<int:course_id>', methods=['DELETE'])
+def delete_course(course_id):
+    try:
+        course = Course.query.get_or_404(course_id)
+        
+        # Get all module content IDs for this course
+        content_ids = []
+        for module in course.modules:
+            for content in module.contents:
+                content_ids.append(content.id)
+        
+        # Handle foreign key constraints before deleting the course
+        
+        # 1. Delete content interactions for all content in this course
+        if content_ids:
+            ContentInteraction.query.filter(ContentInteraction.content_id.in_(content_ids)).delete(synchronize_session=False)
+            db.session.flush()
+        
+        # 2. Delete quiz attempts for all content in this course
+        if content_ids:
+            QuizAttempt.query.filter(QuizAttempt.quiz_content_id.in_(content_ids)).delete(synchronize_session=False)
+            db.session.flush()
+        
+        # 3. Delete course enrollments for this course
+        CourseEnrollment.query.filter_by(course_id=course_id).delete(synchronize_session=False)
+        db.session.flush()
+        
+        # 4. Delete certificates for this course
+        # Note: Certificate table does not exist in current schema, skipping
+        # db.session.execute(text(f"DELETE FROM certificate WHERE course_id = {course_id}"))
+        # db.session.flush()
+        
+        # 5. Delete related course requests
+        course_requests = CourseRequest.query.filter_by(course_id=course_id).all()
+        for request in course_requests:
+            db.session.delete(request)
+        
+        # 6. Remove course from organization associations
+        from models import organization_courses
+        db.session.execute(
+            organization_courses.delete().where(organization_courses.c.course_id == course_id)
+        )
+        
+        # 7. Remove course from user assignments and revocations
+        from models import user_courses, course_revocations
+        for table in (user_courses, course_revocations):
+            db.session.execute(table.delete().where(table.c.course_id == course_id))
+        
+        # 8. Delete course progress records and module completions
+        ModuleCompletion.query.filter_by(course_id=course_id).delete(synchronize_session=False)
+        progress_records = CourseProgress.query.filter_by(course_id=course_id).all()
+        for progress in progress_records:
+            db.session.delete(progress)
+        
+        # 9. Delete course enrollments
+        enrollments = CourseEnrollment.query.filter_by(course_id=course_id).all()
+        for enrollment in enrollments:
+            db.session.delete(enrollment)
+        
+        # 10. Delete tasks related to this course
+        tasks = Task.query.filter_by(course_id=course_id).all()
+        for task in tasks:
+            db.session.delete(task)
+        
+        # Now safe to delete the course (modules, content, questions, options will be cascade deleted)
+        db.session.delete(course)
+        db.session.commit()
+        forget_course(course_id)
+        
+        return jsonify({"success": True, "message": "Course deleted successfully"})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Failed to delete course: {str(e)}"}), 500
+
+@courses_bp.route('/api/courses/<int:course_id>/clone', methods=['POST'])
+def clone_course_route(course_id):
+    """Copy a course tree into a new draft course inside the database; uploaded files are shared"""
+    source = Course.query.get_or_404(course_id)
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        course, counts = clone_course(source, title=data.get('title'))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Failed to clone course: {str(e)}"}), 500
+    
+    return jsonify({
+        "success": True,
+        "message": "Course cloned successfully",
+        "course": {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "created": course.created.strftime('%Y-%m-%d %H:%M:%S'),
+            "status": course.status
+        },
+        "counts": counts
+    }), 201
+
+@courses_bp.route('/api/courses/<int:course_id>/export', methods=['GET'])
+def export_course(course_id):
+    """Stream the whole course tree as NDJSON (see course_transfer.py for the format)"""
+    course = Course.query.get_or_404(course_id)
+    
+    response = Response(stream_with_context(export_course_lines(course.id)), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = f'attachment; filename=course-{course.id}.ndjson'
+    return response
+
+@courses_bp.route('/api/courses/import', methods=['POST'])
+def import_course():
+    """Create a new course from an NDJSON export streamed in the request body, in one transaction"""
+    try:
+        course_id, counts = import_course_lines(request.stream)
+        db.session.commit()
+    except CourseImportError as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Failed to import course: {str(e)}"}), 500
+    
+    return jsonify({
+        "success": True,
+        "message": "Course imported successfully",
+        "course_id": course_id,
+        "counts": counts
+    }), 201
+
+# Module API endpoints
+@courses_bp.route('/api/courses/<int:course_id>/modules', methods=['POST'])
+def create_module(course_id):
+    course = Course.query.get_or_404(course_id)
+    data = request.get_json()
+    
+    title = data.get('title')
+    description = data.get('description', '')
+    order = data.get('order')
+    
+    if not title:
+        return jsonify({"success": False, "message": "Title is required"}), 400
+    
+    # If order is not provided, add it at the end
+    if order is None:
+        order = next_order(Module.order, Module.course_id, course_id)
+    
+    module = Module(
+        title=title,
+        description=description,
+        order=order,
+        course_id=course_id
+    )
+    
+    db.session.add(module)
+    bump_course_version(course.id)
+    db.session.commit()
+    
+    return jsonify({
+        "success": True, 
+        "message": "Module created successfully",
+        "module": {
+            "id": module.id,
+            "title": module.title,
+            "description": module.description,
+            "order": module.order,
+            "course_id": module.course_id
+        }
+    })
+
+@courses_bp.route('/api/courses/<int:course_id>/modules/order', methods=['PUT'])
+def reorder_modules(course_id):
+    """Apply a new module order for a course in one statement: {"module_ids": [...]}"""
+    course = Course.query.get_or_404(course_id)
+    data = request.get_json() or {}
+    
+    error = reorder(Module, Module.course_id, course.id, data.get('module_ids'))
+    if error:
+        db.session.rollback()
+        return jsonify({"success": False, "message": error}), 400
+    
+    bump_course_version(course.id)
+    db.session.commit()
+    
+    return jsonify({"success": True, "message": "Modules reordered successfully"})
+
+# Module Content API endpoints
+@courses_bp.route('/api/modules/<int:module_id>/contents', methods=['POST'])
+def create_module_content(module_id):
+    module = Module.query.get_or_404(module_id)
+    content_type = request.form.get('content_type')
+    title = request.form.get('title')
+    order = request.form.get('order')
+    
+    if not title or not content_type:
+        return jsonify({"success": False, "message": "Title and content type are required"}), 400
+    
+    if content_type not in ['video', 'pdf', 'quiz']:
+        return jsonify({"success": False, "message": "Invalid content type"}), 400
+    
+    # If order is not provided, add it at the end
+    if order is None:
+        order = next_order(ModuleContent.order, ModuleContent.module_id, module_id)
+    else:
+        order = int(order)
+    
+    content = ModuleContent(
+        title=title,
+        content_type=content_type,
+        order=order,
+        module_id=module_id
+    )
+    
+    # Handle file upload for video or PDF
+    if content_type in ['video', 'pdf']:
+        file = request.files.get('file')
+        if not file:
+            return jsonify({"success": False, "message": f"File is required for {content_type} content"}), 400
+        
+        # Create uploads directory if it doesn't exist
+        upload_dir = os.path.join('uploads', 'courses', str(module.course_id), 'modules', str(module_id))
+        os.makedirs(upload_dir, exist_ok=True)
+        
+        # Save file with a secure filename
+        from werkzeug.utils import secure_filename
+        filename = secure_filename(file.filename)
+        file_path = os.path.join(upload_dir, filename)
+        file.save(file_path)
+        
+        # Store relative path in database
+        content.file_path = os.path.join('uploads', 'courses', str(module.course_id), 'modules', str(module_id), filename)
+    
+    # Handle quiz content
+    elif content_type == 'quiz':
+        # For quiz, we don't need a file - questions will be added separately
+        content.file_path = None
+    
+    db.session.add(content)
+    bump_course_version(module.course_id)
+    db.session.commit()
+    
+    return jsonify({
+        "success": True, 
+        "message": f"{content_type.capitalize()} content created successfully",
+        "content": {
+            "id": content.id,
+            "title": content.title,
+            "content_type": content.content_type,
+            "file_path": content.file_path,
+            "order": content.order,
+            "module_id": content.module_id
+        }
+    })
+
+@courses_bp.route('/api/modules/<int:module_id>/contents/order', methods=['PUT'])
+def reorder_module_contents(module_id):
+    """Apply a new content order for a module in one statement: {"content_ids": [...]}"""
+    module = Module.query.get_or_404(module_id)
+    data = request.get_json() or {}
+    
+    error = reorder(ModuleContent, ModuleContent.module_id, module.id, data.get('content_ids'))
+    if error:
+        db.session.rollback()
+        return jsonify({"success": False, "message": error}), 400
+    
+    bump_course_version(module.course_id)
+    db.session.commit()
+    
+    return jsonify({"success": True, "message": "Contents reordered successfully"})
+
+@courses_bp.route('/api/contents/<int:content_id>', methods=['GET'])
+def get_module_content(content_id):
+    """Get details of a specific module content"""
+    try:
+        content = ModuleContent.query.get_or_404(content_id)
+        
+        content_data = {
+            "id": content.id,
+            "title": content.title,
+            "content_type": content.content_type,
+            "file_path": content.file_path,
+            "order": content.order,
+            "module_id": content.module_id
+        }
+        
+        # If it's a quiz, include question count
+        if content.content_type == 'quiz':
+            content_data['question_count'] = content.question_count
+        
+        return jsonify({
+            "success": True,
+            "content": content_data
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error fetching content: {str(e)}"}), 500
+
+@courses_bp.route('/api/contents/<int:content_id>', methods=['PUT'])
+def update_module_content(content_id):
+    """Update module content (admin only)"""
+    try:
+        content = ModuleContent.query.get_or_404(content_id)
+        
+        # Handle JSON data for quiz content or form data for file uploads
+        if request.content_type and 'application/json' in request.content_type:
+            # JSON update (for quiz content or title/order changes)
+            data = request.get_json()
+            title = data.get('title')
+            order = data.get('order')
+            
+            if title:
+                content.title = title
+            if order is not None:
+                content.order = int(order)
+                
+        else:
+            # Form data update (for file uploads)
+            title = request.form.get('title')
+            order = request.form.get('order')
+            
+            if title:
+                content.title = title
+            if order is not None:
+                content.order = int(order)
+            
+            # Handle file replacement for video or PDF content
+            if content.content_type in ['video', 'pdf']:
+                file = request.files.get('file')
+                if file:
+                    # Delete old file if it exists and no cloned content still uses it
+                    remove_unshared_file(content.file_path, content.id)
+                    
+                    # Create uploads directory
+                    module = content.module
+                    upload_dir = os.path.join('uploads', 'courses', str(module.course_id), 'modules', str(module.id))
+                    os.makedirs(upload_dir, exist_ok=True)
+                    
+                    # Save new file
+                    from werkzeug.utils import secure_filename
+                    filename = secure_filename(file.filename)
+                    file_path = os.path.join(upload_dir, filename)
+                    file.save(file_path)
+                    
+                    # Update file path in database
+                    content.file_path = os.path.join('uploads', 'courses', str(module.course_id), 'modules', str(module.id), filename)
+        
+        bump_module_course_version(content.module_id)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": "Content updated successfully",
+            "content": {
+                "id": content.id,
+                "title": content.title,
+                "content_type": content.content_type,
+                "file_path": content.file_path,
+                "order": content.order,
+                "module_id": content.module_id
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error updating content: {str(e)}"}), 500
+
+@courses_bp.route('/api/contents/<int:content_id>', methods=['DELETE'])
+def delete_module_content(content_id):
+    """Delete module content (admin only)"""
+    try:
+        content = ModuleContent.query.get_or_404(content_id)
+        
+        # Delete associated file if it exists and no cloned content still uses it
+        remove_unshared_file(content.file_path, content.id)
+        
+        # Delete associated quiz questions and options if it's a quiz
+        if content.content_type == 'quiz':
+            questions = QuizQuestion.query.filter_by(content_id=content_id).all()
+            for question in questions:
+                # Delete quiz options first
+                QuizOption.query.filter_by(question_id=question.id).delete()
+                # Delete the question
+                db.session.delete(question)
+        
+        # Delete content interactions
+        ContentInteraction.query.filter_by(content_id=content_id).delete()
+        
+        # Delete the content itself
+        content_title = content.title
+        bump_module_course_version(content.module_id)
+        db.session.delete(content)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": f"Content '{content_title}' deleted successfully"
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error deleting content: {str(e)}"}), 500
+
+@courses_bp.route('/api/modules/<int:module_id>/contents', methods=['GET'])
+@query_budget(3)
+def get_module_contents(module_id):
+    """Get all contents for a specific module"""
+    course_id, version = module_version(module_id)
+    if version is None:
+        abort(404)
+    etag = make_etag('module', module_id, version)
+    if (cached := not_modified(etag)):
+        return cached
+    
+    try:
+        body = cached_payload((course_id, version, 'module', module_id), lambda: _build_module_contents_body(module_id))
+        return json_response(body, etag)
+        
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error fetching module contents: {str(e)}"}), 500
+
+def _build_module_contents_body(module_id):
+    module = db.session.get(Module, module_id)
+    
+    contents = load_module_contents(module.id)
+    
+    # Question count is only reported for quiz content
+    for content in contents:
+        if content['content_type'] != 'quiz':
+            del content['question_count']
+    
+    return jsonify({
+        "success": True,
+        "module": {
+            "id": module.id,
+            "title": module.title,
+            "description": module.description,
+            "course_id": module.course_id
+        },
+        "contents": contents
+    }).get_data()
+
+# Module management endpoints
+@courses_bp.route('/api/modules/<int:module_id>', methods=['GET'])
+def get_module(module_id):
+    """Get details of a specific module"""
+    try:
+        module = Module.query.get_or_404(module_id)
+        
+        return jsonify({
+            "success": True,
+            "module": {
+                "id": module.id,
+                "title": module.title,
+                "description": module.description,
+                "order": module.order,
+                "course_id": module.course_id,
+                "content_count": len(module.contents)
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error fetching module: {str(e)}"}), 500
+
+@courses_bp.route('/api/modules/<int:module_id>', methods=['PUT'])
+def update_module(module_id):
+    """Update module details"""
+    try:
+        module = Module.query.get_or_404(module_id)
+        data = request.get_json()
+        
+        title = data.get('title')
+        description = data.get('description')
+        order = data.get('order')
+        
+        if title:
+            module.title = title
+        if description is not None:
+            module.description = description
+        if order is not None:
+            module.order = int(order)
+        
+        bump_course_version(module.course_id)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": "Module updated successfully",
+            "module": {
+                "id": module.id,
+                "title": module.title,
+                "description": module.description,
+                "order": module.order,
+                "course_id": module.course_id
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error updating module: {str(e)}"}), 500
+
+@courses_bp.route('/api/modules/<int:module_id>', methods=['DELETE'])
+def delete_module(module_id):
+    """Delete a module and all its contents"""
+    try:
+        module = Module.query.get_or_404(module_id)
+        module_title = module.title
+        
+        # Delete all contents in this module (will cascade delete questions/options)
+        content_ids = [content.id for content in module.contents]
+        for content in module.contents:
+            # Delete associated files unless a cloned course still uses them
+            remove_unshared_file(content.file_path, *content_ids)
+            
+            # Delete content interactions
+            ContentInteraction.query.filter_by(content_id=content.id).delete()
+        ModuleCompletion.query.filter_by(module_id=module_id).delete(synchronize_session=False)
+        
+        # Delete the module (contents will be cascade deleted due to relationship)
+        bump_course_version(module.course_id)
+        db.session.delete(module)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": f"Module '{module_title}' and all its contents deleted successfully"
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error deleting module: {str(e)}"}), 500
+
+# --- Employee: Get My Assigned Courses ---
+@courses_bp.route('/api/employee/content/<int:content_id>', methods=['GET'])
+def get_employee_content_detail(content_id):
+    """Return content details for the logged-in employee (minimal for now)."""
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'success': False, 'error': 'username is required'}), 400
+    user = resolve_principal(username, role='employee')
+    if not user:
+        return jsonify({'success': False, 'error': 'Employee not found'}), 404
+    # Find the content
+    content = ModuleContent.query.get(content_id)
+    if not content:
+        return jsonify({'success': False, 'error': 'Content not found'}), 404
+    # Optionally, check if the user is assigned to the course containing this content
+    course_id = content_course_id(content.id)
+    if course_id is not None and not has_course(user, course_id):
+        return jsonify({'success': False, 'error': 'Content not assigned to employee'}), 403
+    
+    # Prepare the content response
+    content_data = {
+        'id': content.id,
+        'title': content.title,
+        'content_type': content.content_type,
+        'file_path': content.file_path,
+        'order': content.order,
+        'module_id': content.module_id
+    }
+    
+    # If content is a quiz, include basic quiz info (questions fetched separately)
+    if content.content_type == 'quiz':
+        content_data['question_count'] = content.question_count
+    
+    return jsonify({
+        'success': True,
+        'content': content_data
+    }), 200
+
+@courses_bp.route('/api/employee/course/<int:course_id>', methods=['GET'])
+@query_budget(6)
+def get_employee_course_detail(course_id):
+    """Return course details (modules, contents, progress) for the logged-in employee."""
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'success': False, 'error': 'username is required'}), 400
+    user = resolve_principal(username, role='employee')
+    if not user:
+        return jsonify({'success': False, 'error': 'Employee not found'}), 404
+    # Check if course is assigned to this user
+    version = course_version(course_id)
+    if version is None or not has_course(user, course_id):
+        return jsonify({'success': False, 'error': 'Course not assigned to employee'}), 404
+    # Progress info and per-module completion dates from one query
+    progress, completed_modules, completion_dates = progress_with_completion_dates(user.id, course_id)
+    module_progress = {
+        str(module_id): {'completed': True, 'completion_date': completed_at.isoformat()}
+        for module_id, completed_at in completion_dates.items()
+    }
+    # The course tree is shared by every employee; only the progress part is per user
+    etag = make_etag('employee-course', course_id, version,
+                     fingerprint(progress, completed_modules, sorted(module_progress.items())))
+    if (cached := not_modified(etag)):
+        return cached
+    course_data = cached_payload((course_id, version, 'employee-course'), lambda: _build_employee_course(course_id))
+    result = dict(course_data, progress=progress, completed_modules=completed_modules, module_progress=module_progress)
+    response = jsonify({'success': True, 'course': result})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response, 200
+
+def _build_employee_course(course_id):
+    course = db.session.get(Course, course_id)
+    # Build modules and contents
+    modules = []
+    for module in load_course_tree(course.id):
+        contents = []
+        for content in module['contents']:
+            contents.append({
+                'id': content['id'],
+                'title': content['title'],
+                'content_type': content['content_type'],
+                'file_path': content['file_path'],
+                'order': content['order']
+            })
+        modules.append({
+            'id': module['id'],
+            'title': module['title'],
+            'description': module['description'],
+            'order': module['order'],
+            'contents': contents
+        })
+    return {
+        'id': course.id,
+        'title': course.title,
+        'description': course.description,
+        'module_count': len(modules),
+        'modules': modules
+    }
+
+@courses_bp.route('/api/employee/my_courses', methods=['GET'])
+@query_budget(5)
+def get_employee_my_courses():
+    """
+    Return the courses assigned to the employee.
+
+    By default every course is returned with its modules and content info.
+    Query parameters:
+      summary=true   only id, title, description, progress and module/content counts
+      expand=1,2     (summary mode) include modules and contents for these course ids
+      limit=N        page size (max MY_COURSES_MAX_LIMIT); the response then has next_cursor
+      cursor=ID      continue after the course id returned as next_cursor
+    """
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'success': False, 'error': 'username is required'}), 400
+    user = resolve_principal(username, role='employee')
+    if not user:
+        return jsonify({'success': False, 'error': 'Employee not found'}), 404
+    
+    summary = request.args.get('summary', 'false').lower() in ['true', '1', 'yes']
+    try:
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor', type=int)
+        expand = {int(course_id) for course_id in request.args.get('expand', '').split(',') if course_id.strip()}
+    except ValueError:
+        return jsonify({'success': False, 'error': 'expand must be a comma separated list of course ids'}), 400
+    if summary and limit is None:
+        limit = MY_COURSES_DEFAULT_LIMIT
+    if limit is not None:
+        limit = max(1, min(limit, MY_COURSES_MAX_LIMIT))
+    
+    # The organization's courses plus the user's grants, minus revocations, as a subquery of the page query
+    user_course_query = Course.query.filter(Course.id.in_(effective_course_ids_select(user.id, user.org_id)))
+    if cursor is not None:
+        user_course_query = user_course_query.filter(Course.id > cursor)
+    user_course_query = user_course_query.order_by(Course.id)
+    
+    # Fetch one extra row to know whether there is a next page
+    courses = user_course_query.limit(limit + 1).all() if limit is not None else user_course_query.all()
+    next_cursor = None
+    if limit is not None and len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = courses[-1].id
+    
+    course_ids = [course.id for course in courses]
+    progress_by_course = {
+        pr.course_id: pr for pr in
+        CourseProgress.query.filter(CourseProgress.user_id == user.id, CourseProgress.course_id.in_(course_ids)).all()
+    } if course_ids else {}
+    summaries = load_course_summaries(course_ids) if summary else {}
+    trees = load_course_trees([course_id for course_id in course_ids if not summary or course_id in expand])
+    
+    result = []
+    for course in courses:
+        # Progress info (optional, if available)
+        progress_record = progress_by_course.get(course.id)
+        progress = None
+        completed_modules = 0
+        if progress_record:
+            progress = progress_record.progress_percentage
+            completed_modules = progress_record.completed_modules
+        course_data = {
+            'id': course.id,
+            'title': course.title,
+            'description': course.description,
+            'progress': progress,
+            'completed_modules': completed_modules
+        }
+        if summary:
+            course_data.update(summaries[course.id])
+        if course.id in trees:
+            modules = []
+            for module in trees[course.id]:
+                contents = []
+                for content in module['contents']:
+                    content_dict = {
+                        'id': content['id'],
+                        'title': content['title'],
+                        'content_type': content['content_type'],
+                    }
+                    contents.append(content_dict)
+                modules.append({
+                    'id': module['id'],
+                    'title': module['title'],
+                    'description': module['description'],
+                    'contents': contents
+                })
+            course_data['modules'] = modules
+            course_data['module_count'] = len(modules)
+        result.append(course_data)
+    
+    response = {'success': True, 'courses': result}
+    if limit is not None:
+        response['next_cursor'] = next_cursor
+    return jsonify(response), 200
+
+@courses_bp.route('/uploads/<path:filename>')
+def serve_uploaded_file(filename):
+
+    uploads_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+    return send_from_directory(uploads_dir, filename)
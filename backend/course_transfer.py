@@ -0,0 +1,292 @@
+"""
+Whole-course export and import as NDJSON (one JSON object per line).
+
+An export is one "course" line followed by every module, then every content,
+then every question, then every option:
+
+    {"type": "course", "format": 1, "title": ..., "description": ..., "status": ...}
+    {"type": "module", "ref": 7, "title": ..., "description": ..., "order": 1024}
+    {"type": "content", "ref": 31, "module_ref": 7, "title": ..., "content_type": "pdf",
+     "file_path": "uploads/...", "content": null, "order": 1024}
+    {"type": "question", "ref": 90, "content_ref": 33, "question_text": ...,
+     "question_type": "single-choice", "order": 1024}
+    {"type": "option", "question_ref": 90, "option_text": ..., "is_correct": true}
+
+"ref" values are the source ids and only link the lines together. Files are
+exported by reference (file_path). Importing on another server needs the
+uploads directory copied alongside.
+
+Both directions stream. The export reads rows in chunks of TRANSFER_BATCH_SIZE
+(a server-side cursor on PostgreSQL). The import reads the body line by line
+and inserts each level in executemany batches of the same size, all in one
+transaction. New ids come back through RETURNING in parameter order. PostgreSQL
+does this in one statement per batch; SQLite falls back to a row per statement
+for modules, contents and questions. Besides one batch of rows, the import keeps only the old-ref ->
+new-id map of the level currently being linked to.
+"""
+import json
+import os
+
+from sqlalchemy import func
+
+from models import db, Course, Module, ModuleContent, QuizQuestion, QuizOption
+
+EXPORT_FORMAT = 1
+TRANSFER_BATCH_SIZE = int(os.getenv('COURSE_TRANSFER_BATCH_SIZE', '1000'))
+
+# line type -> (parent line type, parent ref field, level order)
+_LEVELS = {
+    'module': (None, None, 1),
+    'content': ('module', 'module_ref', 2),
+    'question': ('content', 'content_ref', 3),
+    'option': ('question', 'question_ref', 4),
+}
+
+
+class CourseImportError(ValueError):
+    """Malformed import; ``line`` is the 1-based line number."""
+
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def _line(obj):
+    return json.dumps(obj, separators=(',', ':')) + '\n'
+
+
+def _stream(statement):
+    return db.session.execute(statement.execution_options(yield_per=TRANSFER_BATCH_SIZE))
+
+
+def export_course_lines(course_id):
+    """Yield the NDJSON lines of a course. The caller checks that the course exists."""
+    course = db.session.execute(
+        db.select(Course.title, Course.description, Course.status).where(Course.id == course_id)
+    ).one()
+    yield _line({'type': 'course', 'format': EXPORT_FORMAT, 'title': course.title,
+                 'description': course.description, 'status': course.status})
+
+    # Every level is listed in tree order, so an export of an import diffs cleanly
+    module_order = (Module.order, Module.id)
+    content_order = module_order + (ModuleContent.order, ModuleContent.id)
+    question_order = content_order + (QuizQuestion.order, QuizQuestion.id)
+
+    for row in _stream(
+        db.select(Module.id, Module.title, Module.description, Module.order)
+        .where(Module.course_id == course_id)
+        .order_by(*module_order)
+    ):
+        yield _line({'type': 'module', 'ref': row.id, 'title': row.title,
+                     'description': row.description, 'order': row.order})
+
+    for row in _stream(
+        db.select(ModuleContent.id, ModuleContent.module_id, ModuleContent.title, ModuleContent.content_type,
+                  ModuleContent.file_path, ModuleContent.content, ModuleContent.order)
+        .join(Module, Module.id == ModuleContent.module_id)
+        .where(Module.course_id == course_id)
+        .order_by(*content_order)
+    ):
+        yield _line({'type': 'content', 'ref': row.id, 'module_ref': row.module_id, 'title': row.title,
+                     'content_type': row.content_type, 'file_path': row.file_path,
+                     'content': row.content, 'order': row.order})
+
+    for row in _stream(
+        db.select(QuizQuestion.id, QuizQuestion.content_id, QuizQuestion.question_text,
+                  QuizQuestion.question_type, QuizQuestion.order)
+        .join(ModuleContent, ModuleContent.id == QuizQuestion.content_id)
+        .join(Module, Module.id == ModuleContent.module_id)
+        .where(Module.course_id == course_id)
+        .order_by(*question_order)
+    ):
+        yield _line({'type': 'question', 'ref': row.id, 'content_ref': row.content_id,
+                     'question_text': row.question_text, 'question_type': row.question_type,
+                     'order': row.order})
+
+    for row in _stream(
+        db.select(QuizOption.question_id, QuizOption.option_text, QuizOption.is_correct)
+        .join(QuizQuestion, QuizQuestion.id == QuizOption.question_id)
+        .join(ModuleContent, ModuleContent.id == QuizQuestion.content_id)
+        .join(Module, Module.id == ModuleContent.module_id)
+        .where(Module.course_id == course_id)
+        .order_by(*question_order, QuizOption.id)
+    ):
+        yield _line({'type': 'option', 'question_ref': row.question_id,
+                     'option_text': row.option_text, 'is_correct': bool(row.is_correct)})
+
+
+def _required(record, field, line):
+    value = record.get(field)
+    if value is None or value == '':
+        raise CourseImportError(line, f"'{field}' is required")
+    return value
+
+
+def _order(record, line):
+    try:
+        return int(record.get('order') or 0)
+    except (TypeError, ValueError):
+        raise CourseImportError(line, f"invalid order {record.get('order')!r}")
+
+
+def _row(kind, record, line, parent_id):
+    if kind == 'module':
+        return {'title': _required(record, 'title', line), 'description': record.get('description'),
+                'order': _order(record, line), 'course_id': parent_id}
+    if kind == 'content':
+        content_type = _required(record, 'content_type', line)
+        if content_type not in ('video', 'pdf', 'quiz'):
+            raise CourseImportError(line, f"invalid content_type '{content_type}'")
+        return {'title': _required(record, 'title', line), 'content_type': content_type,
+                'file_path': record.get('file_path'), 'content': record.get('content'),
+                'order': _order(record, line), 'module_id': parent_id}
+    if kind == 'question':
+        return {'question_text': _required(record, 'question_text', line),
+                'question_type': _required(record, 'question_type', line),
+                'order': _order(record, line), 'content_id': parent_id}
+    return {'option_text': _required(record, 'option_text', line),
+            'is_correct': bool(record.get('is_correct', False)), 'question_id': parent_id}
+
+
+_TABLES = {
+    'module': Module.__table__,
+    'content': ModuleContent.__table__,
+    'question': QuizQuestion.__table__,
+    'option': QuizOption.__table__,
+}
+
+
+def import_course_lines(lines):
+    """Create a new course from NDJSON lines in the current transaction.
+
+    Returns (course_id, counts). Raises CourseImportError on malformed input;
+    the caller rolls back.
+    """
+    counts = dict.fromkeys(_LEVELS, 0)
+    course_id = None
+    level = 0
+    parent_ids = {}  # refs of the level being linked to -> new ids
+    current_ids = {}  # refs of the level being inserted -> new ids
+    batch, batch_refs = [], []
+
+    def flush(kind):
+        if not batch:
+            return
+        table = _TABLES[kind]
+        if kind == 'option':
+            db.session.execute(table.insert(), batch)
+        else:
+            result = db.session.execute(table.insert().returning(table.c.id, sort_by_parameter_order=True), batch)
+            current_ids.update(zip(batch_refs, result.scalars()))
+        counts[kind] += len(batch)
+        batch.clear()
+        batch_refs.clear()
+
+    kind = None
+    for number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            raise CourseImportError(number, f"invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise CourseImportError(number, "expected a JSON object")
+        line_type = record.get('type')
+
+        if course_id is None:
+            if line_type != 'course':
+                raise CourseImportError(number, "the first line must be the course")
+            if record.get('format', EXPORT_FORMAT) != EXPORT_FORMAT:
+                raise CourseImportError(number, f"unsupported format {record.get('format')}")
+            course = Course(title=_required(record, 'title', number), description=record.get('description'),
+                            status=record.get('status') or 'draft')
+            db.session.add(course)
+            db.session.flush()
+            course_id = course.id
+            continue
+
+        if line_type not in _LEVELS:
+            raise CourseImportError(number, f"unknown line type '{line_type}'")
+        parent_type, parent_field, line_level = _LEVELS[line_type]
+        if line_level < level:
+            raise CourseImportError(number, f"'{line_type}' lines must come before '{kind}' lines")
+        if line_level > level + 1:
+            missing = next(t for t, (_, _, l) in _LEVELS.items() if l == level + 1)
+            raise CourseImportError(number, f"'{line_type}' lines must follow '{missing}' lines")
+        if line_level > level:
+            if kind:
+                flush(kind)
+            parent_ids, current_ids = current_ids, {}
+            level, kind = line_level, line_type
+
+        if parent_type is None:
+            parent_id = course_id
+        else:
+            parent_id = parent_ids.get(record.get(parent_field))
+            if parent_id is None:
+                raise CourseImportError(number, f"{parent_field} {record.get(parent_field)!r} does not match any {parent_type}")
+        batch.append(_row(line_type, record, number, parent_id))
+        if line_type != 'option':
+            ref = record.get('ref')
+            if ref is None:
+                raise CourseImportError(number, "'ref' is required")
+            batch_refs.append(ref)
+        if len(batch) >= TRANSFER_BATCH_SIZE:
+            flush(kind)
+
+    if course_id is None:
+        raise CourseImportError(0, "empty import")
+    if kind:
+        flush(kind)
+
+    # Bulk inserts skip the QuizQuestion mapper events, so set the counts in one statement
+    if counts['question']:
+        contents = ModuleContent.__table__
+        questions = QuizQuestion.__table__
+        db.session.execute(
+            contents.update()
+            .where(contents.c.module_id.in_(db.select(Module.id).where(Module.course_id == course_id)))
+            .values(question_count=db.select(func.count())
+                    .where(questions.c.content_id == contents.c.id)
+                    .scalar_subquery())
+        )
+    return course_id, counts
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import time
+
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Export or import a whole course as NDJSON')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export_parser = sub.add_parser('export', help='write a course to stdout or --output')
+    export_parser.add_argument('course_id', type=int)
+    export_parser.add_argument('--output')
+    import_parser = sub.add_parser('import', help='create a new course from an NDJSON file')
+    import_parser.add_argument('path')
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        if args.command == 'export':
+            if db.session.get(Course, args.course_id) is None:
+                sys.exit(f"❌ Course {args.course_id} not found")
+            out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            with out:
+                out.writelines(export_course_lines(args.course_id))
+        else:
+            start = time.perf_counter()
+            try:
+                with open(args.path, encoding='utf-8') as source:
+                    course_id, counts = import_course_lines(source)
+                db.session.commit()
+            except CourseImportError as e:
+                db.session.rollback()
+                sys.exit(f"❌ Import failed: {e}")
+            print(f"✅ Imported course {course_id} in {time.perf_counter() - start:.2f}s: "
+                  + ', '.join(f"{n} {kind}s" for kind, n in counts.items()))
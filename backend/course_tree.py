@@ -0,0 +1,114 @@
+"""
+Course-tree loader shared by the course and employee endpoints.
+
+One ordered query returns every module and content row for a set of courses.
+Walking course.modules -> module.contents instead lazy-loads each module's
+contents separately. The tree is made of plain dicts:
+
+    {course_id: [{'id', 'title', 'description', 'order', 'course_id',
+                  'contents': [{'id', 'title', 'content_type', 'file_path',
+                                'order', 'module_id', 'question_count'}, ...]}, ...]}
+
+Modules and contents are sorted by (order, id).
+"""
+from sqlalchemy import case, func
+
+from models import db, Module, ModuleContent
+
+CONTENT_TYPES = ('video', 'pdf', 'quiz')
+
+
+def _tree_rows(*criteria):
+    return db.session.execute(
+        db.select(
+            Module.id, Module.title, Module.description, Module.order, Module.course_id,
+            ModuleContent.id.label('content_id'), ModuleContent.title.label('content_title'),
+            ModuleContent.content_type, ModuleContent.file_path,
+            ModuleContent.order.label('content_order'), ModuleContent.question_count
+        )
+        .outerjoin(ModuleContent, ModuleContent.module_id == Module.id)
+        .where(*criteria)
+        .order_by(Module.course_id, Module.order, Module.id, ModuleContent.order, ModuleContent.id)
+    ).all()
+
+
+def load_course_trees(course_ids):
+    """Return {course_id: [module, ...]} for the given courses (every id present, possibly empty)."""
+    trees = {course_id: [] for course_id in course_ids}
+    if not trees:
+        return trees
+
+    modules = {}
+    for row in _tree_rows(Module.course_id.in_(list(trees))):
+        module = modules.get(row.id)
+        if module is None:
+            module = modules[row.id] = {
+                'id': row.id,
+                'title': row.title,
+                'description': row.description,
+                'order': row.order,
+                'course_id': row.course_id,
+                'contents': []
+            }
+            trees[row.course_id].append(module)
+        if row.content_id is not None:
+            module['contents'].append({
+                'id': row.content_id,
+                'title': row.content_title,
+                'content_type': row.content_type,
+                'file_path': row.file_path,
+                'order': row.content_order,
+                'module_id': row.id,
+                'question_count': row.question_count
+            })
+    return trees
+
+
+def load_course_tree(course_id):
+    return load_course_trees([course_id])[course_id]
+
+
+def load_module_contents(module_id):
+    """Ordered contents of one module, same shape as the tree's content entries."""
+    return [
+        {
+            'id': row.content_id,
+            'title': row.content_title,
+            'content_type': row.content_type,
+            'file_path': row.file_path,
+            'order': row.content_order,
+            'module_id': row.id,
+            'question_count': row.question_count
+        }
+        for row in _tree_rows(Module.id == module_id)
+        if row.content_id is not None
+    ]
+
+
+def load_course_summaries(course_ids):
+    """{course_id: {'module_count', 'content_count', 'content_counts': {type: n}}} in one grouped query."""
+    summaries = {
+        course_id: {'module_count': 0, 'content_count': 0, 'content_counts': dict.fromkeys(CONTENT_TYPES, 0)}
+        for course_id in course_ids
+    }
+    if not summaries:
+        return summaries
+
+    rows = db.session.execute(
+        db.select(
+            Module.course_id,
+            func.count(func.distinct(Module.id)),
+            func.count(ModuleContent.id),
+            *[func.sum(case((ModuleContent.content_type == content_type, 1), else_=0)) for content_type in CONTENT_TYPES]
+        )
+        .outerjoin(ModuleContent, ModuleContent.module_id == Module.id)
+        .where(Module.course_id.in_(list(summaries)))
+        .group_by(Module.course_id)
+    ).all()
+    for course_id, module_count, content_count, *type_counts in rows:
+        summaries[course_id] = {
+            'module_count': module_count,
+            'content_count': content_count,
+            'content_counts': {t: int(n or 0) for t, n in zip(CONTENT_TYPES, type_counts)}
+        }
+    return summaries
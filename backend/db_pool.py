@@ -0,0 +1,209 @@
+"""
+SQLAlchemy connection pool configuration and per-worker pool metrics.
+
+Pool options are read in this order, later sources winning:
+  1. the defaults below
+  2. SystemSettings rows in the 'database' category (applied at worker start)
+  3. DB_POOL_* / DB_STATEMENT_TIMEOUT_MS environment variables
+
+Every worker process has its own pool, so a node can open up to
+WEB_CONCURRENCY x (pool_size + max_overflow) connections. Unless configured,
+pool_size and max_overflow are derived so that this total fits in
+DB_MAX_CONNECTIONS (Postgres' default max_connections, 100) less
+DB_RESERVED_CONNECTIONS for job workers, migrations and psql sessions.
+/api/admin/db_pool_stats reports the total next to Postgres max_connections.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '100'))
+DB_RESERVED_CONNECTIONS = int(os.getenv('DB_RESERVED_CONNECTIONS', '10'))
+
+# setting key -> (environment variable, type, default); None = derived from the worker count
+POOL_SETTINGS = {
+    'pool_size': ('DB_POOL_SIZE', 'integer', None),
+    'max_overflow': ('DB_MAX_OVERFLOW', 'integer', None),
+    'pool_timeout': ('DB_POOL_TIMEOUT', 'integer', 30),
+    'pool_recycle': ('DB_POOL_RECYCLE', 'integer', 1800),
+    'pool_pre_ping': ('DB_POOL_PRE_PING', 'boolean', True),
+    'statement_timeout_ms': ('DB_STATEMENT_TIMEOUT_MS', 'integer', 30000),
+}
+
+_lock = threading.Lock()
+_stats = {
+    'checkouts': 0,
+    'checkins': 0,
+    'connects': 0,
+    'closes': 0,
+    'invalidations': 0,
+    'timeouts': 0,
+    'wait_ms_total': 0.0,
+    'wait_ms_max': 0.0,
+}
+
+
+def web_concurrency():
+    """Number of server workers: WEB_CONCURRENCY, else 2 x CPU cores + 1.
+
+    start_backend.py exports the value it uses before forking, so workers and
+    the stats endpoint count the same workers.
+    """
+    return int(os.getenv('WEB_CONCURRENCY') or (os.cpu_count() or 1) * 2 + 1)
+
+
+def default_pool_limits(workers=None):
+    """(pool_size, max_overflow) per worker so that all workers' pools fit in the connection budget."""
+    per_worker = max(1, (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) // (workers or web_concurrency()))
+    pool_size = min(10, max(1, per_worker // 2))
+    return pool_size, max(0, min(20, per_worker - pool_size))
+
+
+def _count(key, amount=1):
+    with _lock:
+        _stats[key] += amount
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _count('timeouts')
+            raise
+        finally:
+            waited = (time.perf_counter() - start) * 1000
+            with _lock:
+                _stats['wait_ms_total'] += waited
+                _stats['wait_ms_max'] = max(_stats['wait_ms_max'], waited)
+
+
+def _convert(value, data_type):
+    if data_type == 'boolean':
+        return str(value).lower() in ['true', '1', 'yes']
+    return int(value)
+
+
+def load_settings_from_database(uri):
+    """Read 'database' SystemSettings with a throwaway connection; {} if unavailable."""
+    from models import SystemSettings
+    table = SystemSettings.__table__
+    engine = create_engine(uri, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.setting_key, table.c.setting_value)
+                .where(table.c.category == 'database', table.c.is_active.is_(True))
+            ).all()
+        return {key: value for key, value in rows if key in POOL_SETTINGS and value not in (None, '')}
+    except Exception as e:
+        print(f"Pool settings not loaded from database: {str(e)}")
+        return {}
+    finally:
+        engine.dispose()
+
+
+def get_pool_settings(uri=None):
+    """Effective pool settings: defaults, then SystemSettings, then environment."""
+    database_settings = load_settings_from_database(uri) if uri else {}
+    derived = dict(zip(('pool_size', 'max_overflow'), default_pool_limits()))
+    settings = {}
+    for key, (env_var, data_type, default) in POOL_SETTINGS.items():
+        value = derived[key] if default is None else default
+        for source in (database_settings.get(key), os.getenv(env_var)):
+            if source not in (None, ''):
+                try:
+                    value = _convert(source, data_type)
+                except ValueError:
+                    print(f"Ignoring invalid value {source!r} for {key}")
+        settings[key] = value
+    return settings
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return {}
+
+    settings = get_pool_settings(uri)
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+        'pool_recycle': settings['pool_recycle'],
+        'pool_pre_ping': settings['pool_pre_ping'],
+    }
+    if uri.startswith('postgresql') and settings['statement_timeout_ms'] > 0:
+        options['connect_args'] = {'options': f"-c statement_timeout={settings['statement_timeout_ms']}"}
+    return options
+
+
+def instrument_engine(engine):
+    """Count connection churn on an engine's pool."""
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _count('checkouts')
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        _count('checkins')
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        _count('connects')
+
+    @event.listens_for(engine, 'close')
+    def on_close(dbapi_connection, connection_record):
+        _count('closes')
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        _count('invalidations')
+
+
+def init_app(app, db):
+    with app.app_context():
+        instrument_engine(db.engine)
+
+
+def pool_stats(engine):
+    """Live numbers for this worker's pool."""
+    pool = engine.pool
+    with _lock:
+        stats = dict(_stats)
+
+    data = {
+        'pid': os.getpid(),
+        'pool_class': type(pool).__name__,
+        'checkouts': stats['checkouts'],
+        'checkins': stats['checkins'],
+        'connects': stats['connects'],
+        'closes': stats['closes'],
+        'invalidations': stats['invalidations'],
+        'timeouts': stats['timeouts'],
+        # New connections per checkout: near 0 means the pool is reusing connections
+        'churn_rate': round(stats['connects'] / stats['checkouts'], 4) if stats['checkouts'] else 0,
+        'wait_ms_avg': round(stats['wait_ms_total'] / stats['checkouts'], 3) if stats['checkouts'] else 0,
+        'wait_ms_max': round(stats['wait_ms_max'], 3),
+    }
+    if isinstance(pool, QueuePool):
+        pool_size = pool.size()
+        max_overflow = pool._max_overflow
+        data.update({
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            # Negative while the pool has not yet opened pool_size connections
+            'overflow': pool.overflow(),
+            'max_connections_per_worker': pool_size + max_overflow,
+        })
+    return data
@@ -0,0 +1,142 @@
+"""
+Read-replica routing for reporting endpoints.
+
+Set DATABASE_REPLICA_URL to a streaming replica (or a SQLite snapshot of a
+SQLite primary) and decorate read-only views with ``@read_replica``. During
+those requests, queries run on the replica while anything that flushes still
+goes to the primary.
+
+Before a request is routed, the replica's staleness is checked (cached for
+DB_REPLICA_LAG_CHECK_SECONDS). If it is unreachable or more than
+DB_REPLICA_MAX_LAG_SECONDS behind, the request falls back to the primary.
+Each response says which database served it in the X-DB-Route header.
+
+This module must not import models: models.py builds ``db`` with RoutingSession.
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+_lock = threading.Lock()
+_stats = {'replica': 0, 'primary_fallback': 0, 'lag_checks': 0, 'lag_check_errors': 0}
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica engine while the current request opted in with @read_replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('db_route') == 'replica':
+            return current_app.extensions['lms_replica']['engine']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_lag_seconds(engine):
+    """Seconds the replica is behind its primary (0 when it is caught up)."""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            lag = conn.execute(text(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() "
+                "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )).scalar()
+        return float(lag or 0)
+    if engine.dialect.name == 'sqlite':
+        # A snapshot is as stale as the last time it was copied
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        return max(0.0, time.time() - os.path.getmtime(engine.url.database))
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    return 0.0
+
+
+def replica_is_usable():
+    """True when the replica is configured, reachable and fresh enough."""
+    replica = current_app.extensions.get('lms_replica')
+    if not replica:
+        return False
+
+    now = time.monotonic()
+    with _lock:
+        if now - replica['checked_at'] < replica['check_interval']:
+            return replica['usable']
+        replica['checked_at'] = now
+
+    try:
+        lag = _replica_lag_seconds(replica['engine'])
+        usable = lag <= replica['max_lag']
+        if not usable:
+            print(f"Replica is {lag:.1f}s behind (limit {replica['max_lag']}s), using primary")
+    except Exception as e:
+        lag = None
+        usable = False
+        _stats['lag_check_errors'] += 1
+        print(f"Replica unavailable, using primary: {str(e)}")
+
+    with _lock:
+        _stats['lag_checks'] += 1
+        replica['lag'] = lag
+        replica['usable'] = usable
+    return usable
+
+
+def read_replica(view):
+    """Route a read-only view's queries to the replica when it is usable."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_is_usable():
+            g.db_route = 'replica'
+            _stats['replica'] += 1
+        else:
+            g.db_route = 'primary'
+            if 'lms_replica' in current_app.extensions:
+                _stats['primary_fallback'] += 1
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def replica_stats():
+    replica = current_app.extensions.get('lms_replica')
+    if not replica:
+        return {'configured': False}
+    return {
+        'configured': True,
+        'url': replica['engine'].url.render_as_string(hide_password=True),
+        'usable': replica['usable'],
+        'lag_seconds': replica['lag'],
+        'max_lag_seconds': replica['max_lag'],
+        'requests_on_replica': _stats['replica'],
+        'requests_on_primary_fallback': _stats['primary_fallback'],
+        'lag_checks': _stats['lag_checks'],
+        'lag_check_errors': _stats['lag_check_errors'],
+    }
+
+
+def init_app(app):
+    replica_url = app.config.get('SQLALCHEMY_REPLICA_URI') or os.getenv('DATABASE_REPLICA_URL')
+    if replica_url:
+        from db_pool import engine_options
+        options = engine_options(replica_url)
+        if options:
+            # Keep the primary's pool metrics separate from the replica's
+            options['poolclass'] = QueuePool
+        app.extensions['lms_replica'] = {
+            'engine': create_engine(replica_url, **options),
+            'max_lag': float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '30')),
+            'check_interval': float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', '5')),
+            'checked_at': float('-inf'),
+            'usable': False,
+            'lag': None,
+        }
+
+    @app.after_request
+    def add_db_route_header(response):
+        if g.get('db_route'):
+            response.headers['X-DB-Route'] = g.db_route
+        return response
@@ -0,0 +1,35 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT for PostgreSQL and SQLite.
+
+dialect_insert(table) is the dialect's own insert(), which has
+on_conflict_do_nothing() and on_conflict_do_update(). Other databases get the
+plain insert(); insert_ignore() falls back to INSERT IGNORE (MySQL) there.
+"""
+from sqlalchemy import true
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db
+
+_DIALECT_INSERT = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def dialect_insert(table, bind=None):
+    dialect = (bind or db.session.get_bind()).dialect.name
+    return _DIALECT_INSERT.get(dialect, lambda t: t.insert())(table)
+
+
+def supports_on_conflict(bind=None):
+    return (bind or db.session.get_bind()).dialect.name in _DIALECT_INSERT
+
+
+def insert_ignore(table, columns, rows):
+    """INSERT INTO table (columns) <rows select> skipping rows that already exist; returns rows inserted."""
+    if supports_on_conflict():
+        statement = dialect_insert(table).on_conflict_do_nothing()
+    else:
+        statement = table.insert().prefix_with('IGNORE')
+    # The WHERE keeps SQLite from reading the upsert's ON CONFLICT as a join constraint
+    return db.session.execute(statement.from_select(columns, rows.where(true()))).rowcount
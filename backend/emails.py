@@ -0,0 +1,123 @@
+"""
+Outgoing email helpers.
+
+flask_mail is imported on first send rather than at app import, so workers
+that never send mail do not pay for it at boot.
+"""
+from flask import current_app
+import string
+import secrets
+
+def get_mail():
+    """Return the Mail extension for the current app, initialising it on first use."""
+    state = current_app.extensions.get('lms_mail')
+    if state is None:
+        from flask_mail import Mail
+        state = current_app.extensions['lms_mail'] = Mail(current_app)
+    return state
+
+def generate_temp_password(length=12):
+    """Generate a secure temporary password"""
+    characters = string.ascii_letters + string.digits + "!@#$%^&*"
+    return ''.join(secrets.choice(characters) for _ in range(length))
+
+def send_invite_email(user_email, user_name, org_name, temp_password, login_url="http://localhost:5174/login"):
+    """Send invitation email to new employee"""
+    try:
+        from flask_mail import Message
+        msg = Message(
+            subject=f'Welcome to {org_name} - Learning Management Portal',
+            recipients=[user_email],
+            html=f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="UTF-8">
+                <title>Welcome to {org_name}</title>
+            </head>
+            <body>
+                <h1>Welcome to {org_name}</h1>
+                <p>Dear {user_name},</p>
+                <p>You have been invited to join {org_name} on our Learning Management System.</p>
+                <p><strong>Email:</strong> {user_email}</p>
+                <p><strong>Temporary Password:</strong> {temp_password}</p>
+                <p><a href="{login_url}">Login to Portal</a></p>
+                <p>Please change your password after your first login.</p>
+                <p>Best regards,<br>The {org_name} Team</p>
+            </body>
+            </html>
+            """,
+            body=f"""Welcome to {org_name}
+
+Dear {user_name},
+
+You have been invited to join {org_name} on our Learning Management System.
+
+Email: {user_email}
+Temporary Password: {temp_password}
+Login URL: {login_url}
+
+Please change your password after your first login.
+
+Best regards,
+The {org_name} Team"""
+        )
+        
+        get_mail().send(msg)
+        return True, "Email sent successfully"
+        
+    except Exception as e:
+        print(f"Failed to send email: {str(e)}")
+        return False, f"Failed to send email: {str(e)}"
+
+def send_password_reset_email(user_email, user_name, org_name, new_password, reset_type="Password Reset"):
+    """Send password reset email"""
+    try:
+        from flask_mail import Message
+        msg = Message(
+            subject=f'{reset_type} - {org_name} Learning Portal',
+            recipients=[user_email],
+            html=f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="UTF-8">
+                <title>{reset_type} - {org_name}</title>
+            </head>
+            <body>
+                <h1>{reset_type} - {org_name}</h1>
+                <p>Dear {user_name},</p>
+                <p>Your password has been reset for the {org_name} Learning Management System.</p>
+                <p><strong>Email:</strong> {user_email}</p>
+                <p><strong>New Password:</strong> {new_password}</p>
+                <p><a href="http://localhost:5173/login">Login to Portal</a></p>
+                <p><strong>Important:</strong> Please change your password after logging in for security.</p>
+                <p>If you did not request this password reset, please contact your administrator immediately.</p>
+                <p>Best regards,<br>The {org_name} Team</p>
+            </body>
+            </html>
+            """,
+            body=f"""{reset_type} - {org_name}
+
+Dear {user_name},
+
+Your password has been reset for the {org_name} Learning Management System.
+
+Email: {user_email}
+New Password: {new_password}
+Login URL: http://localhost:5173/login
+
+Important: Please change your password after logging in for security.
+
+If you did not request this password reset, please contact your administrator immediately.
+
+Best regards,
+The {org_name} Team"""
+        )
+        
+        get_mail().send(msg)
+        return True, "Password reset email sent successfully"
+        
+    except Exception as e:
+        print(f"Failed to send password reset email: {str(e)}")
+        return False, f"Failed to send email: {str(e)}"
@@ -1,6 +1,6 @@
 from app import app, db
 from models import User, Organization, Course, Module, ModuleContent, QuizQuestion, QuizOption
-from models import Task, CourseRequest, CourseProgress, SystemSettings, AuditLog, EmailTemplate, SystemAnnouncement
+from models import Task, CourseRequest, CourseProgress, ModuleCompletion, SystemSettings, AuditLog, EmailTemplate, SystemAnnouncement
 from models import UserSession, PageView, QuizAttempt, ContentInteraction, CourseEnrollment, SystemMetrics, EmailMetrics, FeatureUsage, APIUsage
 import datetime
 import bcrypt
@@ -206,13 +206,11 @@ with app.app_context():
         course_id=course1.id,
         completed_modules=1,
         total_modules=2,
-        progress_percentage=50.0,
-        module_progress=json.dumps({
-            str(module1.id): {"completed": True, "completion_date": datetime.datetime.now().isoformat()},
-            str(module2.id): {"completed": False, "completion_date": None}
-        })
+        progress_percentage=50.0
     )
     db.session.add(progress)
+    db.session.add(ModuleCompletion(user_id=employee.id, course_id=course1.id, module_id=module1.id,
+                                    completed_at=datetime.datetime.utcnow()))
     
     # Create course request
     request = CourseRequest(
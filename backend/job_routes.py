@@ -0,0 +1,66 @@
+from flask import Blueprint, jsonify, request
+from models import db, BackgroundJob
+from principal_cache import resolve_principal
+from jobs import job_dict, request_cancel
+
+jobs_bp = Blueprint('jobs', __name__)
+
+JOBS_DEFAULT_LIMIT = 20
+JOBS_MAX_LIMIT = 100
+
+def _caller():
+    """(principal, None) for an admin or portal admin caller, else (None, error response)."""
+    username = request.args.get('username') or (request.get_json(silent=True) or {}).get('username')
+    if not username:
+        return None, (jsonify({'success': False, 'error': 'Username is required'}), 400)
+    user = resolve_principal(username)
+    if not user or user.role not in ('admin', 'portal_admin'):
+        return None, (jsonify({'success': False, 'error': 'Unauthorized access - Admin role required'}), 403)
+    return user, None
+
+def _visible_job(job_id, user):
+    """The job if this caller may see it: admins see every job, portal admins the jobs they started."""
+    job = db.session.get(BackgroundJob, job_id)
+    if job and user.role == 'portal_admin' and job.created_by != user.username:
+        return None
+    return job
+
+@jobs_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a background job: status, progress percentage, and result once finished"""
+    user, error = _caller()
+    if error:
+        return error
+    job = _visible_job(job_id, user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job_dict(job)}), 200
+
+@jobs_bp.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued job, or stop a running one at its next step (completed steps are kept)"""
+    user, error = _caller()
+    if error:
+        return error
+    job = _visible_job(job_id, user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not request_cancel(job):
+        return jsonify({'success': False, 'error': f'Job already {job.status}'}), 409
+    return jsonify({'success': True, 'job': job_dict(job)}), 200
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Most recent jobs first; filter with status=, kind= and created_by= (portal admins see their own)"""
+    user, error = _caller()
+    if error:
+        return error
+    limit = max(1, min(request.args.get('limit', JOBS_DEFAULT_LIMIT, type=int), JOBS_MAX_LIMIT))
+    query = BackgroundJob.query
+    if user.role == 'portal_admin':
+        query = query.filter(BackgroundJob.created_by == user.username)
+    for field in ('status', 'kind', 'created_by'):
+        if request.args.get(field):
+            query = query.filter(getattr(BackgroundJob, field) == request.args[field])
+    jobs = query.order_by(BackgroundJob.id.desc()).limit(limit).all()
+    return jsonify({'success': True, 'jobs': [job_dict(job) for job in jobs]}), 200
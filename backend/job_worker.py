@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Run queued background jobs (see jobs.py).
+
+Start one or more of these next to the web server; they share the queue
+through the database, so any number can run. SIGTERM or Ctrl+C stops the
+worker at the current job's next step and puts the job back in the queue for
+another worker to finish.
+
+    python job_worker.py                   # run until stopped
+    python job_worker.py --once            # run every queued job, then exit
+    python job_worker.py --poll-interval 5
+"""
+import argparse
+import os
+import signal
+import socket
+import time
+
+from models import db
+from jobs import claim_next, run_job, requeue_stale_jobs
+
+STALE_CHECK_INTERVAL = 60
+
+_stopping = False
+
+
+def _stop(signum, frame):
+    global _stopping
+    if _stopping:
+        raise KeyboardInterrupt
+    _stopping = True
+    print("⏳ Stopping after the current step (signal again to force)")
+
+
+def work(poll_interval=2.0, once=False):
+    """Claim and run jobs until stopped (or, with once, until the queue is empty). Returns jobs run."""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"👷 Worker {worker} polling every {poll_interval}s")
+    jobs_run = 0
+    last_stale_check = 0.0
+    while not _stopping:
+        if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+            requeued, failed = requeue_stale_jobs()
+            if requeued or failed:
+                print(f"♻️  Requeued {requeued} and failed {failed} job(s) left by stopped workers")
+            last_stale_check = time.monotonic()
+
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        start = time.perf_counter()
+        print(f"▶️  Job {job.id} ({job.kind}), attempt {job.attempts}")
+        status = run_job(job, should_stop=lambda: _stopping)
+        jobs_run += 1
+        icon = {'succeeded': '✅', 'queued': '⏸️ ', 'cancelled': '🛑'}.get(status, '❌')
+        print(f"{icon} Job {job.id} {status} in {time.perf_counter() - start:.2f}s"
+              + (f": {job.error}" if status == 'failed' else ''))
+        db.session.remove()
+    return jobs_run
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Run queued background jobs')
+    parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+    parser.add_argument('--poll-interval', type=float, default=float(os.getenv('JOB_POLL_INTERVAL', '2')),
+                        help='seconds between polls of an empty queue')
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    with create_app().app_context():
+        jobs_run = work(args.poll_interval, args.once)
+    print(f"\n👋 Worker stopped after {jobs_run} job(s)")
@@ -0,0 +1,303 @@
+"""
+Durable background jobs for bulk admin operations.
+
+An endpoint enqueues a BackgroundJob row and answers at once with its id.
+job_worker.py processes claim queued jobs, run the handler registered for the
+job's kind, and record progress on the row. Clients poll GET /api/jobs/<id>
+and may cancel with POST /api/jobs/<id>/cancel (see job_routes.py).
+
+Handlers work in steps and call ctx.step(done, total) between them. Each step
+commits the work so far together with the job's progress. Steps are also where
+a cancellation or a worker shutdown takes effect. Completed steps stay, and
+every handler can be run again to finish the job, which is how a job
+interrupted by a shutdown resumes. A running job whose worker has not
+reported for JOB_STALE_SECONDS is requeued, up to JOB_MAX_ATTEMPTS runs.
+"""
+import datetime
+import json
+import os
+
+from sqlalchemy import false, select, update
+
+from models import (db, User, Organization, CourseRequest, CourseProgress, UserSession, PageView,
+                    QuizAttempt, ContentInteraction, ModuleCompletion, BackgroundJob)
+from course_access import has_course_clause
+from course_assignments import (employee_id_chunks, org_employee_ids, remove_org_courses, sync_org_courses,
+                                unassign_courses, delete_user_course_rows)
+from principal_cache import invalidate_organization_principals
+from password_hashing import hash_password
+from emails import generate_temp_password, send_invite_email
+
+JOB_CHUNK_SIZE = int(os.getenv('JOB_CHUNK_SIZE', '500'))
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '300'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+_handlers = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobInterrupted(Exception):
+    """The worker is shutting down; the job goes back to the queue."""
+
+
+def job_handler(kind):
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    def __init__(self, job, should_stop=None):
+        self.job = job
+        self.should_stop = should_stop or (lambda: False)
+
+    def step(self, done, total, message=None):
+        """Commit the work so far with the job's progress, then honour cancel and shutdown."""
+        self.job.progress = min(100, int(done * 100 / total)) if total else 100
+        self.job.heartbeat_at = datetime.datetime.utcnow()
+        if message is not None:
+            self.job.message = message[:255]
+        db.session.commit()
+        if self.job.cancel_requested:  # reloaded by the commit, so a cancel from the API shows up here
+            raise JobCancelled()
+        if self.should_stop():
+            raise JobInterrupted()
+
+
+def enqueue(kind, payload, created_by=None):
+    """Add a queued job. The caller commits."""
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+    job = BackgroundJob(kind=kind, payload=json.dumps(payload), created_by=created_by)
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def job_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'cancel_requested': job.cancel_requested,
+        'attempts': job.attempts,
+        'created_by': job.created_by,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def request_cancel(job):
+    """Cancel a queued job now, or ask its worker to stop a running one. Returns False if it already finished."""
+    if job.status in FINISHED_STATUSES:
+        return False
+    cancelled = db.session.execute(
+        update(BackgroundJob).where(BackgroundJob.id == job.id, BackgroundJob.status == 'queued')
+        .values(status='cancelled', cancel_requested=True, finished_at=datetime.datetime.utcnow())
+    ).rowcount
+    if not cancelled:
+        job.cancel_requested = True
+    db.session.commit()
+    return True
+
+
+def claim_next(worker):
+    """Mark the oldest queued job as running for this worker and return it, or None."""
+    while True:
+        job_id = db.session.execute(
+            select(BackgroundJob.id).where(BackgroundJob.status == 'queued').order_by(BackgroundJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        now = datetime.datetime.utcnow()
+        # Conditional UPDATE: of several workers racing for the same row only one matches
+        claimed = db.session.execute(
+            update(BackgroundJob).where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+            .values(status='running', worker=worker, attempts=BackgroundJob.attempts + 1,
+                    started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(BackgroundJob, job_id)
+
+
+def requeue_stale_jobs():
+    """Requeue running jobs whose worker went silent, or fail them after JOB_MAX_ATTEMPTS runs."""
+    now = datetime.datetime.utcnow()
+    stale = (BackgroundJob.status == 'running') & (
+        BackgroundJob.heartbeat_at < now - datetime.timedelta(seconds=JOB_STALE_SECONDS))
+    requeued = db.session.execute(
+        update(BackgroundJob).where(stale, BackgroundJob.attempts < JOB_MAX_ATTEMPTS)
+        .values(status='queued', worker=None)
+    ).rowcount
+    failed = db.session.execute(
+        update(BackgroundJob).where(stale)
+        .values(status='failed', error='Worker stopped responding', finished_at=now)
+    ).rowcount
+    db.session.commit()
+    return requeued, failed
+
+
+def _finish(job, status, **values):
+    job.status = status
+    job.finished_at = datetime.datetime.utcnow()
+    for key, value in values.items():
+        setattr(job, key, value)
+    db.session.commit()
+
+
+def run_job(job, should_stop=None):
+    """Run a claimed job to the end (or until cancelled or interrupted) and record the outcome."""
+    try:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            raise ValueError(f'Unknown job kind: {job.kind}')
+        if job.cancel_requested:
+            raise JobCancelled()
+        result = handler(JobContext(job, should_stop), **json.loads(job.payload))
+        db.session.commit()
+        _finish(job, 'succeeded', progress=100, result=json.dumps(result))
+    except JobCancelled:
+        db.session.rollback()
+        _finish(job, 'cancelled', message='Cancelled; completed steps were kept')
+    except JobInterrupted:
+        db.session.rollback()
+        job.status = 'queued'
+        job.worker = None
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        _finish(job, 'failed', error=str(e))
+    return job.status
+
+
+def _employee_count(org_id):
+    return db.session.execute(db.select(db.func.count()).select_from(org_employee_ids(org_id).subquery())).scalar()
+
+
+def delete_org_users(user_ids):
+    """Delete users and everything recorded for them (progress, attempts, sessions, course rows)."""
+    for model in (ContentInteraction, QuizAttempt, UserSession, PageView, CourseProgress, ModuleCompletion):
+        model.query.filter(model.user_id.in_(user_ids)).delete(synchronize_session=False)
+    delete_user_course_rows(list(user_ids))
+    db.session.flush()
+    for user in User.query.filter(User.id.in_(user_ids)).all():
+        db.session.delete(user)
+    db.session.flush()
+
+
+def delete_org_course_requests(org_id):
+    """Delete an organization's course requests (they reference its users, so they go first)."""
+    return CourseRequest.query.filter_by(organization_id=org_id).delete(synchronize_session=False)
+
+
+def delete_org_record(org):
+    """Delete an organization once its users and course requests are gone."""
+    org.courses.clear()
+    db.session.flush()
+    db.session.delete(org)
+
+
+@job_handler('delete_organization')
+def delete_organization_job(ctx, org_id):
+    org = db.session.get(Organization, org_id)
+    if not org:
+        return {'deleted': False, 'users_deleted': 0}
+    total = db.session.execute(db.select(db.func.count()).where(User.org_id == org_id)).scalar()
+    course_requests = delete_org_course_requests(org_id)
+    ctx.step(0, total + 1, 'Deleted course requests')
+    deleted = 0
+    while True:
+        user_ids = list(db.session.execute(
+            select(User.id).where(User.org_id == org_id).order_by(User.id).limit(JOB_CHUNK_SIZE)
+        ).scalars())
+        if not user_ids:
+            break
+        delete_org_users(user_ids)
+        deleted += len(user_ids)
+        ctx.step(deleted, total + 1, f'Deleted {deleted} of {total} users')
+    delete_org_record(db.session.get(Organization, org_id))
+    db.session.commit()
+    invalidate_organization_principals(org_id)
+    return {'deleted': True, 'users_deleted': deleted, 'course_requests_deleted': course_requests}
+
+
+@job_handler('assign_courses_to_organization')
+def assign_courses_to_organization_job(ctx, org_id, course_ids):
+    total = _employee_count(org_id)
+    # Replace the course set first, then clean the employees' overrides chunk by chunk
+    result = sync_org_courses(org_id, course_ids, employees=org_employee_ids(org_id).where(false()))
+    ctx.step(0, total, 'Course set updated')
+    done = 0
+    for employees in employee_id_chunks(org_id, JOB_CHUNK_SIZE):
+        synced = sync_org_courses(org_id, employees=employees)
+        result['rows_deleted'] += synced['rows_deleted']
+        done = min(done + JOB_CHUNK_SIZE, total)
+        ctx.step(done, total, f'Updated {done} of {total} employees')
+    result['employees_updated'] = total
+    del result['elapsed_ms']
+    return result
+
+
+@job_handler('unassign_course_from_organization')
+def unassign_course_from_organization_job(ctx, org_id, course_id):
+    employees_updated = db.session.execute(
+        db.select(db.func.count()).select_from(User)
+        .where(User.org_id == org_id, User.role == 'employee', has_course_clause(User.id, User.org_id, course_id))
+    ).scalar()
+    total = _employee_count(org_id)
+    # Grants go first and the organization row last, so a cancelled job leaves nobody a stray grant
+    done = 0
+    for employees in employee_id_chunks(org_id, JOB_CHUNK_SIZE):
+        unassign_courses(employees, [course_id])
+        done = min(done + JOB_CHUNK_SIZE, total)
+        ctx.step(done, total + 1, f'Updated {done} of {total} employees')
+    detached = remove_org_courses(org_id, [course_id])
+    return {'detached': bool(detached), 'employees_updated': employees_updated}
+
+
+@job_handler('invite_employees')
+def invite_employees_job(ctx, org_id, invites):
+    """Create and email each invited employee. Temporary passwords are only sent by email."""
+    organization = db.session.get(Organization, org_id)
+    results = []
+    for i, invite in enumerate(invites):
+        email = (invite.get('email') or '').strip().lower()
+        designation = (invite.get('designation') or '').strip()
+        username = email.split('@')[0]
+        outcome = {'email': email, 'status': 'skipped'}
+        if '@' not in email or '.' not in email or not designation:
+            outcome['reason'] = 'A valid email and a designation are required'
+        elif User.query.filter((User.username == username) | (User.email == email)).first():
+            outcome['reason'] = 'User already exists'
+        else:
+            temp_password = generate_temp_password()
+            user = User(username=username, password=hash_password(temp_password), email=email,
+                        designation=designation, org_id=org_id, role='employee')
+            db.session.add(user)
+            db.session.commit()
+            email_sent, email_message = send_invite_email(
+                user_email=email,
+                user_name=username.replace('.', ' ').replace('_', ' ').title(),
+                org_name=organization.name,
+                temp_password=temp_password
+            )
+            outcome.update(status='invited', user_id=user.id, email_sent=email_sent, email_message=email_message)
+        results.append(outcome)
+        ctx.step(i + 1, len(invites), f'Processed {i + 1} of {len(invites)} invites')
+    return {
+        'invited': sum(1 for r in results if r['status'] == 'invited'),
+        'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+        'invites': results,
+    }
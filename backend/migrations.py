@@ -0,0 +1,259 @@
+"""
+Schema migrations for existing databases.
+
+init_db.py drops and recreates every table from models.py. This script brings
+an existing database up to date without losing data. New tables come from
+db.create_all(). Changes to existing tables are the steps below. They run
+once each, in order, and are recorded in the schema_migrations table. Steps
+are written to be safe on a database that create_all() just built.
+
+    python migrations.py           # apply pending migrations
+    python migrations.py --list    # show applied and pending migrations
+    python migrations.py --backfill-question-counts   # repair ModuleContent.question_count
+    python migrations.py --backfill-module-completions   # copy module_progress JSON again
+"""
+import argparse
+import datetime
+import json
+
+from sqlalchemy import func, inspect, select, text
+
+from models import (db, User, Module, ModuleContent, QuizQuestion, QuizAttempt, CourseProgress, ModuleCompletion,
+                    organization_courses, user_courses, course_revocations)
+from db_upsert import dialect_insert, supports_on_conflict
+
+
+def _add_column(conn, table, column, ddl):
+    if column not in {c['name'] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def add_course_content_version(conn):
+    _add_column(conn, 'course', 'content_version', 'INTEGER NOT NULL DEFAULT 1')
+
+
+def backfill_question_counts(conn):
+    """Recompute ModuleContent.question_count from quiz_question with one GROUP BY."""
+    contents = ModuleContent.__table__
+    questions = QuizQuestion.__table__
+    counts = (
+        select(questions.c.content_id, func.count().label('question_count'))
+        .group_by(questions.c.content_id)
+        .subquery()
+    )
+    updated = conn.execute(
+        contents.update()
+        .where(contents.c.id == counts.c.content_id)
+        .where(contents.c.question_count != counts.c.question_count)
+        .values(question_count=counts.c.question_count)
+    ).rowcount
+    cleared = conn.execute(
+        contents.update()
+        .where(contents.c.question_count != 0)
+        .where(~contents.c.id.in_(select(questions.c.content_id)))
+        .values(question_count=0)
+    ).rowcount
+    return updated + cleared
+
+
+def add_module_content_question_count(conn):
+    _add_column(conn, 'module_content', 'question_count', 'INTEGER NOT NULL DEFAULT 0')
+    backfill_question_counts(conn)
+
+
+def derive_course_revocations(conn):
+    """Switch employees from per-employee course rows to organization courses plus overrides.
+
+    Until now an employee in an organization saw the user_courses rows that
+    are also organization courses. Afterwards they see the organization's
+    courses, plus grants, minus course_revocations (see course_access.py). To
+    keep every employee's courses exactly as they were, a revocation is added
+    for each organization course the employee had no row for. Rows for courses
+    outside the organization are deleted. The remaining rows are now redundant
+    grants; sync_employee_courses.py removes them.
+    """
+    users = User.__table__
+    employees = select(users.c.id).where(users.c.org_id.is_not(None), users.c.role == 'employee')
+    org_course = select(organization_courses.c.course_id).where(
+        organization_courses.c.organization_id == users.c.org_id,
+        organization_courses.c.course_id == user_courses.c.course_id,
+    )
+    conn.execute(user_courses.delete().where(
+        user_courses.c.user_id.in_(employees),
+        ~org_course.where(users.c.id == user_courses.c.user_id).exists(),
+    ))
+    conn.execute(course_revocations.insert().from_select(
+        ['user_id', 'course_id'],
+        select(users.c.id, organization_courses.c.course_id)
+        .select_from(users.join(organization_courses, organization_courses.c.organization_id == users.c.org_id))
+        .where(users.c.id.in_(employees))
+        .where(~select(user_courses.c.user_id).where(
+            user_courses.c.user_id == users.c.id,
+            user_courses.c.course_id == organization_courses.c.course_id,
+        ).exists())
+    ))
+
+
+def _completion_date(entry, default):
+    try:
+        return datetime.datetime.fromisoformat(entry['completion_date'])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def backfill_module_completions(conn, batch_size=1000):
+    """Copy completed modules from CourseProgress.module_progress JSON into module_completion.
+
+    Progress rows are read in id batches. Entries for modules that no longer
+    exist, or that belong to another course, are skipped. Rows already in
+    module_completion are kept, so this is safe to run again.
+    """
+    progress = CourseProgress.__table__
+    completions = ModuleCompletion.__table__
+    module_course = dict(conn.execute(select(Module.__table__.c.id, Module.__table__.c.course_id)).all())
+    if supports_on_conflict(conn):
+        insert = dialect_insert(completions, conn).on_conflict_do_nothing()
+    else:
+        insert = completions.insert().prefix_with('IGNORE')
+    copied, last_id = 0, 0
+    while True:
+        rows = conn.execute(
+            select(progress.c.id, progress.c.user_id, progress.c.course_id, progress.c.module_progress,
+                   progress.c.last_activity)
+            .where(progress.c.id > last_id).order_by(progress.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return copied
+        last_id = rows[-1].id
+        values = {}
+        for row in rows:
+            try:
+                entries = json.loads(row.module_progress or '{}')
+            except ValueError:
+                continue
+            for module_id, entry in (entries.items() if isinstance(entries, dict) else ()):
+                if not str(module_id).isdigit() or module_course.get(int(module_id)) != row.course_id:
+                    continue
+                if isinstance(entry, dict) and not entry.get('completed', True):
+                    continue
+                completed_at = _completion_date(entry if isinstance(entry, dict) else {},
+                                                row.last_activity or datetime.datetime.utcnow())
+                values[(row.user_id, row.course_id, int(module_id))] = completed_at
+        if values:
+            copied += conn.execute(insert, [
+                {'user_id': user_id, 'course_id': course_id, 'module_id': module_id, 'completed_at': completed_at}
+                for (user_id, course_id, module_id), completed_at in values.items()
+            ]).rowcount
+
+
+def dedupe_course_progress(conn):
+    """Merge duplicate CourseProgress rows per (user, course), then add the unique index.
+
+    The oldest row is kept. It takes the latest activity, the earliest
+    completion date and the largest module total of its duplicates, and its
+    completed_modules is recounted from module_completion.
+    """
+    progress = CourseProgress.__table__
+    completions = ModuleCompletion.__table__
+    duplicates = conn.execute(
+        select(progress.c.user_id, progress.c.course_id)
+        .group_by(progress.c.user_id, progress.c.course_id).having(func.count() > 1)
+    ).all()
+    for user_id, course_id in duplicates:
+        rows = conn.execute(
+            select(progress).where(progress.c.user_id == user_id, progress.c.course_id == course_id)
+            .order_by(progress.c.id)
+        ).all()
+        keep = rows[0]
+        completed = conn.execute(select(func.count()).where(
+            completions.c.user_id == user_id, completions.c.course_id == course_id)).scalar()
+        total = max(row.total_modules or 0 for row in rows)
+        activity = [row.last_activity for row in rows if row.last_activity]
+        completion = [row.completion_date for row in rows if row.completion_date]
+        conn.execute(progress.update().where(progress.c.id == keep.id).values(
+            completed_modules=completed,
+            total_modules=total,
+            progress_percentage=completed / total * 100 if total else keep.progress_percentage,
+            last_activity=max(activity) if activity else None,
+            completion_date=min(completion) if completion else None,
+        ))
+        conn.execute(progress.delete().where(progress.c.id.in_([row.id for row in rows[1:]])))
+    for index in progress.indexes:
+        if index.name == 'uq_course_progress_user_course':
+            index.create(conn, checkfirst=True)
+
+
+def add_quiz_attempt_user_index(conn):
+    for index in QuizAttempt.__table__.indexes:
+        if index.name == 'ix_quiz_attempt_user_content':
+            index.create(conn, checkfirst=True)
+
+
+# (name, step) in the order they must run. Never rename or reorder applied steps.
+MIGRATIONS = [
+    ('0001_course_content_version', add_course_content_version),
+    ('0002_module_content_question_count', add_module_content_question_count),
+    ('0003_course_revocations', derive_course_revocations),
+    ('0004_module_completion', backfill_module_completions),
+    ('0005_course_progress_unique', dedupe_course_progress),
+    ('0006_quiz_attempt_user_index', add_quiz_attempt_user_index),
+]
+
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'name VARCHAR(120) PRIMARY KEY, applied_at TIMESTAMP NOT NULL)'
+    ))
+
+
+def applied_migrations():
+    with db.engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        return {row[0] for row in conn.execute(text('SELECT name FROM schema_migrations'))}
+
+
+def run_migrations():
+    """Create missing tables, then apply pending steps, each in its own transaction."""
+    db.create_all()
+    done = applied_migrations()
+    applied = []
+    for name, step in MIGRATIONS:
+        if name in done:
+            continue
+        print(f"Applying {name}...")
+        with db.engine.begin() as conn:
+            step(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (name, applied_at) VALUES (:name, :applied_at)'),
+                {'name': name, 'applied_at': datetime.datetime.utcnow()}
+            )
+        applied.append(name)
+    return applied
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Apply schema migrations')
+    parser.add_argument('--list', action='store_true', help='show applied and pending migrations')
+    parser.add_argument('--backfill-question-counts', action='store_true',
+                        help='recompute ModuleContent.question_count from quiz questions')
+    parser.add_argument('--backfill-module-completions', action='store_true',
+                        help='copy CourseProgress.module_progress JSON into module_completion')
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        if args.backfill_question_counts:
+            with db.engine.begin() as conn:
+                print(f"✅ Corrected question_count on {backfill_question_counts(conn)} content item(s)")
+        elif args.backfill_module_completions:
+            with db.engine.begin() as conn:
+                print(f"✅ Copied {backfill_module_completions(conn)} module completion(s)")
+        elif args.list:
+            done = applied_migrations()
+            for name, _ in MIGRATIONS:
+                print(f"{'applied' if name in done else 'pending'}  {name}")
+        else:
+            applied = run_migrations()
+            print(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Database is up to date")
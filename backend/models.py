@@ -1,7 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -33,6 +34,8 @@ class Course(db.Model):
     description = db.Column(db.Text, nullable=True)
     created = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
     status = db.Column(db.String(32), nullable=False, default='draft')
+    # Bumped whenever the course tree (modules, contents, questions) changes; see content_cache.py
+    content_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     modules = db.relationship('Module', backref='course', lazy=True, cascade="all, delete-orphan")
 
 class Module(db.Model):
@@ -51,6 +54,8 @@ class ModuleContent(db.Model):
     content = db.Column(db.Text, nullable=True)
     order = db.Column(db.Integer, nullable=False, default=0)
     module_id = db.Column(db.Integer, db.ForeignKey('module.id'), nullable=False)
+    # Number of QuizQuestion rows; maintained by the QuizQuestion insert/delete events below
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     questions = db.relationship('QuizQuestion', backref='content', lazy=True, cascade="all, delete-orphan")
 
 class QuizQuestion(db.Model):
@@ -61,6 +66,22 @@ class QuizQuestion(db.Model):
     content_id = db.Column(db.Integer, db.ForeignKey('module_content.id'), nullable=False)
     options = db.relationship('QuizOption', backref='question', lazy=True, cascade="all, delete-orphan")
 
+@db.event.listens_for(QuizQuestion, 'after_insert')
+def _increment_question_count(mapper, connection, target):
+    connection.execute(
+        ModuleContent.__table__.update()
+        .where(ModuleContent.__table__.c.id == target.content_id)
+        .values(question_count=ModuleContent.__table__.c.question_count + 1)
+    )
+
+@db.event.listens_for(QuizQuestion, 'after_delete')
+def _decrement_question_count(mapper, connection, target):
+    connection.execute(
+        ModuleContent.__table__.update()
+        .where(ModuleContent.__table__.c.id == target.content_id)
+        .values(question_count=ModuleContent.__table__.c.question_count - 1)
+    )
+
 class QuizOption(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     option_text = db.Column(db.Text, nullable=False)
@@ -103,12 +124,20 @@ organization_courses = Table('organization_courses', db.metadata,
     Column('course_id', Integer, ForeignKey('course.id'), primary_key=True)
 )
 
-# Association table for many-to-many User <-> Course (for individual assignments)
+# Association table for many-to-many User <-> Course (for individual assignments).
+# Employees get their organization's courses without rows here; a row is a per-user
+# grant on top of them (see course_access.py)
 user_courses = Table('user_courses', db.metadata,
     Column('user_id', Integer, ForeignKey('user.id'), primary_key=True),
     Column('course_id', Integer, ForeignKey('course.id'), primary_key=True)
 )
 
+# Per-user revocations: organization courses hidden from one employee
+course_revocations = Table('course_revocations', db.metadata,
+    Column('user_id', Integer, ForeignKey('user.id'), primary_key=True),
+    Column('course_id', Integer, ForeignKey('course.id'), primary_key=True)
+)
+
 # Course progress tracking model
 class CourseProgress(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -124,9 +153,27 @@ class CourseProgress(db.Model):
     # Relationship to course
     course = db.relationship('Course')
     
-    # Module progress (JSON field to store module completion status)
+    # One row per user and course, so progress updates can upsert (see progress_ingest.py)
+    __table_args__ = (
+        db.Index('uq_course_progress_user_course', 'user_id', 'course_id', unique=True),
+    )
+    
+    # Module progress (JSON field to store module completion status). No longer written:
+    # completions live in ModuleCompletion; migration 0004_module_completion copied them over
     module_progress = db.Column(db.Text, default='{}')  # JSON string: {module_id: {completed: true/false, completion_date: date}}
 
+# One row per module an employee has completed (course_id is the module's, kept for per-course queries)
+class ModuleCompletion(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), primary_key=True)
+    module_id = db.Column(db.Integer, db.ForeignKey('module.id'), primary_key=True)
+    completed_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_module_completion_module_completed_at', 'module_id', 'completed_at'),
+        db.Index('ix_module_completion_course_completed_at', 'course_id', 'completed_at'),
+    )
+
 class SystemSettings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50), nullable=False)  # email, security, organization, etc.
@@ -225,6 +272,11 @@ class QuizAttempt(db.Model):
     
     # Relationships
     user = db.relationship('User', backref='quiz_attempts')
+    
+    # Per-user attempts, for risk scoring by user range (see risk_scores.py)
+    __table_args__ = (
+        db.Index('ix_quiz_attempt_user_content', 'user_id', 'quiz_content_id'),
+    )
     quiz_content = db.relationship('ModuleContent', backref='quiz_attempts')
 
 class ContentInteraction(db.Model):
@@ -295,3 +347,32 @@ class APIUsage(db.Model):
     
     # Relationship
     user = db.relationship('User', backref='api_usage')
+
+# Checkpoint of a sync_employee_courses.py run: one row per organization finished,
+# committed together with that organization's changes so an interrupted run can resume
+class CourseSyncCheckpoint(db.Model):
+    run_id = db.Column(db.String(40), primary_key=True)
+    organization_id = db.Column(db.Integer, primary_key=True)
+    rows_inserted = db.Column(db.Integer, nullable=False, default=0)
+    rows_deleted = db.Column(db.Integer, nullable=False, default=0)
+    elapsed_ms = db.Column(db.Float, nullable=False, default=0.0)
+    finished_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+# Background job for bulk admin operations, run by job_worker.py (see jobs.py)
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON string of the job's arguments
+    status = db.Column(db.String(32), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, cancelled
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    message = db.Column(db.String(255), nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON string
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(64), nullable=True)
+    created_by = db.Column(db.String(80), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,106 @@
+"""
+Module completions, one ModuleCompletion row per (user, course, module).
+
+Completing a module is a single-row INSERT ... ON CONFLICT DO NOTHING, and
+undoing it a single-row DELETE, so concurrent updates for the same user never
+rewrite each other's state. Each call reports the change it made (+1, -1 or
+0), so CourseProgress.completed_modules can be adjusted by exactly the rows
+that changed (see progress_ingest.upsert_course_progress). Aggregates over many users run in the database; the
+(module_id, completed_at) and (course_id, completed_at) indexes cover
+"who completed this module/course this week".
+"""
+import datetime
+
+from sqlalchemy import and_, func, select
+
+from models import db, User, Module, ModuleCompletion, CourseProgress
+from db_upsert import dialect_insert, supports_on_conflict
+
+_completions = ModuleCompletion.__table__
+
+
+def set_module_completed(user_id, course_id, module_id, completed=True):
+    """Record or clear one completion. Returns the change in the user's count: 1, -1, or 0 if nothing changed."""
+    if not completed:
+        return -db.session.execute(_completions.delete().where(
+            _completions.c.user_id == user_id, _completions.c.course_id == course_id,
+            _completions.c.module_id == module_id,
+        )).rowcount
+    values = {'user_id': user_id, 'course_id': course_id, 'module_id': module_id,
+              'completed_at': datetime.datetime.utcnow()}
+    if supports_on_conflict():
+        return db.session.execute(dialect_insert(_completions).values(values).on_conflict_do_nothing()).rowcount
+    if db.session.get(ModuleCompletion, (user_id, course_id, module_id)):
+        return 0
+    db.session.execute(_completions.insert().values(values))
+    return 1
+
+
+def completed_module_count(user_id, course_id):
+    return db.session.execute(
+        select(func.count()).where(_completions.c.user_id == user_id, _completions.c.course_id == course_id)
+    ).scalar()
+
+
+def module_completion_dates(user_id, course_id):
+    """{module_id: completed_at} for one user's course."""
+    return dict(db.session.execute(
+        select(_completions.c.module_id, _completions.c.completed_at)
+        .where(_completions.c.user_id == user_id, _completions.c.course_id == course_id)
+        .order_by(_completions.c.module_id)
+    ).all())
+
+
+def progress_with_completion_dates(user_id, course_id):
+    """(progress_percentage, completed_modules, {module_id: completed_at}) for one user's course, in one query."""
+    progress = CourseProgress.__table__
+    rows = db.session.execute(
+        select(progress.c.progress_percentage, progress.c.completed_modules,
+               _completions.c.module_id, _completions.c.completed_at)
+        .select_from(progress)
+        .outerjoin(_completions, and_(_completions.c.user_id == progress.c.user_id,
+                                      _completions.c.course_id == progress.c.course_id))
+        .where(progress.c.user_id == user_id, progress.c.course_id == course_id)
+        .order_by(_completions.c.module_id)
+    ).all()
+    if not rows:
+        return None, 0, {}
+    return rows[0][0], rows[0][1], {module_id: completed_at for _, _, module_id, completed_at in rows
+                                    if module_id is not None}
+
+
+def module_completion_summary(course_id=None, module_id=None, org_id=None, since=None):
+    """Completions per module, grouped in the database: [(module_id, title, course_id, completions, last_completed_at)]."""
+    query = (
+        select(Module.id, Module.title, Module.course_id,
+               func.count().label('completions'), func.max(_completions.c.completed_at).label('last_completed_at'))
+        .select_from(_completions)
+        .join(Module, Module.id == _completions.c.module_id)
+        .group_by(Module.id, Module.title, Module.course_id)
+        .order_by(Module.course_id, Module.order, Module.id)
+    )
+    return db.session.execute(_filtered(query, course_id, module_id, org_id, since)).all()
+
+
+def module_completers(module_id, org_id=None, since=None, limit=100):
+    """Users who completed a module, most recent first: [(user_id, username, completed_at)]."""
+    query = (
+        select(User.id, User.username, _completions.c.completed_at)
+        .select_from(_completions)
+        .join(User, User.id == _completions.c.user_id)
+        .order_by(_completions.c.completed_at.desc())
+        .limit(limit)
+    )
+    return db.session.execute(_filtered(query, None, module_id, org_id, since)).all()
+
+
+def _filtered(query, course_id, module_id, org_id, since):
+    if course_id is not None:
+        query = query.where(_completions.c.course_id == course_id)
+    if module_id is not None:
+        query = query.where(_completions.c.module_id == module_id)
+    if since is not None:
+        query = query.where(_completions.c.completed_at >= since)
+    if org_id is not None:
+        query = query.where(_completions.c.user_id.in_(select(User.id).where(User.org_id == org_id)))
+    return query
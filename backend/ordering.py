@@ -0,0 +1,59 @@
+"""
+Gap-based ordering for modules, contents and quiz questions.
+
+Order keys are spaced ORDER_GAP apart. An item can then be moved between two
+neighbours by giving it any key in the gap, without renumbering its siblings.
+New items are appended at max(order) + ORDER_GAP. That key is computed inside
+the INSERT itself, so there is no separate SELECT max(order) round trip to race
+with. Ties, e.g. from two concurrent appends, fall back to id order, as
+everywhere else.
+
+reorder() applies a whole drag-and-drop result in one UPDATE ... CASE statement
+and respaces the keys to multiples of ORDER_GAP.
+"""
+from sqlalchemy import case, func
+
+from models import db
+
+ORDER_GAP = 1024
+
+
+def next_order(column, parent_column, parent_id):
+    """SQL expression for the key after the last sibling; assign it to the new row's order."""
+    return (
+        db.select(func.coalesce(func.max(column), 0) + ORDER_GAP)
+        .where(parent_column == parent_id)
+        .scalar_subquery()
+    )
+
+
+def reorder(model, parent_column, parent_id, ids):
+    """Set the order of all children of a parent from ``ids``, in one statement.
+
+    ``ids`` must list every child exactly once. The children are locked
+    (SELECT ... FOR UPDATE on PostgreSQL) so concurrent reorders of the same
+    parent serialize. Returns an error message, or None once the UPDATE has
+    been issued (the caller commits).
+    """
+    if not isinstance(ids, list) or not all(isinstance(item_id, int) for item_id in ids):
+        return "A list of integer ids is required"
+    if len(set(ids)) != len(ids):
+        return "Duplicate ids in the new order"
+
+    current = set(db.session.execute(
+        db.select(model.id).where(parent_column == parent_id).with_for_update()
+    ).scalars())
+    if set(ids) != current:
+        missing = sorted(current - set(ids))
+        unknown = sorted(set(ids) - current)
+        return f"The new order must list every item exactly once (missing: {missing}, not in this parent: {unknown})"
+    if not ids:
+        return None
+
+    db.session.execute(
+        db.update(model)
+        .where(parent_column == parent_id)
+        .values(order=case({item_id: (i + 1) * ORDER_GAP for i, item_id in enumerate(ids)}, value=model.id))
+        .execution_options(synchronize_session=False)
+    )
+    return None
@@ -0,0 +1,131 @@
+"""
+Bounded worker pool for bcrypt password hashing and verification.
+
+bcrypt releases the GIL while it works, so a small thread pool sized to the
+CPU count hashes in parallel without oversubscribing the machine during a
+login spike. Requests beyond the pool plus PASSWORD_HASH_QUEUE waiting slots
+fail fast with PasswordHashingBusy instead of piling up on worker threads.
+
+The bcrypt cost factor comes from BCRYPT_ROUNDS. Hashes stored with a
+different cost are upgraded on the next successful login (see needs_rehash).
+
+bcrypt is imported on first use so that importing the app stays cheap.
+
+Run ``python password_hashing.py --benchmark`` to measure logins per second.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_WAIT_SECONDS = float(os.getenv('PASSWORD_HASH_WAIT_SECONDS', '5'))
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when every hashing worker and queue slot is taken."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                               thread_name_prefix='bcrypt')
+    return _executor
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=PASSWORD_HASH_WAIT_SECONDS):
+        raise PasswordHashingBusy('Password hashing pool is busy, please retry')
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+
+def hash_password(password, rounds=None):
+    """Hash a password for storing."""
+    import bcrypt
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return _run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(stored_password, provided_password):
+    """Verify a stored password against provided password."""
+    import bcrypt
+    return _run(bcrypt.checkpw, provided_password.encode('utf-8'), stored_password.encode('utf-8'))
+
+
+def needs_rehash(stored_password, rounds=None):
+    """True when a stored hash was made with a different cost factor than configured."""
+    try:
+        return int(stored_password.split('$')[2]) != (rounds or BCRYPT_ROUNDS)
+    except (IndexError, ValueError):
+        return True
+
+
+def shutdown():
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+
+
+def benchmark(seconds=5.0, rounds=None):
+    """Verify one password through the pool from many threads and report throughput."""
+    import bcrypt
+    rounds = rounds or BCRYPT_ROUNDS
+    stored = bcrypt.hashpw(b'benchmark-password', bcrypt.gensalt(rounds)).decode('utf-8')
+    cores = os.cpu_count() or 1
+    completed = [0]
+    counter_lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            verify_password(stored, 'benchmark-password')
+            with counter_lock:
+                completed[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS * 2) as clients:
+        wait([clients.submit(client) for _ in range(PASSWORD_HASH_WORKERS * 2)])
+    elapsed = time.perf_counter() - start
+
+    logins_per_second = completed[0] / elapsed
+    return {
+        'rounds': rounds,
+        'workers': PASSWORD_HASH_WORKERS,
+        'cores': cores,
+        'logins': completed[0],
+        'elapsed_seconds': round(elapsed, 2),
+        'logins_per_second': round(logins_per_second, 2),
+        'logins_per_second_per_core': round(logins_per_second / cores, 2)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='bcrypt login throughput benchmark')
+    parser.add_argument('--benchmark', action='store_true', help='run the login benchmark')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--rounds', type=int, default=None, help='bcrypt cost factor to test')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.seconds, args.rounds)
+        print(f"bcrypt cost {result['rounds']}, {result['workers']} workers on {result['cores']} cores")
+        print(f"{result['logins']} logins in {result['elapsed_seconds']}s")
+        print(f"{result['logins_per_second']} logins/s, {result['logins_per_second_per_core']} logins/s per core")
+    else:
+        parser.print_help()
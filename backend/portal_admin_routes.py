@@ -0,0 +1,1509 @@
+from flask import Blueprint, jsonify, request
+import datetime
+from models import db, User, Organization, Course, CourseRequest, CourseProgress, ModuleCompletion
+from models import organization_courses, user_courses, course_revocations
+from principal_cache import resolve_principal, invalidate_principal, invalidate_organization_principals
+from db_routing import read_replica
+from password_hashing import hash_password, PasswordHashingBusy
+from emails import generate_temp_password, send_invite_email
+from course_access import has_course_clause
+from query_budget import query_budget
+from course_assignments import (grant_courses, revoke_courses, add_org_courses, remove_org_courses,
+                                org_employee_ids, org_has_course, sync_org_courses, delete_user_course_rows)
+from jobs import enqueue, job_dict, delete_org_users, delete_org_course_requests, delete_org_record
+
+portal_admin_bp = Blueprint('portal_admin', __name__)
+
+ASSIGNMENT_MATRIX_DEFAULT_LIMIT = 50
+ASSIGNMENT_MATRIX_MAX_LIMIT = 200
+ASSIGNMENT_MATRIX_MAX_COURSES = 20
+BULK_INVITE_MAX = 5000
+
+
+def _wants_async(data=None):
+    """True if the caller asked for a background job (?async=true or "async": true in the body)."""
+    flag = request.args.get('async') or (data or {}).get('async')
+    return str(flag).lower() in ['true', '1', 'yes']
+
+
+def _enqueue_job(kind, payload, created_by=None):
+    """Queue a background job for job_worker.py and answer 202 with its polling URL."""
+    job = enqueue(kind, payload, created_by=created_by)
+    db.session.commit()
+    return jsonify({
+        'success': True,
+        'message': 'Job queued',
+        'job': job_dict(job),
+        'status_url': f'/api/jobs/{job.id}'
+    }), 202
+
+# Assign a course to all employees in an organization
+@portal_admin_bp.route('/api/portal_admin/assign_course_to_all', methods=['POST'])
+def assign_course_to_all_employees():
+    """Assign a course to all employees in the portal admin's organization."""
+    try:
+        data = request.json
+        username = data.get('username')
+        course_id = data.get('course_id')
+        if not username or not course_id:
+            return jsonify({'error': 'Username and course_id are required'}), 400
+
+        # Find the portal admin user
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+
+        # Get the organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
+        # Get the course
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+
+        # Employees who don't have it yet: all of them if the organization didn't
+        # have the course, otherwise those it was revoked from
+        employees = org_employee_ids(organization.id)
+        attached = add_org_courses(organization.id, [course.id])
+        assigned_count = grant_courses(employees, [course.id])
+        if attached:
+            assigned_count = db.session.execute(db.select(db.func.count()).select_from(employees.subquery())).scalar()
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f'Course "{course.title}" assigned to {assigned_count} employees in {organization.name}',
+            'assigned_count': assigned_count
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to assign course to all: {str(e)}'}), 500
+
+# --- Portal Admin: Unassign Course from Employee ---
+@portal_admin_bp.route('/api/portal_admin/unassign_course_from_employee', methods=['POST'])
+def unassign_course_from_employee():
+    """Unassign a course from an employee (portal admin action)"""
+    try:
+        data = request.json
+        employee_id = data.get('employee_id')
+        course_id = data.get('course_id')
+        if not employee_id or not course_id:
+            return jsonify({'error': 'employee_id and course_id are required'}), 400
+
+        # Find the employee
+        employee = User.query.filter_by(id=employee_id, role='employee').first()
+        if not employee:
+            return jsonify({'error': 'Employee not found'}), 404
+
+        # Find the course
+        course = Course.query.get(course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+
+        # Remove the course from the employee's courses (a revocation if the organization provides it)
+        if revoke_courses([employee.id], [course.id]):
+            db.session.commit()
+            return jsonify({'success': True, 'message': 'Course unassigned from employee'}), 200
+        else:
+            return jsonify({'error': 'Course not assigned to employee'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to unassign course: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/course_assignments/<int:course_id>', methods=['GET'])
+def get_course_assignments(course_id):
+    """Return all employees for the organization assigned to the course, with assignment flag."""
+    try:
+        # Get organization_id from query param or fail
+        org_id = request.args.get('organization_id', type=int)
+        if not org_id:
+            return jsonify({'success': False, 'error': 'organization_id is required'}), 400
+
+        # Get organization
+        organization = db.session.get(Organization, org_id)
+        if not organization:
+            return jsonify({'success': False, 'error': 'Organization not found'}), 404
+
+        # Get course
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'success': False, 'error': 'Course not found'}), 404
+
+        # All employees in the org with their effective access to the course, in one query
+        employees = db.session.execute(
+            db.select(User.id, User.username, User.email, User.designation,
+                      has_course_clause(User.id, User.org_id, course.id).label('is_assigned'))
+            .where(User.org_id == org_id, User.role == 'employee')
+            .order_by(User.id)
+        )
+        employee_assignments = []
+        for emp in employees:
+            employee_assignments.append({
+                'id': emp.id,
+                'username': emp.username,
+                'email': emp.email,
+                'designation': emp.designation,
+                'is_assigned': bool(emp.is_assigned)
+            })
+
+        return jsonify({
+            'success': True,
+            'employees': employee_assignments,
+            'course': {
+                'id': course.id,
+                'title': course.title
+            },
+            'organization': {
+                'id': organization.id,
+                'name': organization.name
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@portal_admin_bp.route('/api/portal_admin/assignment_matrix', methods=['GET'])
+@query_budget(4)
+def get_assignment_matrix():
+    """
+    Employees of an organization against one or more courses, one page at a time.
+
+    Query parameters:
+      organization_id=N  required
+      course_ids=1,2     required, up to ASSIGNMENT_MATRIX_MAX_COURSES courses
+      search=text        only employees whose username or designation contains it
+      limit=N            page size (max ASSIGNMENT_MATRIX_MAX_LIMIT); the response has next_cursor
+      cursor=ID          continue after the employee id returned as next_cursor
+
+    Each employee has 'assignments': {course_id: is_assigned}. The page is one
+    query: the employees x courses grid LEFT JOINed to user_courses and
+    course_revocations (see course_access.py for how they combine).
+    """
+    org_id = request.args.get('organization_id', type=int)
+    if not org_id:
+        return jsonify({'success': False, 'error': 'organization_id is required'}), 400
+    try:
+        course_ids = sorted({int(course_id) for course_id in request.args.get('course_ids', '').split(',') if course_id.strip()})
+        limit = request.args.get('limit', ASSIGNMENT_MATRIX_DEFAULT_LIMIT, type=int)
+        cursor = request.args.get('cursor', type=int)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'course_ids must be a comma separated list of course ids'}), 400
+    if not course_ids:
+        return jsonify({'success': False, 'error': 'course_ids is required'}), 400
+    if len(course_ids) > ASSIGNMENT_MATRIX_MAX_COURSES:
+        return jsonify({'success': False, 'error': f'At most {ASSIGNMENT_MATRIX_MAX_COURSES} courses at a time'}), 400
+    limit = max(1, min(limit, ASSIGNMENT_MATRIX_MAX_LIMIT))
+    search = request.args.get('search', '').strip()
+
+    organization = db.session.get(Organization, org_id)
+    if not organization:
+        return jsonify({'success': False, 'error': 'Organization not found'}), 404
+
+    # The courses, each with whether the organization provides it
+    courses = db.session.execute(
+        db.select(Course.id, Course.title,
+                  db.select(organization_courses.c.course_id)
+                  .where(organization_courses.c.organization_id == org_id,
+                         organization_courses.c.course_id == Course.id)
+                  .exists().label('org_assigned'))
+        .where(Course.id.in_(course_ids))
+        .order_by(Course.id)
+    ).all()
+    missing = set(course_ids) - {course.id for course in courses}
+    if missing:
+        return jsonify({'success': False, 'error': f'Course not found: {", ".join(map(str, sorted(missing)))}'}), 404
+
+    employees = db.select(User.id).where(User.org_id == org_id, User.role == 'employee')
+    if search:
+        employees = employees.where(db.or_(User.username.icontains(search, autoescape=True),
+                                           User.designation.icontains(search, autoescape=True)))
+    total = db.session.execute(db.select(db.func.count()).select_from(employees.subquery())).scalar()
+
+    # Fetch one extra employee to know whether there is a next page
+    if cursor is not None:
+        employees = employees.where(User.id > cursor)
+    page = employees.order_by(User.id).limit(limit + 1).subquery()
+    course_grid = db.select(Course.id.label('course_id')).where(Course.id.in_(course_ids)).subquery()
+    org_course = organization_courses.alias('org_course')
+    rows = db.session.execute(
+        db.select(User.id, User.username, User.email, User.designation, course_grid.c.course_id,
+                  db.and_(db.or_(org_course.c.course_id.is_not(None), user_courses.c.user_id.is_not(None)),
+                          course_revocations.c.user_id.is_(None)).label('is_assigned'))
+        .select_from(page)
+        .join(User, User.id == page.c.id)
+        .join(course_grid, db.true())
+        .outerjoin(org_course, db.and_(org_course.c.organization_id == org_id,
+                                       org_course.c.course_id == course_grid.c.course_id))
+        .outerjoin(user_courses, db.and_(user_courses.c.user_id == User.id,
+                                         user_courses.c.course_id == course_grid.c.course_id))
+        .outerjoin(course_revocations, db.and_(course_revocations.c.user_id == User.id,
+                                               course_revocations.c.course_id == course_grid.c.course_id))
+        .order_by(User.id, course_grid.c.course_id)
+    )
+
+    employee_rows = {}
+    for row in rows:
+        employee = employee_rows.get(row.id)
+        if employee is None:
+            employee = employee_rows[row.id] = {
+                'id': row.id,
+                'username': row.username,
+                'email': row.email,
+                'designation': row.designation,
+                'assignments': {}
+            }
+        employee['assignments'][row.course_id] = bool(row.is_assigned)
+    employee_list = list(employee_rows.values())
+    next_cursor = None
+    if len(employee_list) > limit:
+        employee_list = employee_list[:limit]
+        next_cursor = employee_list[-1]['id']
+
+    return jsonify({
+        'success': True,
+        'organization': {'id': organization.id, 'name': organization.name},
+        'courses': [{'id': course.id, 'title': course.title, 'organization_assigned': bool(course.org_assigned)}
+                    for course in courses],
+        'employees': employee_list,
+        'total': total,
+        'next_cursor': next_cursor
+    }), 200
+
+@portal_admin_bp.route('/api/organizations', methods=['POST'])
+def create_organization():
+    data = request.get_json()
+    from datetime import date
+    
+    # Extract organization data
+    name = data.get('name')
+    portal_admin = data.get('portal_admin')
+    org_domain = data.get('org_domain')
+    assigned_course = data.get('assigned_course')
+    status = data.get('status', 'active')
+    created_str = data.get('created')
+    course_ids = data.get('course_ids')
+    
+    # Extract portal admin user data
+    admin_password = data.get('admin_password', 'portaladmin123')
+    admin_email = data.get('admin_email', f'{portal_admin}@{org_domain}')
+    admin_designation = data.get('admin_designation', 'Portal Administrator')
+    
+    # Validation
+    if not all([name, portal_admin, org_domain]):
+        return jsonify({'success': False, 'message': 'Missing required fields: name, portal_admin, org_domain'}), 400
+    
+    if status not in ['active', 'inactive', 'suspended']:
+        return jsonify({'success': False, 'message': 'Invalid status'}), 400
+    
+    if Organization.query.filter_by(name=name).first():
+        return jsonify({'success': False, 'message': 'Organization already exists'}), 400
+        
+    if Organization.query.filter_by(org_domain=org_domain).first():
+        return jsonify({'success': False, 'message': 'Organization domain already exists'}), 400
+    
+    if User.query.filter_by(username=portal_admin).first():
+        return jsonify({'success': False, 'message': 'Portal admin username already exists'}), 400
+        
+    if User.query.filter_by(email=admin_email).first():
+        return jsonify({'success': False, 'message': 'Portal admin email already exists'}), 400
+    
+    try:
+        # Parse creation date
+        if created_str:
+            created = date.fromisoformat(created_str)
+        else:
+            created = date.today()
+        
+        # Create organization
+        org = Organization(
+
+            name=name,
+            portal_admin=portal_admin,
+            org_domain=org_domain,
+            created=created,
+            status=status
+        )
+        
+        # Handle course assignments
+        if course_ids and isinstance(course_ids, list):
+            org.courses = Course.query.filter(Course.id.in_(course_ids)).all()
+        elif assigned_course:
+            course = Course.query.filter_by(id=assigned_course).first()
+            if course:
+                org.courses = [course]
+        
+        # Add organization first to get the org ID
+        db.session.add(org)
+        db.session.flush()  # Get the org.id without committing
+        
+        # Create portal admin user and link to organization
+        portal_admin_user = User(
+            username=portal_admin,
+            password=hash_password(admin_password),
+            role='portal_admin',
+            email=admin_email,
+            designation=admin_designation,
+            org_id=org.id
+        )
+        
+        db.session.add(portal_admin_user)
+        db.session.commit()
+        
+        # Send welcome email to portal admin
+        email_sent, email_message = send_invite_email(
+            user_email=admin_email,
+            user_name=portal_admin,
+            org_name=name,
+            temp_password=admin_password
+        )
+        
+        return jsonify({
+            'success': True, 
+            'message': 'Organization and portal admin created successfully',
+            'organization_id': org.id,
+            'admin_username': portal_admin,
+            'admin_email': admin_email,
+            'admin_password': admin_password,  # For testing - remove in production
+            'email_sent': email_sent,
+            'email_message': email_message
+        })
+        
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Failed to create organization: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/organizations', methods=['GET'])
+def get_organizations():
+    orgs = Organization.query.order_by(Organization.created.desc()).all()
+    organizations = [
+        {
+            "id": org.id,
+            "name": org.name,
+            "portal_admin": org.portal_admin,
+            "org_domain": org.org_domain,
+            "created": org.created.strftime('%Y-%m-%d'),
+            "status": org.status,
+            "courses": [
+                {"id": c.id, "title": c.title}
+                for c in org.courses
+            ]
+        }
+        for org in orgs
+    ]
+    return jsonify({"organizations": organizations})
+
+# Assign multiple courses to an organization
+@portal_admin_bp.route('/api/organizations/<int:org_id>/assign_courses', methods=['POST'])
+def assign_courses_to_organization(org_id):
+    data = request.get_json()
+    course_ids = data.get('course_ids', [])
+    org = Organization.query.get_or_404(org_id)
+    if not isinstance(course_ids, list):
+        return jsonify({"success": False, "message": "course_ids must be a list"}), 400
+    if _wants_async(data):
+        return _enqueue_job('assign_courses_to_organization', {'org_id': org.id, 'course_ids': course_ids},
+                            created_by=request.args.get('username') or data.get('username'))
+    
+    # Replace the organization's courses; its employees follow without rows of their own
+    result = sync_org_courses(org.id, course_ids)
+    employees_updated = db.session.execute(
+        db.select(db.func.count()).select_from(org_employee_ids(org.id).subquery())
+    ).scalar()
+    db.session.commit()
+    return jsonify({
+        "success": True, 
+        "message": f"Courses assigned to organization and {employees_updated} employees", 
+        "assigned_course_ids": result['course_ids'],
+        "employees_updated": employees_updated,
+        "courses_added": result['courses_added'],
+        "courses_removed": result['courses_removed'],
+        "rows_inserted": result['rows_inserted'],
+        "rows_deleted": result['rows_deleted'],
+        "elapsed_ms": result['elapsed_ms']
+    })
+
+@portal_admin_bp.route('/api/organizations/<int:org_id>', methods=['DELETE'])
+def delete_organization(org_id):
+    org = Organization.query.get_or_404(org_id)
+    if _wants_async():
+        return _enqueue_job('delete_organization', {'org_id': org.id}, created_by=request.args.get('username'))
+    try:
+        # Course requests, then users and everything recorded for them, then the organization itself
+        course_requests_deleted = delete_org_course_requests(org_id)
+        user_ids = list(db.session.execute(db.select(User.id).where(User.org_id == org_id)).scalars())
+        if user_ids:
+            delete_org_users(user_ids)
+        delete_org_record(org)
+        db.session.commit()
+        invalidate_organization_principals(org_id)
+        
+        return jsonify({
+            "success": True, 
+            "message": f"Organization, {len(user_ids)} user(s), and {course_requests_deleted} course request(s) deleted successfully"
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Failed to delete organization: {str(e)}"}), 500
+
+@portal_admin_bp.route('/api/organizations/<int:org_id>/status', methods=['PATCH'])
+def update_organization_status(org_id):
+    data = request.get_json()
+    new_status = data.get('status')
+    
+    if not new_status or new_status not in ['active', 'inactive', 'suspended']:
+        return jsonify({"success": False, "message": "Invalid status"}), 400
+        
+    org = Organization.query.get_or_404(org_id)
+    org.status = new_status
+    db.session.commit()
+    
+    return jsonify({"success": True, "message": f"Organization status updated to {new_status}", "status": new_status})
+
+@portal_admin_bp.route('/api/portal_admin/invite_employee', methods=['POST'])
+def invite_employee():
+    """Invite a new employee to an organization"""
+    try:
+        data = request.json
+        required_fields = ['email', 'designation']
+        
+        # Validate required fields
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        email = data['email'].strip().lower()
+        designation = data['designation'].strip()
+        
+        # Extract username from email (before @)
+        username = email.split('@')[0]
+        # Extract name for display purposes
+        name = username.replace('.', ' ').replace('_', ' ').title()
+        
+        # Validate email format
+        if '@' not in email or '.' not in email:
+            return jsonify({'error': 'Invalid email format'}), 400
+        
+        # Get organization from a portal admin with an org_id (in a real app, get from JWT token)
+        portal_admin = User.query.filter_by(role='portal_admin').filter(User.org_id.isnot(None)).first()
+        if not portal_admin or not portal_admin.org_id:
+            return jsonify({'error': 'No organization found'}), 404
+            
+        organization = db.session.get(Organization, portal_admin.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Check if user already exists
+        if User.query.filter_by(username=username).first():
+            return jsonify({'error': 'Username already exists'}), 409
+            
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            return jsonify({'error': 'User with this email already exists'}), 409
+        
+        # Generate temporary password
+        temp_password = generate_temp_password()
+        
+        try:
+            # Create new user
+            new_user = User(
+                username=username,
+                password=hash_password(temp_password),  # Hash the password properly
+                email=email,
+                designation=designation,
+                org_id=organization.id,
+                role='employee'
+            )
+            
+            db.session.add(new_user)
+            db.session.commit()
+            
+            # Send invitation email
+            email_sent, email_message = send_invite_email(
+                user_email=email,
+                user_name=name,
+                org_name=organization.name,
+                temp_password=temp_password
+            )
+            
+            response_data = {
+                'message': 'Employee invited successfully',
+                'user_id': new_user.id,
+                'email_sent': email_sent,
+                'email_message': email_message,
+                'temp_password': temp_password,
+                'username': email  # Use email as username for frontend display
+            }
+            
+            return jsonify(response_data), 201
+            
+        except PasswordHashingBusy:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': f'Failed to create user: {str(e)}',
+                'details': {
+                    'error_type': type(e).__name__,
+                    'message': str(e)
+                }
+            }), 500
+            
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/invite_employees', methods=['POST'])
+def invite_employees():
+    """
+    Invite many employees to the portal admin's organization as a background job.
+    Expects: { "username": ..., "invites": [{"email": ..., "designation": ...}, ...] }
+    Answers 202 with the job; its result lists each invite as invited or skipped.
+    """
+    data = request.get_json(silent=True) or {}
+    username = data.get('username')
+    invites = data.get('invites')
+    if not username or not isinstance(invites, list) or not invites:
+        return jsonify({'success': False, 'error': 'username and a non-empty invites list are required'}), 400
+    if len(invites) > BULK_INVITE_MAX:
+        return jsonify({'success': False, 'error': f'At most {BULK_INVITE_MAX} invites per request'}), 400
+    if not all(isinstance(invite, dict) for invite in invites):
+        return jsonify({'success': False, 'error': 'Each invite must be an object with email and designation'}), 400
+
+    portal_admin = resolve_principal(username, role='portal_admin')
+    if not portal_admin or not portal_admin.org_id:
+        return jsonify({'success': False, 'error': 'Portal admin not found'}), 404
+
+    invites = [{'email': invite.get('email'), 'designation': invite.get('designation')} for invite in invites]
+    return _enqueue_job('invite_employees', {'org_id': portal_admin.org_id, 'invites': invites}, created_by=username)
+
+@portal_admin_bp.route('/api/portal_admin/organizations/<int:org_id>/employees', methods=['GET'])
+def get_organization_employees(org_id):
+    """Get all employees for a specific organization"""
+    try:
+        # Check if organization exists
+        organization = db.session.get(Organization, org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get all employees for this organization
+        employees = User.query.filter_by(org_id=org_id, role='employee').all()
+        
+        employee_list = []
+        for employee in employees:
+            employee_list.append({
+                'id': employee.id,
+                'name': employee.username,
+                'email': employee.email,
+                'designation': employee.designation
+            })
+        
+        return jsonify({
+            'organization': {'id': organization.id, 'name': organization.name},
+            'employees': employee_list,
+            'total_employees': len(employee_list)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/organizations/<int:org_id>/courses', methods=['GET'])
+def get_organization_courses(org_id):
+    """Get all courses assigned to a specific organization"""
+    try:
+        # Check if organization exists
+        organization = db.session.get(Organization, org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get all courses assigned to this organization
+        courses = organization.courses
+        
+        course_list = []
+        for course in courses:
+            course_list.append({
+                'id': course.id,
+                'title': course.title,
+                'description': course.description,
+                'status': course.status,
+                'module_count': len(course.modules),
+                'created': course.created.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        
+        return jsonify({
+            'organization': {'id': organization.id, 'name': organization.name},
+            'courses': course_list,
+            'total_courses': len(course_list)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/employees/<int:employee_id>', methods=['DELETE'])
+def delete_employee(employee_id):
+    """Delete an employee"""
+    try:
+        employee = db.session.get(User, employee_id)
+        if not employee:
+            return jsonify({'error': 'Employee not found'}), 404
+        
+        if employee.role != 'employee':
+            return jsonify({'error': 'Can only delete employees'}), 400
+        
+        username = employee.username
+        delete_user_course_rows([employee.id])
+        ModuleCompletion.query.filter_by(user_id=employee.id).delete(synchronize_session=False)
+        db.session.delete(employee)
+        db.session.commit()
+        invalidate_principal(username)
+        
+        return jsonify({'message': 'Employee deleted successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to delete employee: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/org_domain', methods=['GET'])
+def get_org_domain():
+    """Get organization domain for a portal admin user"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+
+        # FIX: Use db.session.get for SQLAlchemy 2.x compatibility
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
+        return jsonify({
+            'success': True,
+            'org_domain': organization.org_domain,
+            'organization_name': organization.name,
+            'organization_id': organization.id
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/create_employee', methods=['POST'])
+def create_employee():
+    """Create a new employee with username and password"""
+    try:
+        data = request.json
+        required_fields = ['username', 'password', 'email', 'designation']
+        
+        # Validate required fields
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        username = data['username'].strip()
+        password = data['password'].strip()
+        email = data['email'].strip().lower()
+        designation = data['designation'].strip()
+        
+        # Validate email format
+        if '@' not in email or '.' not in email:
+            return jsonify({'error': 'Invalid email format'}), 400
+        
+        # Check if user already exists
+        if User.query.filter_by(username=username).first():
+            return jsonify({'error': 'Username already exists'}), 409
+            
+        if User.query.filter_by(email=email).first():
+            return jsonify({'error': 'Email already exists'}), 409
+        
+        # Get the current portal admin from JWT token
+        portal_admin = None
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+            try:
+                import jwt
+                payload = jwt.decode(token, options={"verify_signature": False})
+                portal_admin_username = payload.get('username')
+                portal_admin = resolve_principal(portal_admin_username, role='portal_admin')
+            except Exception:
+                return jsonify({'error': 'Invalid token'}), 401
+        
+        if not portal_admin:
+            return jsonify({'error': 'Portal admin not found or not authenticated'}), 401
+            
+        if not portal_admin.org_id:
+            return jsonify({'error': 'Portal admin not associated with an organization'}), 404
+            
+        try:
+            # Get organization info for email
+            organization = db.session.get(Organization, portal_admin.org_id)
+            if not organization:
+                return jsonify({'error': 'Organization not found'}), 404
+            
+            # Create new user
+            new_user = User(
+                username=username,
+                password=hash_password(password),  # Hash the password properly
+                email=email,
+                designation=designation,
+                org_id=portal_admin.org_id,
+                role='employee'
+            )
+            
+            # The organization's courses apply to the new employee without rows of their own
+            db.session.add(new_user)
+            db.session.commit()
+            
+            # Extract name for display purposes
+            name = username.replace('.', ' ').replace('_', ' ').title()
+            
+            # Send welcome email with credentials
+            email_sent, email_message = send_invite_email(
+                user_email=email,
+                user_name=name,
+                org_name=organization.name,
+                temp_password=password
+            )
+            
+            response_data = {
+                'message': 'Employee created successfully',
+                'user_id': new_user.id,
+                'username': new_user.username,
+                'email': new_user.email,
+                'email_sent': email_sent,
+                'email_message': email_message
+            }
+            
+            return jsonify(response_data), 201
+            
+        except PasswordHashingBusy:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': f'Failed to create user: {str(e)}',
+                'details': {
+                    'error_type': type(e).__name__,
+                    'message': str(e)
+                }
+            }), 500
+            
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/all_courses', methods=['GET'])
+def get_portal_admin_courses():
+    """Get all courses and assigned courses for a portal admin's organization"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+            
+        # Find the portal admin user
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+            
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+            
+        # Get the organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get all courses
+        all_courses = Course.query.filter_by(status='published').all()
+        
+        # Get assigned courses for this organization
+        assigned_course_ids = [course.id for course in organization.courses]
+        
+        # Get pending requests for this organization
+        pending_requests = CourseRequest.query.filter_by(
+            organization_id=organization.id,
+            status='pending'
+        ).all()
+        pending_course_ids = [req.course_id for req in pending_requests]
+        
+        # Format all courses with purchase/assignment status
+        all_courses_list = []
+        for course in all_courses:
+            course_status = 'available'
+            if course.id in assigned_course_ids:
+                course_status = 'assigned'
+            elif course.id in pending_course_ids:
+                course_status = 'pending'
+                
+            # Calculate course price (based on number of modules for demo)
+            base_price = 99.99
+            price_per_module = 49.99
+            course_price = base_price + (len(course.modules) * price_per_module)
+            
+            all_courses_list.append({
+                'id': course.id,
+                'title': course.title,
+                'description': course.description,
+                'status': course.status,
+                'module_count': len(course.modules),
+                'is_assigned': course.id in assigned_course_ids,
+                'is_pending_request': course.id in pending_course_ids,
+                'course_status': course_status,
+                'price': round(course_price, 2)
+            })
+        
+        # Format assigned courses
+        assigned_courses_list = []
+        for course in organization.courses:
+            assigned_courses_list.append({
+                'id': course.id,
+                'title': course.title,
+                'description': course.description,
+                'status': course.status,
+                'module_count': len(course.modules)
+            })
+        
+        return jsonify({
+            'success': True,
+            'all_courses': all_courses_list,
+            'assigned_courses': assigned_courses_list,
+            'organization': {
+                'id': organization.id,
+                'name': organization.name
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/assign_course', methods=['POST'])
+def assign_course_to_organization():
+    """Assign a course to the portal admin's organization"""
+    try:
+        data = request.json
+        username = data.get('username')
+        course_id = data.get('course_id')
+        
+        if not username or not course_id:
+            return jsonify({'error': 'Username and course_id are required'}), 400
+            
+        # Find the portal admin user
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+            
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+            
+        # Get the organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get the course
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+        
+        # Assign the course (nothing is inserted if it is already assigned); one row
+        # covers every employee, so the count is only for the response
+        if not add_org_courses(organization.id, [course.id]):
+            return jsonify({'error': 'Course already assigned to organization'}), 409
+        employees_assigned = db.session.execute(
+            db.select(db.func.count()).select_from(org_employee_ids(organization.id).subquery())
+        ).scalar()
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Course "{course.title}" successfully assigned to {organization.name} and {employees_assigned} employees',
+            'employees_assigned': employees_assigned,
+            'course': {
+                'id': course.id,
+                'title': course.title,
+                'description': course.description
+            }
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to assign course: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/unassign_course', methods=['DELETE'])
+def unassign_course_from_organization():
+    """Remove a course assignment from the portal admin's organization and all its employees"""
+    try:
+        data = request.json
+        username = data.get('username')
+        course_id = data.get('course_id')
+        
+        if not username or not course_id:
+            return jsonify({'error': 'Username and course_id are required'}), 400
+            
+        # Find the portal admin user
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+            
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+            
+        # Get the organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get the course
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+        
+        if _wants_async(data):
+            if not org_has_course(organization.id, course.id):
+                return jsonify({'error': 'Course not assigned to organization'}), 404
+            return _enqueue_job('unassign_course_from_organization',
+                                {'org_id': organization.id, 'course_id': course.id}, created_by=username)
+        
+        # Count who loses it, then remove it from the organization (and its employees' overrides)
+        employees_updated = db.session.execute(
+            db.select(db.func.count()).select_from(User)
+            .where(User.org_id == organization.id, User.role == 'employee',
+                   has_course_clause(User.id, User.org_id, course.id))
+        ).scalar()
+        if not remove_org_courses(organization.id, [course.id]):
+            return jsonify({'error': 'Course not assigned to organization'}), 404
+        
+        # Commit all changes
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Course "{course.title}" removed from {organization.name} and {employees_updated} employees',
+            'course': {
+                'id': course.id,
+                'title': course.title,
+                'description': course.description
+            },
+            'employees_updated': employees_updated
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to unassign course: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/request_course_purchase', methods=['POST'])
+def request_course_purchase():
+    """Portal admin requests to purchase a course"""
+    try:
+        data = request.json
+        username = data.get('username')
+        course_id = data.get('course_id')
+        payment_amount = data.get('payment_amount', 0.0)
+        
+        if not username or not course_id:
+            return jsonify({'error': 'Username and course_id are required'}), 400
+            
+        # Find the portal admin user
+        user = resolve_principal(username, role='portal_admin')
+        if not user:
+            return jsonify({'error': 'Portal admin not found'}), 404
+            
+        if not user.org_id:
+            return jsonify({'error': 'User not associated with an organization'}), 404
+            
+        # Get the organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        # Get the course
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+        
+        # Check if course is already assigned or requested
+        if course in organization.courses:
+            return jsonify({'error': 'Course already assigned to organization'}), 409
+            
+        existing_request = CourseRequest.query.filter_by(
+            organization_id=organization.id,
+            course_id=course_id,
+            status='pending'
+        ).first()
+        
+        if existing_request:
+            return jsonify({'error': 'Purchase request already pending for this course'}), 409
+        
+        # Create the purchase request
+        course_request = CourseRequest(
+            organization_id=organization.id,
+            course_id=course_id,
+            requested_by=user.id,
+            payment_amount=payment_amount,
+            status='pending'
+        )
+        
+        db.session.add(course_request)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Purchase request submitted for "{course.title}"',
+            'request': {
+                'id': course_request.id,
+                'course_title': course.title,
+                'payment_amount': payment_amount,
+                'status': 'pending',
+                'requested_at': course_request.requested_at.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to create purchase request: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/portal_admin/my_course_requests', methods=['GET'])
+def get_my_course_requests():
+    """Get course purchase requests made by the current portal admin"""
+    try:
+        # Accept username as query param for consistency with other endpoints
+        username = request.args.get('username')
+        if username:
+            user = resolve_principal(username, role='portal_admin')
+        else:
+            # Fallback: Try to get from Authorization header (JWT)
+            auth_header = request.headers.get('Authorization', '')
+            if auth_header.startswith('Bearer '):
+                token = auth_header.split(' ')[1]
+                try:
+                    import jwt
+                    payload = jwt.decode(token, options={"verify_signature": False})
+                    username = payload.get('username')
+                    user = resolve_principal(username, role='portal_admin')
+                except Exception:
+                    return jsonify({'error': 'Invalid token'}), 401
+            else:
+                # FIX: Return 200 with empty requests for compatibility with frontend
+                return jsonify({'success': True, 'requests': []}), 200
+
+        if not user:
+            return jsonify({'success': True, 'requests': []}), 200
+
+        # Get the user's organization
+        organization = db.session.get(Organization, user.org_id)
+        if not organization:
+            return jsonify({'success': True, 'requests': []}), 200
+
+        # Get all course requests made by this user for their organization
+        requests = CourseRequest.query.filter_by(
+            organization_id=organization.id,
+            requested_by=user.id
+        ).order_by(CourseRequest.requested_at.desc()).all()
+
+        # Prepare response data
+        request_data = []
+        for req in requests:
+            request_data.append({
+                'id': req.id,
+                'course': {
+                    'id': req.course.id,
+                    'title': req.course.title
+                },
+                'payment_amount': req.payment_amount,
+                'status': req.status,
+                'requested_at': req.requested_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'approved_at': req.approved_at.strftime('%Y-%m-%d %H:%M:%S') if req.approved_at else None,
+                'approved_by': req.approved_by,
+                'admin_notes': req.admin_notes
+            })
+
+        return jsonify({
+            'success': True,
+            'requests': request_data
+        }), 200
+
+    except Exception as e:
+        return jsonify({'success': True, 'requests': []}), 200
+
+@portal_admin_bp.route('/api/admin/course_requests', methods=['GET'])
+def get_course_requests():
+    """Admin endpoint to get all course purchase requests"""
+    try:
+        # Get all course requests with related data
+        requests = CourseRequest.query.order_by(CourseRequest.requested_at.desc()).all()
+        
+        requests_list = []
+        for req in requests:
+            requests_list.append({
+                'id': req.id,
+                'organization': {
+                    'id': req.organization.id,
+                    'name': req.organization.name
+                },
+                'course': {
+                    'id': req.course.id,
+                    'title': req.course.title,
+                    'description': req.course.description
+                },
+                'requester': {
+                    'id': req.requester.id,
+                    'username': req.requester.username,
+                    'email': req.requester.email
+                },
+                'payment_amount': req.payment_amount,
+                'status': req.status,
+                'requested_at': req.requested_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'admin_notes': req.admin_notes,
+                'approved_by': req.approver.username if req.approver else None,
+                'approved_at': req.approved_at.strftime('%Y-%m-%d %H:%M:%S') if req.approved_at else None
+            })
+        
+        return jsonify({
+            'success': True,
+            'requests': requests_list,
+            'total_requests': len(requests_list),
+            'pending_requests': len([r for r in requests_list if r['status'] == 'pending'])
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch course requests: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/admin/approve_course_request', methods=['POST'])
+def approve_course_request():
+    """Admin endpoint to approve/reject course purchase requests"""
+    try:
+        data = request.json
+        request_id = data.get('request_id')
+        action = data.get('action')  # 'approve' or 'reject'
+        admin_username = data.get('admin_username')
+        admin_notes = data.get('admin_notes', '')
+        
+        if not request_id or not action or not admin_username:
+            return jsonify({'error': 'request_id, action, and admin_username are required'}), 400
+            
+        if action not in ['approve', 'reject']:
+            return jsonify({'error': 'Action must be approve or reject'}), 400
+            
+        # Find the admin user
+        admin_user = resolve_principal(admin_username, role='admin')
+        if not admin_user:
+            return jsonify({'error': 'Admin user not found'}), 404
+            
+        # Find the request
+        course_request = db.session.get(CourseRequest, request_id)
+        if not course_request:
+            return jsonify({'error': 'Course request not found'}), 404
+            
+        if course_request.status != 'pending':
+            return jsonify({'error': f'Request is already {course_request.status}'}), 409
+        
+        # Update request status
+        course_request.status = 'approved' if action == 'approve' else 'rejected'
+        course_request.approved_by = admin_user.id
+        course_request.approved_at = datetime.datetime.utcnow()
+        course_request.admin_notes = admin_notes
+        
+        # If approved, assign the course to the organization and its employees
+        if action == 'approve':
+            add_org_courses(course_request.organization_id, [course_request.course_id])
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Course request {action}d successfully',
+            'request': {
+                'id': course_request.id,
+                'status': course_request.status,
+                'admin_notes': admin_notes,
+                'approved_by': admin_user.username,
+                'approved_at': course_request.approved_at.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to {action} request: {str(e)}'}), 500
+
+@portal_admin_bp.route('/api/admin/portal_admins', methods=['GET'])
+def get_portal_admins():
+    """Get list of all portal admins for admin dashboard"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+            
+        # Verify admin role
+        user = resolve_principal(username, role='admin')
+        if not user:
+            return jsonify({'error': 'Unauthorized access - Admin role required'}), 403
+            
+        # Get all portal admins with their organization info
+        portal_admins = db.session.query(User, Organization).outerjoin(
+            Organization, User.org_id == Organization.id
+        ).filter(User.role == 'portal_admin').all()
+        
+        portal_admin_list = []
+        for admin, org in portal_admins:
+            portal_admin_list.append({
+                'id': admin.id,
+                'username': admin.username,
+                'email': admin.email,
+                'designation': admin.designation,
+                'created_at': admin.created_at.isoformat() if admin.created_at else None,
+                'organization': {
+                    'id': org.id if org else None,
+                    'name': org.name if org else 'No Organization',
+                    'domain': org.org_domain if org else None,
+                    'status': org.status if org else None
+                } if org else None
+            })
+        
+        return jsonify({
+            'success': True,
+            'portal_admins': portal_admin_list,
+            'total_count': len(portal_admin_list)
+        })
+            
+    except Exception as e:
+        print(f"Error getting portal admins: {str(e)}")
+        return jsonify({
+            'error': f'Failed to get portal admins: {str(e)}'
+        }), 500
+
+@portal_admin_bp.route('/api/admin/all_users', methods=['GET'])
+def get_all_users():
+    """Get list of all users for admin dashboard"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+            
+        # Verify admin role
+        user = resolve_principal(username, role='admin')
+        if not user:
+            return jsonify({'error': 'Unauthorized access - Admin role required'}), 403
+            
+        # Get all users with their organization info
+        all_users = db.session.query(User, Organization).outerjoin(
+            Organization, User.org_id == Organization.id
+        ).all()
+        
+        user_list = []
+        for user_obj, org in all_users:
+            user_list.append({
+                'id': user_obj.id,
+                'username': user_obj.username,
+                'email': user_obj.email,
+                'role': user_obj.role,
+                'designation': user_obj.designation,
+                'created_at': user_obj.created_at.isoformat() if user_obj.created_at else None,
+                'organization': {
+                    'id': org.id if org else None,
+                    'name': org.name if org else 'No Organization',
+                    'domain': org.org_domain if org else None,
+                    'status': org.status if org else None
+                } if org else None
+            })
+        
+        return jsonify({
+            'success': True,
+            'users': user_list,
+            'total_count': len(user_list)
+        })
+            
+    except Exception as e:
+        print(f"Error getting all users: {str(e)}")
+        return jsonify({
+            'error': f'Failed to get all users: {str(e)}'
+        }), 500
+
+@portal_admin_bp.route('/api/portal_admin/organization_statistics', methods=['GET'])
+@read_replica
+def portal_admin_organization_statistics():
+    """
+    Returns organization statistics for the portal admin dashboard.
+    """
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'success': False, 'error': 'Username is required'}), 400
+
+    user = resolve_principal(username, role='portal_admin')
+    if not user:
+        return jsonify({'success': False, 'error': 'Portal admin not found'}), 404
+
+    if not user.org_id:
+        return jsonify({'success': False, 'error': 'User not associated with an organization'}), 404
+
+    organization = Organization.query.get(user.org_id)
+    if not organization:
+        return jsonify({'success': False, 'error': 'Organization not found'}), 404
+
+    # Employees
+    employees = User.query.filter_by(org_id=organization.id, role='employee').all()
+    total_employees = len(employees)
+
+    # Courses assigned to org
+    assigned_courses = organization.courses
+    total_courses = len(assigned_courses)
+
+    # Course progress for employees
+    employee_ids = [e.id for e in employees]
+    progresses = CourseProgress.query.filter(CourseProgress.user_id.in_(employee_ids)).all()
+
+    # Completion stats
+    completed_courses = sum(1 for p in progresses if p.completion_date)
+    in_progress_courses = sum(1 for p in progresses if p.progress_percentage > 0 and not p.completion_date)
+    not_started_courses = sum(1 for p in progresses if p.progress_percentage == 0)
+    avg_progress = round(sum(p.progress_percentage for p in progresses) / len(progresses), 2) if progresses else 0
+
+    # Employees at risk (example: risk_score > 70)
+    employees_at_risk = []
+    for emp in employees:
+        emp_progress = CourseProgress.query.filter_by(user_id=emp.id).all()
+        risk_courses = []
+        for prog in emp_progress:
+            if hasattr(prog, "risk_score") and prog.risk_score and prog.risk_score > 70:
+                course = Course.query.get(prog.course_id)
+                risk_courses.append({
+                    "course_id": prog.course_id,
+                    "title": course.title if course else "",
+                    "progress": prog.progress_percentage,
+                    "risk_score": prog.risk_score
+                })
+        if risk_courses:
+            employees_at_risk.append({
+                "id": emp.id,
+                "username": emp.username,
+                "email": emp.email,
+                "risk_courses": risk_courses
+            })
+
+    # Course statistics
+    course_statistics = []
+    for course in assigned_courses:
+        course_progresses = [p for p in progresses if p.course_id == course.id]
+        enrolled_count = len(course_progresses)
+        completed_count = sum(1 for p in course_progresses if p.completion_date)
+        avg_course_progress = round(sum(p.progress_percentage for p in course_progresses) / enrolled_count, 2) if enrolled_count else 0
+        at_risk_count = sum(1 for p in course_progresses if hasattr(p, "risk_score") and p.risk_score and p.risk_score > 70)
+        completion_rate = round((completed_count / enrolled_count) * 100, 2) if enrolled_count else 0
+        course_statistics.append({
+            "id": course.id,
+            "title": course.title,
+            "enrolled_count": enrolled_count,
+            "completed_count": completed_count,
+            "avg_progress": avg_course_progress,
+            "at_risk_count": at_risk_count,
+            "completion_rate": completion_rate
+        })
+
+    # Employee statistics
+    employee_statistics = []
+    for emp in employees:
+        emp_progresses = [p for p in progresses if p.user_id == emp.id]
+        assigned_count = len(emp_progresses)
+        completed_count = sum(1 for p in emp_progresses if p.completion_date)
+        avg_emp_progress = round(sum(p.progress_percentage for p in emp_progresses) / assigned_count, 2) if assigned_count else 0
+        high_risk_count = sum(1 for p in emp_progresses if hasattr(p, "risk_score") and p.risk_score and p.risk_score > 70)
+        employee_statistics.append({
+            "id": emp.id,
+            "username": emp.username,
+            "email": emp.email,
+            "designation": emp.designation,
+            "assigned_count": assigned_count,
+            "completed_count": completed_count,
+            "avg_progress": avg_emp_progress,
+            "high_risk_count": high_risk_count
+        })
+
+    # Completion by course for analytics
+    completion_by_course = []
+    for course in assigned_courses:
+        course_progresses = [p for p in progresses if p.course_id == course.id]
+        enrolled_count = len(course_progresses)
+        completion_rate = round(
+            (sum(1 for p in course_progresses if p.completion_date) / enrolled_count) * 100, 2
+        ) if enrolled_count else 0
+        completion_by_course.append({
+            "course_id": course.id,
+            "title": course.title,
+            "completion_rate": completion_rate
+        })
+
+    # Overall completion rate
+    overall_completion_rate = round(
+        (sum(1 for p in progresses if p.completion_date) / len(progresses)) * 100, 2
+    ) if progresses else 0
+
+    # Employees at risk count for analytics
+    employees_at_risk_count = len(employees_at_risk)
+
+    return jsonify({
+        "success": True,
+        "organization": {
+            "id": organization.id,
+            "name": organization.name,
+            "total_employees": total_employees,
+            "total_courses": total_courses,
+            "overall_completion_rate": overall_completion_rate,
+            "employees_at_risk": employees_at_risk_count
+        },
+        "course_statistics": course_statistics,
+        "employee_statistics": employee_statistics,
+        "completion_by_course": completion_by_course,
+        "employees_at_risk": employees_at_risk
+    }), 200
+
+@portal_admin_bp.route('/api/portal_admin/assign_course_to_employee', methods=['POST'])
+def assign_course_to_employee():
+    """
+    Assign a course to a specific employee in the portal admin's organization.
+    Expects: { "employee_id": ..., "course_id": ... }
+    """
+    try:
+        data = request.json
+        employee_id = data.get('employee_id')
+        course_id = data.get('course_id')
+
+        if not employee_id or not course_id:
+            return jsonify({'success': False, 'error': 'employee_id and course_id are required'}), 400
+
+        employee = User.query.filter_by(id=employee_id, role='employee').first()
+        if not employee:
+            return jsonify({'success': False, 'error': 'Employee not found'}), 404
+
+        # Use db.session.get for SQLAlchemy 2.x compatibility
+        course = db.session.get(Course, course_id)
+        if not course:
+            return jsonify({'success': False, 'error': 'Course not found'}), 404
+
+        # Check if course is assigned to the employee's organization
+        if employee.org_id is None or not org_has_course(employee.org_id, course.id):
+            return jsonify({'success': False, 'error': 'Course is not assigned to the employee\'s organization'}), 400
+
+        # Lift a revocation (nothing changes if the employee already has the course)
+        if not grant_courses([employee.id], [course.id]):
+            return jsonify({'success': False, 'error': 'Course already assigned to employee'}), 409
+        db.session.commit()
+
+        return jsonify({'success': True, 'message': f'Course "{course.title}" assigned to employee "{employee.username}"'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Failed to assign course: {str(e)}'}), 500
@@ -0,0 +1,130 @@
+"""
+Process-wide cache for resolving a username to the caller's identity.
+
+Most handlers receive a ``username`` (query string, JSON body or JWT) and only
+need the user's id, role, org_id or email from it. ``resolve_principal`` serves
+those fields from an in-memory TTL cache so repeat callers skip the
+``User.query.filter_by(username=...)`` round trip.
+
+The cache lives in each worker process. Changes made through this process are
+invalidated immediately (explicit calls plus User mapper events); changes made
+by another worker become visible after at most PRINCIPAL_CACHE_TTL seconds.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+from flask import g, has_request_context
+from sqlalchemy import event, inspect
+
+from models import User
+
+Principal = namedtuple('Principal', ['id', 'username', 'role', 'org_id', 'email'])
+
+PRINCIPAL_CACHE_TTL = float(os.getenv('PRINCIPAL_CACHE_TTL', '60'))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv('PRINCIPAL_CACHE_MAX_ENTRIES', '10000'))
+
+_entries = {}  # username -> (expires_at, Principal)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _count_saved_lookup():
+    """Record a cache hit for the current request and process-wide."""
+    _stats['hits'] += 1
+    if has_request_context():
+        g.principal_lookups_saved = g.get('principal_lookups_saved', 0) + 1
+
+
+def _store(principal):
+    now = time.monotonic()
+    with _lock:
+        if len(_entries) >= PRINCIPAL_CACHE_MAX_ENTRIES:
+            for username in [u for u, (expires_at, _) in _entries.items() if expires_at <= now]:
+                del _entries[username]
+            if len(_entries) >= PRINCIPAL_CACHE_MAX_ENTRIES:
+                _entries.clear()
+        _entries[principal.username] = (now + PRINCIPAL_CACHE_TTL, principal)
+
+
+def resolve_principal(username, role=None):
+    """
+    Return the Principal for ``username``, or None if no such user exists.
+
+    When ``role`` is given, a user with a different role resolves to None,
+    matching ``User.query.filter_by(username=username, role=role).first()``.
+    """
+    if not username:
+        return None
+
+    with _lock:
+        entry = _entries.get(username)
+
+    if entry and entry[0] > time.monotonic():
+        principal = entry[1]
+        _count_saved_lookup()
+    else:
+        _stats['misses'] += 1
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            return None
+        principal = Principal(user.id, user.username, user.role, user.org_id, user.email)
+        _store(principal)
+
+    if role is not None and principal.role != role:
+        return None
+    return principal
+
+
+def invalidate_principal(username):
+    """Drop the cached identity for a single username."""
+    with _lock:
+        if _entries.pop(username, None) is not None:
+            _stats['invalidations'] += 1
+
+
+def invalidate_organization_principals(org_id):
+    """Drop every cached identity that belongs to an organization."""
+    with _lock:
+        stale = [u for u, (_, principal) in _entries.items() if principal.org_id == org_id]
+        for username in stale:
+            del _entries[username]
+        _stats['invalidations'] += len(stale)
+
+
+def clear_principal_cache():
+    with _lock:
+        _entries.clear()
+
+
+def principal_cache_stats():
+    """Process-wide counters for the admin stats endpoint."""
+    with _lock:
+        size = len(_entries)
+    lookups = _stats['hits'] + _stats['misses']
+    return {
+        'entries': size,
+        'ttl_seconds': PRINCIPAL_CACHE_TTL,
+        'hits': _stats['hits'],
+        'misses': _stats['misses'],
+        'invalidations': _stats['invalidations'],
+        'hit_rate': round(_stats['hits'] / lookups * 100, 2) if lookups else 0
+    }
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_changed_user(mapper, connection, target):
+    """Role, org, email or username changes must not be served from the cache."""
+    invalidate_principal(target.username)
+    for old_username in inspect(target).attrs.username.history.deleted:
+        invalidate_principal(old_username)
+
+
+def init_app(app):
+    """Expose the per-request count of user lookups served from the cache."""
+    @app.after_request
+    def add_principal_cache_header(response):
+        response.headers['X-Principal-Lookups-Saved'] = str(g.get('principal_lookups_saved', 0))
+        return response
@@ -0,0 +1,278 @@
+"""
+Write-behind buffer for high-frequency progress heartbeats.
+
+A player reporting every few seconds mostly repeats itself: the same user on
+the same content with a slightly larger percentage. With the buffer enabled,
+update_progress and progress_batch requests that ask for it ("buffered": true)
+are only merged into an in-memory map and answered with 202. The map keeps the
+latest state per (user, module) and per (user, content, interaction type).
+Content durations are summed and the highest percentage is kept. Only module
+completions are buffered: clearing one must be sent unbuffered, and an
+unbuffered module update drops whatever the buffer holds for that module. If a
+flush has already taken that state, it is marked superseded: the flush checks
+for superseded states under _commit_lock just before each commit, and redoes
+the chunk without them. A direct write in the same worker therefore either
+removes the buffered state before it is committed or lands after it, and a
+late flush never undoes it. A background
+thread in each worker writes the map through progress_ingest.ingest_events
+every PROGRESS_BUFFER_FLUSH_INTERVAL seconds. It flushes early once
+PROGRESS_BUFFER_MAX_KEYS states are pending, and once more when the worker
+shuts down (gunicorn worker_exit, or atexit elsewhere).
+
+Malformed events are refused on arrival. Access to the course or content is
+checked when the event is flushed, and events rejected then are only counted
+in the metrics (states_rejected). States from a write that fails are merged
+back into the buffer and retried on the next flush, up to
+PROGRESS_BUFFER_MAX_ATTEMPTS times; after that, or during the final flush at
+shutdown, they are dropped and counted (states_dropped). States left out
+because a direct write overtook them are counted in states_superseded. Anything still
+buffered when a worker dies without shutting down is lost, so clients should
+keep sending explicit completions unbuffered.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+
+from models import db
+from progress_ingest import PROGRESS_BATCH_MAX_EVENTS, coalesce_events, ingest_events
+
+PROGRESS_BUFFER_ENABLED = os.getenv('PROGRESS_BUFFER_ENABLED', 'false').lower() == 'true'
+PROGRESS_BUFFER_FLUSH_INTERVAL = float(os.getenv('PROGRESS_BUFFER_FLUSH_INTERVAL', '5'))
+PROGRESS_BUFFER_MAX_KEYS = int(os.getenv('PROGRESS_BUFFER_MAX_KEYS', '5000'))
+PROGRESS_BUFFER_MAX_ATTEMPTS = int(os.getenv('PROGRESS_BUFFER_MAX_ATTEMPTS', '3'))
+
+logger = logging.getLogger(__name__)
+
+_pending = {}     # (user_id, 'module', course_id, module_id) -> True
+                  # (user_id, 'content', content_id, interaction_type) -> {duration_seconds, completion_percentage}
+_principals = {}  # user_id -> principal (anything with .id and .org_id) for the pending events
+_attempts = {}    # user_id -> failed flushes in a row (only touched by flush)
+_in_flight = set()   # module keys taken by the running flush
+_superseded = set()  # in-flight module keys written directly since they were taken
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_commit_lock = threading.Lock()  # orders flush commits against discard_modules; taken before _lock
+_wakeup = threading.Event()
+_flusher = {'thread': None, 'pid': None, 'app': None, 'stopping': False}
+_stats = {
+    'events_received': 0,
+    'events_rejected': 0,
+    'states_flushed': 0,
+    'states_rejected': 0,
+    'states_requeued': 0,
+    'states_dropped': 0,
+    'states_superseded': 0,
+    'rows_written': 0,
+    'flushes': 0,
+    'flush_failures': 0,
+    'last_flush_ms': 0.0,
+    'last_flush_at': None,
+}
+
+
+def buffering_enabled():
+    return current_app.config.get('PROGRESS_BUFFER_ENABLED', PROGRESS_BUFFER_ENABLED)
+
+
+def _merge(principal, modules, contents, keep_pending=False):
+    """Fold coalesced states into the buffer; keep_pending leaves newer module states alone. Needs _lock."""
+    _principals.setdefault(principal.id, principal)
+    for course_id, module_id in modules:
+        key = (principal.id, 'module', course_id, module_id)
+        if not keep_pending or key not in _pending:
+            _pending[key] = True
+    for (content_id, interaction_type), row in contents.items():
+        state = _pending.setdefault((principal.id, 'content', content_id, interaction_type),
+                                    {'duration_seconds': None, 'completion_percentage': None})
+        if row['duration_seconds'] is not None:
+            state['duration_seconds'] = (state['duration_seconds'] or 0) + row['duration_seconds']
+        if row['completion_percentage'] is not None:
+            state['completion_percentage'] = max(state['completion_percentage'] or 0.0,
+                                                 row['completion_percentage'])
+
+
+def buffer_events(principal, events):
+    """Merge a user's events into the buffer. Returns the events rejected as malformed or not bufferable."""
+    modules, contents, rejected = coalesce_events(events)
+    for key, (index, completed) in list(modules.items()):
+        if not completed:
+            del modules[key]
+            rejected.append({'index': index, 'error': 'Only module completions can be buffered'})
+    rejected.sort(key=lambda r: r['index'])
+    with _lock:
+        _stats['events_received'] += len(events)
+        _stats['events_rejected'] += len(rejected)
+        _principals[principal.id] = principal
+        _merge(principal, modules, contents)
+        full = len(_pending) >= PROGRESS_BUFFER_MAX_KEYS
+    _ensure_flusher(current_app._get_current_object())
+    if full:
+        _wakeup.set()
+    return rejected
+
+
+def discard_modules(user_id, module_keys):
+    """Drop buffered states for (course_id, module_id) pairs that are being written unbuffered.
+
+    Call before the write: states a running flush has already taken are marked
+    superseded, and that flush leaves them out of anything it has not committed yet.
+    """
+    with _commit_lock, _lock:
+        for course_id, module_id in module_keys:
+            key = (user_id, 'module', course_id, module_id)
+            _pending.pop(key, None)
+            if key in _in_flight:
+                _superseded.add(key)
+
+
+def _module_key(user_id, event):
+    return (user_id, 'module', event['course_id'], event['module_id']) if event['type'] == 'module' else None
+
+
+def _write_chunk(principal, events):
+    """Ingest and commit one chunk without the states superseded meanwhile. Returns (result, states written)."""
+    while True:
+        events = [event for event in events if _module_key(principal.id, event) not in _superseded]
+        result = ingest_events(principal, events)
+        with _commit_lock:
+            if not any(_module_key(principal.id, event) in _superseded for event in events):
+                db.session.commit()
+                return result, len(events)
+        db.session.rollback()
+
+
+def _take_pending():
+    with _lock:
+        pending, principals = dict(_pending), dict(_principals)
+        _pending.clear()
+        _principals.clear()
+        _in_flight.update(key for key in pending if key[1] == 'module')
+    by_user = {}
+    for (user_id, kind, first, second), state in pending.items():
+        if kind == 'module':
+            event = {'type': 'module', 'course_id': first, 'module_id': second, 'completed': state}
+        else:
+            event = dict(state, type='content', content_id=first, interaction_type=second)
+        by_user.setdefault(user_id, []).append(event)
+    return by_user, principals
+
+
+def flush():
+    """Write everything buffered so far, one transaction per user. Needs an app context."""
+    with _flush_lock:
+        start = time.perf_counter()
+        by_user, principals = _take_pending()
+        flushed = written = rejected = failures = requeued = dropped = superseded = 0
+        for user_id, events in by_user.items():
+            # Put failed states back for the next flush unless this user keeps failing or we are stopping
+            give_up = _flusher['stopping'] or _attempts.get(user_id, 0) + 1 >= PROGRESS_BUFFER_MAX_ATTEMPTS
+            failed = False
+            for i in range(0, len(events), PROGRESS_BATCH_MAX_EVENTS):
+                chunk = events[i:i + PROGRESS_BATCH_MAX_EVENTS]
+                try:
+                    result, written_states = _write_chunk(principals[user_id], chunk)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Progress buffer flush failed for user %s', user_id)
+                    failures += 1
+                    failed = True
+                    with _commit_lock, _lock:
+                        kept = [event for event in chunk if _module_key(user_id, event) not in _superseded]
+                        if not give_up:
+                            modules, contents, _ = coalesce_events(kept)
+                            _merge(principals[user_id], modules, contents, keep_pending=True)
+                    superseded += len(chunk) - len(kept)
+                    if give_up:
+                        dropped += len(kept)
+                    else:
+                        requeued += len(kept)
+                    continue
+                superseded += len(chunk) - written_states
+                flushed += written_states
+                rejected += len(result['rejected'])
+                written += result['modules_updated'] + result['interactions_recorded'] + len(result['progress'])
+            if failed and not give_up:
+                _attempts[user_id] = _attempts.get(user_id, 0) + 1
+            else:
+                _attempts.pop(user_id, None)
+        elapsed = (time.perf_counter() - start) * 1000
+        with _commit_lock, _lock:
+            _in_flight.clear()
+            _superseded.clear()
+            _stats['states_flushed'] += flushed
+            _stats['states_rejected'] += rejected
+            _stats['rows_written'] += written
+            _stats['flush_failures'] += failures
+            _stats['states_requeued'] += requeued
+            _stats['states_dropped'] += dropped
+            _stats['states_superseded'] += superseded
+            if by_user:
+                _stats['flushes'] += 1
+                _stats['last_flush_ms'] = round(elapsed, 2)
+                _stats['last_flush_at'] = time.time()
+        return {'states_flushed': flushed, 'rows_written': written, 'rejected': rejected, 'failures': failures,
+                'requeued': requeued, 'dropped': dropped, 'superseded': superseded}
+
+
+def _run(app):
+    while not _flusher['stopping']:
+        _wakeup.wait(PROGRESS_BUFFER_FLUSH_INTERVAL)
+        _wakeup.clear()
+        if _flusher['stopping']:
+            break
+        with app.app_context():
+            try:
+                flush()
+            finally:
+                db.session.remove()
+
+
+def _ensure_flusher(app):
+    """Start this process's flush thread (threads from a preloading master do not survive the fork)."""
+    if _flusher['pid'] == os.getpid() and _flusher['thread'] and _flusher['thread'].is_alive():
+        return
+    with _lock:
+        if _flusher['pid'] == os.getpid() and _flusher['thread'] and _flusher['thread'].is_alive():
+            return
+        _flusher.update(pid=os.getpid(), app=app, stopping=False,
+                        thread=threading.Thread(target=_run, args=(app,), name='progress-buffer', daemon=True))
+        _flusher['thread'].start()
+
+
+def shutdown(timeout=10):
+    """Stop the flush thread and write what is left. Safe to call more than once."""
+    app = _flusher['app']
+    _flusher['stopping'] = True
+    _wakeup.set()
+    thread = _flusher['thread']
+    if thread and thread.is_alive() and thread is not threading.current_thread():
+        thread.join(timeout)
+    if app is not None and _flusher['pid'] == os.getpid():
+        with app.app_context():
+            try:
+                return flush()
+            finally:
+                db.session.remove()
+
+
+def progress_buffer_stats():
+    """Process-wide counters for the admin stats endpoint."""
+    with _lock:
+        stats = dict(_stats, pending_states=len(_pending), pending_users=len(_principals))
+    stats.update(
+        enabled=current_app.config.get('PROGRESS_BUFFER_ENABLED', PROGRESS_BUFFER_ENABLED),
+        flush_interval_seconds=PROGRESS_BUFFER_FLUSH_INTERVAL,
+        max_keys=PROGRESS_BUFFER_MAX_KEYS,
+        flusher_running=bool(_flusher['thread'] and _flusher['thread'].is_alive()
+                             and _flusher['pid'] == os.getpid()),
+    )
+    received = stats['events_received']
+    stats['write_ratio'] = round(stats['rows_written'] / received, 4) if received else 0
+    return stats
+
+
+atexit.register(shutdown)
@@ -1,4 +1,14 @@
-@app.route('/api/employee/update_progress', methods=['POST'])
+from flask import Blueprint, jsonify, request
+from models import db, Course, Module
+from principal_cache import resolve_principal
+from course_access import has_course
+from progress_ingest import (PROGRESS_BATCH_MAX_EVENTS, ProgressBatchTooLarge, apply_course_progress,
+                             coalesce_events, ingest_events, progress_dict)
+from progress_buffer import buffer_events, buffering_enabled, discard_modules, progress_buffer_stats
+
+progress_bp = Blueprint('progress', __name__)
+
+@progress_bp.route('/api/employee/update_progress', methods=['POST'])
 def update_course_progress():
     """Update progress for a specific course for an employee"""
     try:
@@ -12,89 +22,97 @@ def update_course_progress():
             return jsonify({'error': 'Username, course_id, and module_id are required'}), 400
             
         # Find the employee
-        user = User.query.filter_by(username=username, role='employee').first()
+        user = resolve_principal(username, role='employee')
         if not user:
             return jsonify({'error': 'Employee not found'}), 404
         
+        # Completions may opt in to the write-behind buffer (validated when flushed, see progress_buffer.py);
+        # clearing a completion is always written now
+        if data.get('buffered') and completed and buffering_enabled():
+            rejected = buffer_events(user, [
+                {'type': 'module', 'course_id': course_id, 'module_id': module_id, 'completed': completed}])
+            if rejected:
+                return jsonify({'error': rejected[0]['error']}), 400
+            return jsonify({'success': True, 'buffered': True}), 202
+        
         # Check if the course exists and is assigned to the employee
         course = db.session.get(Course, course_id)
         if not course:
             return jsonify({'error': 'Course not found'}), 404
             
-        if course not in user.courses:
+        if not has_course(user, course.id):
             return jsonify({'error': 'Course not assigned to this employee'}), 403
         
-        # Get or create progress record
-        progress_record = CourseProgress.query.filter_by(
-            user_id=user.id, 
-            course_id=course_id
-        ).first()
-        
-        if not progress_record:
-            total_modules = len(course.modules)
-            progress_record = CourseProgress(
-                user_id=user.id,
-                course_id=course_id,
-                total_modules=total_modules,
-                completed_modules=0,
-                progress_percentage=0,
-                module_progress=json.dumps({})
-            )
-            db.session.add(progress_record)
-        
-        # Update module progress
-        module_progress = json.loads(progress_record.module_progress)
-        module_id_str = str(module_id)
-        
-        if completed and module_id_str not in module_progress:
-            module_progress[module_id_str] = {
-                'completed': True,
-                'completion_date': datetime.datetime.utcnow().isoformat()
-            }
-            progress_record.completed_modules += 1
-        elif not completed and module_id_str in module_progress:
-            del module_progress[module_id_str]
-            progress_record.completed_modules -= 1
-            
-        # Update progress percentage
-        if progress_record.total_modules > 0:
-            progress_record.progress_percentage = (progress_record.completed_modules / progress_record.total_modules) * 100
-        
-        # Update last activity
-        progress_record.last_activity = datetime.datetime.utcnow()
+        if not db.session.execute(
+            db.select(Module.id).where(Module.id == module_id, Module.course_id == course.id)
+        ).first():
+            return jsonify({'error': 'Module not found in this course'}), 404
         
-        # Check if course is completed
-        if progress_record.completed_modules == progress_record.total_modules:
-            progress_record.completion_date = datetime.datetime.utcnow()
-            # Reset risk score when completed
-            progress_record.risk_score = 0
-        else:
-            # Calculate risk score based on progress and activity
-            days_since_activity = (datetime.datetime.utcnow() - progress_record.last_activity).days
-            expected_progress = min(100, days_since_activity * 5)  # Rough estimate: should complete ~5% per day
-            actual_progress = progress_record.progress_percentage
-            
-            if expected_progress > actual_progress:
-                progress_record.risk_score = min(100, int((expected_progress - actual_progress) * 1.5))
-            else:
-                progress_record.risk_score = max(0, progress_record.risk_score - 10)  # Reduce risk if ahead of schedule
+        # A buffered state for this module is older than this write, so it must not be flushed after it
+        discard_modules(user.id, [(course.id, int(module_id))])
+        progress_record = apply_course_progress(user.id, course, {module_id: completed})
         
         # Save changes
-        progress_record.module_progress = json.dumps(module_progress)
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'progress': {
-                'course_id': course_id,
-                'completed_modules': progress_record.completed_modules,
-                'total_modules': progress_record.total_modules,
-                'progress_percentage': progress_record.progress_percentage,
-                'is_completed': progress_record.completed_modules == progress_record.total_modules,
-                'risk_score': progress_record.risk_score
-            }
+            'progress': progress_dict(progress_record)
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to update progress: {str(e)}'}), 500
+
+
+@progress_bp.route('/api/employee/progress_batch', methods=['POST'])
+def ingest_progress_batch():
+    """Apply a batch of module and content progress events in one transaction (see progress_ingest.py)"""
+    try:
+        data = request.get_json() or {}
+        username = data.get('username')
+        events = data.get('events')
+        
+        if not username or not isinstance(events, list):
+            return jsonify({'error': 'Username and an events array are required'}), 400
+        if len(events) > PROGRESS_BATCH_MAX_EVENTS:
+            return jsonify({'error': f'At most {PROGRESS_BATCH_MAX_EVENTS} events per batch',
+                            'max_events': PROGRESS_BATCH_MAX_EVENTS}), 413
+        
+        user = resolve_principal(username, role='employee')
+        if not user:
+            return jsonify({'error': 'Employee not found'}), 404
+        
+        if data.get('buffered') and buffering_enabled():
+            rejected = buffer_events(user, events)
+            return jsonify({'success': True, 'buffered': True, 'accepted': len(events) - len(rejected),
+                            'rejected': rejected}), 202
+        
+        discard_modules(user.id, coalesce_events(events)[0])
+        result = ingest_events(user, events)
+        db.session.commit()
+        
+        return jsonify(dict(result, success=True)), 200
+        
+    except ProgressBatchTooLarge as e:
+        return jsonify({'error': str(e), 'max_events': PROGRESS_BATCH_MAX_EVENTS}), 413
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to record progress: {str(e)}'}), 500
+
+
+@progress_bp.route('/api/admin/progress_buffer_stats', methods=['GET'])
+def get_progress_buffer_stats():
+    """Report this worker's write-behind buffer: events received versus rows written"""
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Username is required'}), 400
+    
+    user = resolve_principal(username, role='admin')
+    if not user:
+        return jsonify({'error': 'Unauthorized access - Admin role required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'data': progress_buffer_stats()
+    })
@@ -0,0 +1,240 @@
+"""
+Progress events from the course player, applied one batch at a time.
+
+A client collects module and content progress events and sends them together
+to POST /api/employee/progress_batch instead of one update_progress call each.
+A batch holds at most PROGRESS_BATCH_MAX_EVENTS events:
+
+    {"username": "jdoe", "events": [
+        {"type": "module", "course_id": 1, "module_id": 4, "completed": true},
+        {"type": "content", "content_id": 12, "interaction_type": "progress",
+         "duration_seconds": 30, "completion_percentage": 45.0}
+    ]}
+
+Events are coalesced before anything is written. For each module the last
+event wins, and each course's CourseProgress row is updated once however many
+of its modules changed. Content events become one ContentInteraction row per
+(content, interaction type), with durations summed and the highest completion
+percentage kept. Access is checked once for the whole batch. The batch is
+applied in one transaction, and events that fail validation are returned as
+rejected instead of failing the rest.
+"""
+import datetime
+import os
+
+from sqlalchemy import case, func, insert, literal, select
+
+from models import db, Course, Module, ModuleContent, CourseProgress, ModuleCompletion, ContentInteraction
+from course_access import effective_course_ids
+from db_upsert import dialect_insert, supports_on_conflict
+from module_completion import set_module_completed, completed_module_count
+
+PROGRESS_BATCH_MAX_EVENTS = int(os.getenv('PROGRESS_BATCH_MAX_EVENTS', '500'))
+INTERACTION_TYPES = ('view', 'download', 'complete', 'progress')
+
+
+class ProgressBatchTooLarge(ValueError):
+    pass
+
+
+def upsert_course_progress(user_id, course_id, delta, now=None):
+    """Create or refresh a CourseProgress row in one INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    delta is the net change set_module_completed reported for this transaction.
+    A new row is counted from module_completion. An existing row gets
+    completed_modules = course_progress.completed_modules + delta, which reads the
+    row the statement has locked rather than a count taken before the lock, so
+    under READ COMMITTED a concurrent update for the same course waits and then
+    adds its own change instead of overwriting it. The unique key
+    (uq_course_progress_user_course) rules out a second row. progress_percentage,
+    the completion date and the risk score follow from the same expression.
+    """
+    now = now or datetime.datetime.utcnow()
+    progress = CourseProgress.__table__
+    completions = ModuleCompletion.__table__
+    completed = select(func.count()).where(
+        completions.c.user_id == user_id, completions.c.course_id == course_id).scalar_subquery()
+    modules = select(func.count()).where(Module.course_id == course_id).scalar_subquery()
+    statement = dialect_insert(progress).values(
+        user_id=user_id, course_id=course_id, completed_modules=completed, total_modules=modules,
+        progress_percentage=case((modules > 0, completed * 100.0 / modules), else_=literal(0.0)),
+        last_activity=now, completion_date=case((completed == modules, now)), risk_score=0,
+    )
+    completed_now = progress.c.completed_modules + delta
+    is_completed = completed_now == progress.c.total_modules
+    statement = statement.on_conflict_do_update(
+        index_elements=[progress.c.user_id, progress.c.course_id],
+        set_={
+            'completed_modules': completed_now,
+            'progress_percentage': case(
+                (progress.c.total_modules > 0, completed_now * 100.0 / progress.c.total_modules),
+                else_=progress.c.progress_percentage),
+            'last_activity': now,
+            'completion_date': case((is_completed, now), else_=progress.c.completion_date),
+            # Reset risk when completed, otherwise ease it (risk_scores.py raises it for inactivity)
+            'risk_score': case((is_completed, 0), (progress.c.risk_score > 10, progress.c.risk_score - 10), else_=0),
+        },
+    ).returning(progress.c.course_id, progress.c.completed_modules, progress.c.total_modules,
+                progress.c.progress_percentage, progress.c.risk_score)
+    return db.session.execute(statement).one()
+
+
+def apply_course_progress(user_id, course, module_states):
+    """Apply {module_id: completed} to one course and refresh its CourseProgress row. The caller commits."""
+    delta = 0
+    for module_id, completed in module_states.items():
+        delta += set_module_completed(user_id, course.id, module_id, completed)
+    if supports_on_conflict():
+        return upsert_course_progress(user_id, course.id, delta)
+
+    progress_record = CourseProgress.query.filter_by(user_id=user_id, course_id=course.id).first()
+    created = progress_record is None
+    if created:
+        progress_record = CourseProgress(
+            user_id=user_id,
+            course_id=course.id,
+            total_modules=len(course.modules),
+            completed_modules=0,
+            progress_percentage=0,
+            risk_score=0
+        )
+        db.session.add(progress_record)
+
+    # Completions are already recorded above (one row each); recount once from the rows
+    if delta or created:
+        progress_record.completed_modules = completed_module_count(user_id, course.id)
+
+    # Update progress percentage
+    if progress_record.total_modules > 0:
+        progress_record.progress_percentage = (progress_record.completed_modules / progress_record.total_modules) * 100
+
+    # Update last activity
+    progress_record.last_activity = datetime.datetime.utcnow()
+
+    # Check if course is completed
+    if progress_record.completed_modules == progress_record.total_modules:
+        progress_record.completion_date = datetime.datetime.utcnow()
+        # Reset risk score when completed
+        progress_record.risk_score = 0
+    else:
+        # Activity eases the risk; inactivity, pace and quiz results raise it in the nightly risk_scores.py job
+        progress_record.risk_score = max(0, (progress_record.risk_score or 0) - 10)
+    return progress_record
+
+
+def progress_dict(progress_record):
+    return {
+        'course_id': progress_record.course_id,
+        'completed_modules': progress_record.completed_modules,
+        'total_modules': progress_record.total_modules,
+        'progress_percentage': progress_record.progress_percentage,
+        'is_completed': progress_record.completed_modules == progress_record.total_modules,
+        'risk_score': progress_record.risk_score
+    }
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def coalesce_events(events):
+    """Split a batch into ({(course_id, module_id): (index, completed)}, {(content_id, type): row}, rejected)."""
+    if len(events) > PROGRESS_BATCH_MAX_EVENTS:
+        raise ProgressBatchTooLarge(f'At most {PROGRESS_BATCH_MAX_EVENTS} events per batch')
+    modules, contents, rejected = {}, {}, []
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            rejected.append({'index': index, 'error': 'Event must be an object'})
+            continue
+        kind = event.get('type') or ('content' if 'content_id' in event else 'module')
+        if kind == 'module':
+            course_id, module_id = _as_int(event.get('course_id')), _as_int(event.get('module_id'))
+            if course_id is None or module_id is None:
+                rejected.append({'index': index, 'error': 'course_id and module_id are required'})
+                continue
+            modules[(course_id, module_id)] = (index, bool(event.get('completed', False)))
+        elif kind == 'content':
+            content_id = _as_int(event.get('content_id'))
+            interaction_type = event.get('interaction_type', 'progress')
+            if content_id is None or interaction_type not in INTERACTION_TYPES:
+                rejected.append({'index': index, 'error': 'content_id and a valid interaction_type are required'})
+                continue
+            row = contents.setdefault((content_id, interaction_type), {
+                'indexes': [], 'content_id': content_id, 'interaction_type': interaction_type,
+                'duration_seconds': None, 'completion_percentage': None,
+            })
+            row['indexes'].append(index)
+            duration = _as_number(event.get('duration_seconds'))
+            if duration is not None and duration > 0:
+                row['duration_seconds'] = (row['duration_seconds'] or 0) + int(duration)
+            percentage = _as_number(event.get('completion_percentage'))
+            if percentage is not None:
+                percentage = min(100.0, max(0.0, percentage))
+                row['completion_percentage'] = max(row['completion_percentage'] or 0.0, percentage)
+        else:
+            rejected.append({'index': index, 'error': f'Unknown event type: {kind}'})
+    return modules, contents, rejected
+
+
+def ingest_events(user, events):
+    """Validate and apply one batch for a user in the current transaction. The caller commits."""
+    modules, contents, rejected = coalesce_events(events)
+    accessible = effective_course_ids(user)
+
+    module_courses = dict(db.session.execute(
+        select(Module.id, Module.course_id).where(Module.id.in_({module_id for _, module_id in modules}))
+    ).all()) if modules else {}
+    by_course = {}
+    for (course_id, module_id), (index, completed) in sorted(modules.items(), key=lambda item: item[1][0]):
+        if course_id not in accessible:
+            rejected.append({'index': index, 'error': 'Course not assigned to this employee'})
+        elif module_courses.get(module_id) != course_id:
+            rejected.append({'index': index, 'error': 'Module not found in this course'})
+        else:
+            by_course.setdefault(course_id, {})[module_id] = completed
+
+    progress = []
+    if by_course:
+        for course in Course.query.filter(Course.id.in_(by_course)).order_by(Course.id).all():
+            progress.append(progress_dict(apply_course_progress(user.id, course, by_course[course.id])))
+
+    content_courses = dict(db.session.execute(
+        select(ModuleContent.id, Module.course_id).join(Module, Module.id == ModuleContent.module_id)
+        .where(ModuleContent.id.in_({content_id for content_id, _ in contents}))
+    ).all()) if contents else {}
+    now = datetime.datetime.utcnow()
+    interactions = []
+    for (content_id, _), row in contents.items():
+        if content_courses.get(content_id) not in accessible:
+            rejected.extend({'index': index, 'error': 'Content not found in an assigned course'}
+                            for index in row['indexes'])
+            continue
+        interactions.append({
+            'user_id': user.id, 'content_id': content_id, 'interaction_type': row['interaction_type'],
+            'timestamp': now, 'duration_seconds': row['duration_seconds'],
+            'completion_percentage': row['completion_percentage'],
+        })
+    if interactions:
+        db.session.execute(insert(ContentInteraction), interactions)
+
+    return {
+        'accepted': len(events) - len(rejected),
+        'rejected': sorted(rejected, key=lambda r: r['index']),
+        'modules_updated': sum(len(states) for states in by_course.values()),
+        'interactions_recorded': len(interactions),
+        'progress': progress,
+    }
@@ -0,0 +1,54 @@
+"""
+Per-endpoint SQL statement budgets.
+
+``@query_budget(n)`` declares how many statements a view may run. The count is
+returned on every response as X-Query-Count. When a view goes over its budget
+the overrun is logged, or raised as an AssertionError when QUERY_BUDGET_STRICT
+is on (set it in development and CI so N+1 regressions fail loudly).
+"""
+import os
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def count_queries(engine):
+    event.listen(engine, 'before_cursor_execute', _count_statement)
+
+
+def query_budget(limit):
+    """Fail (strict mode) or warn when the view runs more than ``limit`` statements."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = g.get('query_count', 0)
+            response = view(*args, **kwargs)
+            used = g.get('query_count', 0) - start
+            if used > limit:
+                message = f"{view.__name__} ran {used} queries, budget is {limit}"
+                if current_app.config.get('QUERY_BUDGET_STRICT'):
+                    raise AssertionError(message)
+                print(f"Query budget exceeded: {message}")
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+def init_app(app, db):
+    app.config.setdefault('QUERY_BUDGET_STRICT', os.getenv('QUERY_BUDGET_STRICT', 'false').lower() == 'true')
+    with app.app_context():
+        count_queries(db.engine)
+    if 'lms_replica' in app.extensions:
+        count_queries(app.extensions['lms_replica']['engine'])
+
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers['X-Query-Count'] = str(g.get('query_count', 0))
+        return response
@@ -0,0 +1,458 @@
+from flask import Blueprint, jsonify, request
+import datetime
+import json
+from models import db, ModuleContent, QuizQuestion, QuizOption, QuizAttempt
+from principal_cache import resolve_principal
+from course_access import content_course_id, has_course
+from content_cache import bump_module_course_version
+from ordering import next_order, reorder
+
+quizzes_bp = Blueprint('quizzes', __name__)
+
+# Quiz API endpoints for Superadmin
+@quizzes_bp.route('/api/contents/<int:content_id>/questions', methods=['POST'])
+def create_quiz_question(content_id):
+    """Create a quiz question for a specific quiz content (Superadmin only)"""
+    try:
+        # Get the content and verify it's a quiz
+        content = ModuleContent.query.get_or_404(content_id)
+        
+        if content.content_type != 'quiz':
+            return jsonify({"success": False, "message": "This content is not a quiz"}), 400
+        
+        data = request.get_json()
+        question_text = data.get('question_text')
+        question_type = data.get('question_type', 'multiple-choice')
+        options = data.get('options', [])
+        order = data.get('order')
+        
+        # Validation
+        if not question_text:
+            return jsonify({"success": False, "message": "Question text is required"}), 400
+        
+        if question_type not in ['multiple-choice', 'single-choice', 'true-false']:
+            return jsonify({"success": False, "message": "Invalid question type"}), 400
+        
+        if not options or len(options) < 2:
+            return jsonify({"success": False, "message": "At least 2 options are required"}), 400
+        
+        # Check if at least one option is marked as correct
+        correct_options = [opt for opt in options if opt.get('is_correct', False)]
+        if not correct_options:
+            return jsonify({"success": False, "message": "At least one option must be marked as correct"}), 400
+        
+        # For single-choice and multiple-choice, ensure proper validation
+        if question_type in ['single-choice', 'multiple-choice'] and question_type == 'single-choice' and len(correct_options) > 1:
+            return jsonify({"success": False, "message": "Single-choice questions can have only one correct answer"}), 400
+        
+        # If order is not provided, add it at the end
+        if order is None:
+            order = next_order(QuizQuestion.order, QuizQuestion.content_id, content_id)
+        
+        # Create the question
+        question = QuizQuestion(
+            question_text=question_text,
+            question_type=question_type,
+            order=order,
+            content_id=content_id
+        )
+        
+        db.session.add(question)
+        db.session.flush()  # To get the question ID for options
+        
+        # Add options
+        for i, option_data in enumerate(options):
+            option_text = option_data.get('option_text', '').strip()
+            is_correct = option_data.get('is_correct', False)
+            
+            if not option_text:
+                return jsonify({"success": False, "message": f"Option {i+1} text cannot be empty"}), 400
+            
+            option = QuizOption(
+                option_text=option_text,
+                is_correct=is_correct,
+                question_id=question.id
+            )
+            
+            db.session.add(option)
+        
+        bump_module_course_version(content.module_id)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True, 
+            "message": "Quiz question created successfully",
+            "question": {
+                "id": question.id,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "order": question.order,
+                "content_id": question.content_id,
+                "options": [
+                    {
+                        "id": option.id,
+                        "option_text": option.option_text,
+                        "is_correct": option.is_correct
+                    }
+                    for option in question.options
+                ]
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error creating question: {str(e)}"}), 500
+
+@quizzes_bp.route('/api/contents/<int:content_id>/questions', methods=['GET'])
+def get_quiz_questions(content_id):
+    """Get all questions for a quiz content"""
+    try:
+        content = ModuleContent.query.get_or_404(content_id)
+        
+        if content.content_type != 'quiz':
+            return jsonify({"success": False, "message": "This content is not a quiz"}), 400
+        
+        questions = QuizQuestion.query.filter_by(content_id=content_id).order_by(QuizQuestion.order).all()
+        
+        questions_data = []
+        for question in questions:
+            options_data = []
+            for option in question.options:
+                options_data.append({
+                    "id": option.id,
+                    "option_text": option.option_text,
+                    "is_correct": option.is_correct
+                })
+            
+            questions_data.append({
+                "id": question.id,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "order": question.order,
+                "options": options_data
+            })
+        
+        return jsonify({
+            "success": True,
+            "quiz": {
+                "id": content.id,
+                "title": content.title,
+                "content_type": content.content_type,
+                "questions": questions_data
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error fetching questions: {str(e)}"}), 500
+
+@quizzes_bp.route('/api/contents/<int:content_id>/questions/order', methods=['PUT'])
+def reorder_quiz_questions(content_id):
+    """Apply a new question order for a quiz in one statement: {"question_ids": [...]} (Superadmin only)"""
+    content = ModuleContent.query.get_or_404(content_id)
+    
+    if content.content_type != 'quiz':
+        return jsonify({"success": False, "message": "This content is not a quiz"}), 400
+    
+    try:
+        data = request.get_json() or {}
+        error = reorder(QuizQuestion, QuizQuestion.content_id, content.id, data.get('question_ids'))
+        if error:
+            db.session.rollback()
+            return jsonify({"success": False, "message": error}), 400
+        
+        bump_module_course_version(content.module_id)
+        db.session.commit()
+        
+        return jsonify({"success": True, "message": "Questions reordered successfully"}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error reordering questions: {str(e)}"}), 500
+
+@quizzes_bp.route('/api/questions/<int:question_id>', methods=['PUT'])
+def update_quiz_question(question_id):
+    """Update a quiz question (Superadmin only)"""
+    try:
+        question = QuizQuestion.query.get_or_404(question_id)
+        
+        data = request.get_json()
+        question_text = data.get('question_text')
+        question_type = data.get('question_type')
+        options = data.get('options', [])
+        order = data.get('order')
+        
+        # Validation
+        if question_text is not None:
+            if not question_text.strip():
+                return jsonify({"success": False, "message": "Question text cannot be empty"}), 400
+            question.question_text = question_text.strip()
+        
+        if question_type is not None:
+            if question_type not in ['multiple-choice', 'single-choice', 'true-false']:
+                return jsonify({"success": False, "message": "Invalid question type"}), 400
+            question.question_type = question_type
+        
+        if order is not None:
+            question.order = order
+        
+        # Update options if provided
+        if options:
+            if len(options) < 2:
+                return jsonify({"success": False, "message": "At least 2 options are required"}), 400
+            
+            # Check if at least one option is marked as correct
+            correct_options = [opt for opt in options if opt.get('is_correct', False)]
+            if not correct_options:
+                return jsonify({"success": False, "message": "At least one option must be marked as correct"}), 400
+            
+            # For single-choice questions, ensure only one correct answer
+            if question.question_type == 'single-choice' and len(correct_options) > 1:
+                return jsonify({"success": False, "message": "Single-choice questions can have only one correct answer"}), 400
+            
+            # Delete existing options
+            QuizOption.query.filter_by(question_id=question.id).delete()
+            
+            # Add new options
+            for option_data in options:
+                option_text = option_data.get('option_text', '').strip()
+                is_correct = option_data.get('is_correct', False)
+                
+                if not option_text:
+                    return jsonify({"success": False, "message": "Option text cannot be empty"}), 400
+                
+                option = QuizOption(
+                    option_text=option_text,
+                    is_correct=is_correct,
+                    question_id=question.id
+                )
+                db.session.add(option)
+        
+        bump_module_course_version(question.content.module_id)
+        db.session.commit()
+        
+        # Return updated question data
+        options_data = []
+        for option in question.options:
+            options_data.append({
+                "id": option.id,
+                "option_text": option.option_text,
+                "is_correct": option.is_correct
+            })
+        
+        return jsonify({
+            "success": True,
+            "message": "Question updated successfully",
+            "question": {
+                "id": question.id,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "order": question.order,
+                "content_id": question.content_id,
+                "options": options_data
+            }
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error updating question: {str(e)}"}), 500
+
+@quizzes_bp.route('/api/questions/<int:question_id>', methods=['DELETE'])
+def delete_quiz_question(question_id):
+    """Delete a quiz question (Superadmin only)"""
+    try:
+        question = QuizQuestion.query.get_or_404(question_id)
+        
+        # Delete associated options first (though should cascade)
+        QuizOption.query.filter_by(question_id=question.id).delete()
+        
+        # Delete the question
+        bump_module_course_version(question.content.module_id)
+        db.session.delete(question)
+        db.session.commit()
+        
+        return jsonify({
+            "success": True,
+            "message": "Question deleted successfully"
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": f"Error deleting question: {str(e)}"}), 500
+
+# Employee Quiz Endpoints
+@quizzes_bp.route('/api/employee/quiz/<int:quiz_id>', methods=['GET'])
+def get_employee_quiz(quiz_id):
+    """Get quiz questions for employee (without showing correct answers)"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'success': False, 'error': 'Username is required'}), 400
+        
+        # Verify employee exists
+        user = resolve_principal(username, role='employee')
+        if not user:
+            return jsonify({'success': False, 'error': 'Employee not found'}), 404
+        
+        # Get the quiz content
+        content = ModuleContent.query.get(quiz_id)
+        if not content or content.content_type != 'quiz':
+            return jsonify({'success': False, 'error': 'Quiz content not found'}), 404
+        
+        # Check if employee has access to this content through course assignment
+        course_id = content_course_id(content.id)
+        if course_id is not None and not has_course(user, course_id):
+            return jsonify({'success': False, 'error': 'Quiz not assigned to employee'}), 403
+        
+        # Get questions
+        questions = QuizQuestion.query.filter_by(content_id=quiz_id).order_by(QuizQuestion.order).all()
+        
+        questions_data = []
+        for question in questions:
+            options_data = []
+            for option in question.options:
+                # Don't include is_correct for employees
+                options_data.append({
+                    "id": option.id,
+                    "option_text": option.option_text
+                })
+            
+            questions_data.append({
+                "id": question.id,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "order": question.order,
+                "options": options_data
+            })
+        
+        return jsonify({
+            "success": True,
+            "quiz": {
+                "id": content.id,
+                "title": content.title,
+                "module_id": content.module_id,
+                "questions": questions_data
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error fetching quiz: {str(e)}'}), 500
+
+@quizzes_bp.route('/api/employee/submit_quiz', methods=['POST'])
+def submit_employee_quiz():
+    """Submit quiz answers and get results"""
+    try:
+        data = request.json
+        username = data.get('username')
+        content_id = data.get('content_id')
+        answers = data.get('answers', [])
+        
+        if not username or not content_id:
+            return jsonify({'success': False, 'error': 'Username and content_id are required'}), 400
+        
+        # Find the user
+        user = resolve_principal(username, role='employee')
+        if not user:
+            return jsonify({'success': False, 'error': 'Employee not found'}), 404
+        
+        # Get the quiz content
+        content = ModuleContent.query.get(content_id)
+        if not content or content.content_type != 'quiz':
+            return jsonify({'success': False, 'error': 'Quiz content not found'}), 404
+        
+        # Check if employee has access
+        course_id = content_course_id(content.id)
+        if course_id is not None and not has_course(user, course_id):
+            return jsonify({'success': False, 'error': 'Quiz not assigned to employee'}), 403
+        
+        # Get all questions for this quiz
+        questions = QuizQuestion.query.filter_by(content_id=content_id).order_by(QuizQuestion.order).all()
+        if not questions:
+            return jsonify({'success': False, 'error': 'No questions found for this quiz'}), 404
+        
+        # Calculate score
+        total_questions = len(questions)
+        correct_answers = 0
+        question_results = []
+        
+        # Create a map of answers for easy lookup
+        answer_map = {}
+        for answer in answers:
+            question_id = answer.get('question_id')
+            selected_options = answer.get('selected_options', [])
+            answer_map[question_id] = selected_options
+        
+        for question in questions:
+            user_answer = answer_map.get(question.id, [])
+            
+            # Get correct options for this question
+            correct_options = QuizOption.query.filter_by(
+                question_id=question.id,
+                is_correct=True
+            ).all()
+            correct_option_ids = [opt.id for opt in correct_options]
+            
+            # Check if answer is correct
+            is_correct = False
+            if question.question_type in ['single-choice', 'multiple-choice']:
+                if question.question_type == 'single-choice':
+                    # For single choice, user should select exactly one correct option
+                    is_correct = (len(user_answer) == 1 and 
+                                user_answer[0] in correct_option_ids)
+                else:
+                    # For multiple choice, user should select all correct options and no incorrect ones
+                    is_correct = (set(user_answer) == set(correct_option_ids))
+            elif question.question_type == 'true-false':
+                # For true/false, should select exactly one correct option
+                is_correct = (len(user_answer) == 1 and 
+                            user_answer[0] in correct_option_ids)
+            
+            if is_correct:
+                correct_answers += 1
+            
+            question_results.append({
+                'question_id': question.id,
+                'question_text': question.question_text,
+                'user_answer': user_answer,
+                'correct_options': correct_option_ids,
+                'is_correct': is_correct
+            })
+        
+        # Calculate percentage and determine if passed (70% threshold)
+        percentage = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+        passed = percentage >= 70
+        
+        # Record the attempt (quiz results feed the nightly risk scores, see risk_scores.py)
+        previous_attempts = db.session.execute(
+            db.select(db.func.count()).where(QuizAttempt.user_id == user.id, QuizAttempt.quiz_content_id == content.id)
+        ).scalar()
+        now = datetime.datetime.utcnow()
+        db.session.add(QuizAttempt(
+            user_id=user.id,
+            quiz_content_id=content.id,
+            attempt_number=previous_attempts + 1,
+            score=round(percentage, 2),
+            total_questions=total_questions,
+            correct_answers=correct_answers,
+            started_at=now,
+            completed_at=now,
+            answers=json.dumps(answers)
+        ))
+        db.session.commit()
+        
+        results = {
+            'score': correct_answers,
+            'total_questions': total_questions,
+            'percentage': round(percentage, 2),
+            'passed': passed,
+            'question_results': question_results
+        }
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'message': f'Quiz submitted successfully! Score: {correct_answers}/{total_questions} ({percentage:.1f}%)'
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Failed to submit quiz: {str(e)}'}), 500
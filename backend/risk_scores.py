@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Nightly risk scores for CourseProgress.
+
+Progress updates only ease or reset a learner's risk_score (see
+progress_ingest.py); this job is what raises it. It walks course_progress in
+chunks of --chunk-size rows, in user_id ranges, and loads each chunk's columns
+into NumPy arrays. It adds each learner's quiz average for the course from
+one GROUP BY over the same user range, scores the whole chunk with array
+operations, and writes back only the scores that changed with bulk UPDATEs.
+Every chunk is committed on its own, and a rerun simply recomputes, so a
+stopped run can be started again.
+
+A score (0-100) weighs three signals:
+
+    pace        behind the expected ~RISK_DAILY_PACE % per idle day (the estimate
+                update_progress used to apply, now with the real idle time)
+    inactivity  days since last activity, full weight at RISK_INACTIVE_DAYS
+    quiz        average quiz result below the pass mark (70%, as in submit_quiz)
+
+Completed courses score 0.
+
+    python risk_scores.py                      # score every row
+    python risk_scores.py --dry-run            # score and report, write nothing
+    python risk_scores.py --chunk-size 20000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import Integer, bindparam, column, func, select, update, values
+
+from models import db, Module, ModuleContent, CourseProgress, QuizAttempt
+
+RISK_CHUNK_SIZE = int(os.getenv('RISK_CHUNK_SIZE', '50000'))
+RISK_WRITE_BATCH = 5000
+RISK_DAILY_PACE = 5.0
+RISK_INACTIVE_DAYS = 30.0
+RISK_QUIZ_PASS = 70.0
+RISK_WEIGHTS = {'pace': 0.5, 'inactivity': 0.3, 'quiz': 0.2}
+
+_progress = CourseProgress.__table__
+
+
+def compute_risk(days_inactive, progress, quiz_average, completed):
+    """Risk scores (int64 array, 0-100) for arrays of idle days, progress %, quiz average % (NaN if none)."""
+    days = np.clip(np.nan_to_num(days_inactive, nan=0.0), 0.0, None)
+    progress = np.nan_to_num(progress, nan=0.0)
+    expected = np.minimum(100.0, days * RISK_DAILY_PACE)
+    pace = np.clip((expected - progress) * 1.5, 0.0, 100.0)
+    inactivity = np.minimum(days / RISK_INACTIVE_DAYS, 1.0) * 100.0
+    quiz = np.where(np.isnan(quiz_average), 0.0,
+                    np.clip((RISK_QUIZ_PASS - np.nan_to_num(quiz_average)) / RISK_QUIZ_PASS, 0.0, 1.0) * 100.0)
+    risk = RISK_WEIGHTS['pace'] * pace + RISK_WEIGHTS['inactivity'] * inactivity + RISK_WEIGHTS['quiz'] * quiz
+    return np.where(completed, 0, np.rint(np.clip(risk, 0.0, 100.0))).astype(np.int64)
+
+
+def _pair_keys(user_ids, course_ids):
+    return (np.asarray(user_ids, dtype=np.int64) << 32) | np.asarray(course_ids, dtype=np.int64)
+
+
+def _quiz_averages(low, high, user_ids, course_ids):
+    """Average quiz result per row's (user, course), NaN where the user has no attempts."""
+    query = (
+        select(QuizAttempt.user_id, Module.course_id,
+               func.avg(QuizAttempt.correct_answers * 100.0 / func.nullif(QuizAttempt.total_questions, 0)))
+        .join(ModuleContent, ModuleContent.id == QuizAttempt.quiz_content_id)
+        .join(Module, Module.id == ModuleContent.module_id)
+        .where(QuizAttempt.user_id > low)
+        .group_by(QuizAttempt.user_id, Module.course_id)
+    )
+    if high is not None:
+        query = query.where(QuizAttempt.user_id <= high)
+    rows = db.session.execute(query).all()
+    averages = np.full(len(user_ids), np.nan)
+    if not rows:
+        return averages
+    quiz_users, quiz_courses, quiz_scores = zip(*rows)
+    quiz_keys = _pair_keys(quiz_users, quiz_courses)
+    order = np.argsort(quiz_keys)
+    quiz_keys = quiz_keys[order]
+    quiz_scores = np.array(quiz_scores, dtype=float)[order]
+    keys = _pair_keys(user_ids, course_ids)
+    positions = np.minimum(np.searchsorted(quiz_keys, keys), len(quiz_keys) - 1)
+    found = quiz_keys[positions] == keys
+    averages[found] = quiz_scores[positions[found]]
+    return averages
+
+
+def _write_scores(ids, scores):
+    """Bulk UPDATE risk_score by id: one UPDATE ... FROM (VALUES ...) per batch on PostgreSQL."""
+    postgres = db.session.get_bind().dialect.name == 'postgresql'
+    for start in range(0, len(ids), RISK_WRITE_BATCH):
+        rows = list(zip(ids[start:start + RISK_WRITE_BATCH].tolist(), scores[start:start + RISK_WRITE_BATCH].tolist()))
+        if postgres:
+            scored = values(column('id', Integer), column('risk_score', Integer), name='scored').data(rows)
+            db.session.execute(update(_progress).where(_progress.c.id == scored.c.id)
+                               .values(risk_score=scored.c.risk_score))
+        else:
+            db.session.execute(
+                update(_progress).where(_progress.c.id == bindparam('row_id'))
+                .values(risk_score=bindparam('score')),
+                [{'row_id': row_id, 'score': score} for row_id, score in rows],
+            )
+
+
+def _user_ranges(chunk_size):
+    """(low, high] user_id ranges covering about chunk_size progress rows each; high None for the last."""
+    low = -1
+    while True:
+        high = db.session.execute(
+            select(_progress.c.user_id).where(_progress.c.user_id > low)
+            .order_by(_progress.c.user_id).offset(chunk_size - 1).limit(1)
+        ).scalar()
+        yield low, high
+        if high is None:
+            return
+        low = high
+
+
+def score_chunk(low, high, now, dry_run=False):
+    """Score the progress rows of users in (low, high]. Returns counts and seconds per phase."""
+    start = time.perf_counter()
+    query = select(_progress.c.id, _progress.c.user_id, _progress.c.course_id, _progress.c.progress_percentage,
+                   _progress.c.completed_modules, _progress.c.total_modules, _progress.c.last_activity,
+                   _progress.c.risk_score).where(_progress.c.user_id > low)
+    if high is not None:
+        query = query.where(_progress.c.user_id <= high)
+    rows = db.session.execute(query).all()
+    if not rows:
+        return {'rows': 0, 'updated': 0, 'load_s': time.perf_counter() - start, 'compute_s': 0.0, 'write_s': 0.0}
+    ids, user_ids, course_ids, progress, completed_modules, total_modules, last_activity, current = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    quiz_average = _quiz_averages(low, high, user_ids, course_ids)
+    loaded = time.perf_counter()
+
+    last_activity = np.array(last_activity, dtype='datetime64[us]')
+    days_inactive = (np.datetime64(now, 'us') - last_activity) / np.timedelta64(1, 'D')
+    completed = (np.array(completed_modules, dtype=float) == np.array(total_modules, dtype=float))
+    scores = compute_risk(days_inactive, np.array(progress, dtype=float), quiz_average, completed)
+    changed = scores != np.nan_to_num(np.array(current, dtype=float), nan=-1)
+    computed = time.perf_counter()
+
+    if not dry_run and changed.any():
+        _write_scores(ids[changed], scores[changed])
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return {'rows': len(rows), 'updated': int(changed.sum()), 'load_s': loaded - start,
+            'compute_s': computed - loaded, 'write_s': time.perf_counter() - computed}
+
+
+def score_all(chunk_size=RISK_CHUNK_SIZE, dry_run=False, now=None, verbose=True):
+    """Score every CourseProgress row. Returns totals with per-phase timings in seconds."""
+    now = now or datetime.datetime.utcnow()
+    start = time.perf_counter()
+    totals = {'rows': 0, 'updated': 0, 'chunks': 0, 'load_s': 0.0, 'compute_s': 0.0, 'write_s': 0.0}
+    for low, high in _user_ranges(chunk_size):
+        result = score_chunk(low, high, now, dry_run)
+        if not result['rows']:
+            continue
+        totals['chunks'] += 1
+        for key in ('rows', 'updated', 'load_s', 'compute_s', 'write_s'):
+            totals[key] += result[key]
+        if verbose:
+            print(f"   chunk {totals['chunks']}: {result['rows']} rows, {result['updated']} changed "
+                  f"(load {result['load_s']:.2f}s, compute {result['compute_s']:.3f}s, write {result['write_s']:.2f}s)")
+    totals['elapsed_s'] = time.perf_counter() - start
+    return totals
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Recompute CourseProgress risk scores')
+    parser.add_argument('--chunk-size', type=int, default=RISK_CHUNK_SIZE, help='progress rows per chunk')
+    parser.add_argument('--dry-run', action='store_true', help='score and report without writing')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        print(f"📊 Scoring course progress in chunks of {args.chunk_size} rows"
+              + (" (dry run)" if args.dry_run else ""))
+        try:
+            totals = score_all(args.chunk_size, args.dry_run, verbose=not args.quiet)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n💥 Risk scoring failed: {e}")
+            sys.exit(1)
+    rate = totals['rows'] / totals['elapsed_s'] if totals['elapsed_s'] else 0
+    print(f"\n✅ Scored {totals['rows']} rows in {totals['chunks']} chunk(s), "
+          f"{totals['updated']} {'would change' if args.dry_run else 'updated'}")
+    print(f"⏱️  {totals['elapsed_s']:.2f}s total ({rate:,.0f} rows/s): load {totals['load_s']:.2f}s, "
+          f"compute {totals['compute_s']:.2f}s, write {totals['write_s']:.2f}s")
@@ -0,0 +1,484 @@
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import text
+import datetime
+import json
+from models import db, SystemSettings, AuditLog, EmailTemplate, SystemAnnouncement
+from principal_cache import resolve_principal
+from db_pool import POOL_SETTINGS, default_pool_limits, pool_stats, web_concurrency
+from db_routing import replica_stats
+
+settings_bp = Blueprint('settings', __name__)
+
+def get_setting_value(category, key, default=None, data_type='string'):
+    """Helper function to get a setting value with proper type conversion"""
+    setting = SystemSettings.query.filter_by(category=category, setting_key=key, is_active=True).first()
+    if not setting:
+        return default
+    
+    value = setting.setting_value
+    if data_type == 'boolean':
+        return value.lower() in ['true', '1', 'yes'] if isinstance(value, str) else bool(value)
+    elif data_type == 'integer':
+        return int(value) if value else default
+    elif data_type == 'json':
+        try:
+            return json.loads(value) if value else default
+        except:
+            return default
+    return value
+
+def set_setting_value(category, key, value, data_type='string', description=None):
+    """Helper function to set a setting value"""
+    setting = SystemSettings.query.filter_by(category=category, setting_key=key).first()
+    if setting:
+        setting.setting_value = str(value) if value is not None else None
+        setting.data_type = data_type
+        setting.updated_at = datetime.datetime.utcnow()
+        if description:
+            setting.description = description
+    else:
+        setting = SystemSettings(
+            category=category,
+            setting_key=key,
+            setting_value=str(value) if value is not None else None,
+            data_type=data_type,
+            description=description
+        )
+        db.session.add(setting)
+    
+    db.session.commit()
+    return setting
+
+@settings_bp.route('/api/admin/system_settings', methods=['GET'])
+def get_system_settings():
+    """Get all system settings grouped by category"""
+    try:
+        # Query all active settings
+        settings = SystemSettings.query.filter_by(is_active=True).all()
+        
+        # Group by category
+        settings_by_category = {}
+        for setting in settings:
+            if setting.category not in settings_by_category:
+                settings_by_category[setting.category] = {}
+            
+            # Convert value based on data type
+            value = setting.setting_value
+            if setting.data_type == 'boolean':
+                value = value.lower() in ['true', '1', 'yes'] if isinstance(value, str) else bool(value)
+            elif setting.data_type == 'integer':
+                value = int(value) if value else 0
+            elif setting.data_type == 'json':
+                try:
+                    value = json.loads(value) if value else {}
+                except:
+                    value = {}
+            
+            settings_by_category[setting.category][setting.setting_key] = {
+                'value': value,
+                'data_type': setting.data_type,
+                'description': setting.description,
+                'updated_at': setting.updated_at.isoformat()
+            }
+        
+        return jsonify({
+            'success': True,
+            'settings': settings_by_category
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/system_settings', methods=['POST'])
+def update_system_settings():
+    """Update system settings"""
+    try:
+        data = request.json
+        
+        if not data or 'settings' not in data:
+            return jsonify({'success': False, 'error': 'Settings data is required'}), 400
+        
+        updated_settings = []
+        
+        for category, settings in data['settings'].items():
+            for key, setting_data in settings.items():
+                value = setting_data.get('value')
+                data_type = setting_data.get('data_type', 'string')
+                description = setting_data.get('description')
+                
+                # Convert value to string for storage
+                if data_type == 'json':
+                    value = json.dumps(value) if value is not None else None
+                
+                setting = set_setting_value(category, key, value, data_type, description)
+                updated_settings.append({
+                    'category': category,
+                    'key': key,
+                    'value': value
+                })
+        
+        return jsonify({
+            'success': True,
+            'message': f'Updated {len(updated_settings)} settings',
+            'updated_settings': updated_settings
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/system_settings/initialize', methods=['POST'])
+def initialize_system_settings():
+    """Initialize system settings with default values"""
+    try:
+        pool_size, max_overflow = default_pool_limits()
+        default_settings = {
+            'email': {
+                'smtp_server': {'value': 'smtp.gmail.com', 'type': 'string', 'desc': 'SMTP Server'},
+                'smtp_port': {'value': '587', 'type': 'integer', 'desc': 'SMTP Port'},
+                'smtp_use_tls': {'value': 'true', 'type': 'boolean', 'desc': 'Use TLS'},
+                'smtp_username': {'value': '', 'type': 'string', 'desc': 'SMTP Username'},
+                'smtp_password': {'value': '', 'type': 'string', 'desc': 'SMTP Password'},
+                'default_sender': {'value': 'noreply@lms.com', 'type': 'string', 'desc': 'Default Sender Email'},
+                'notification_enabled': {'value': 'true', 'type': 'boolean', 'desc': 'Email Notifications Enabled'}
+            },
+            'security': {
+                'password_min_length': {'value': '8', 'type': 'integer', 'desc': 'Minimum Password Length'},
+                'password_require_uppercase': {'value': 'true', 'type': 'boolean', 'desc': 'Require Uppercase'},
+                'password_require_lowercase': {'value': 'true', 'type': 'boolean', 'desc': 'Require Lowercase'},
+                'password_require_numbers': {'value': 'true', 'type': 'boolean', 'desc': 'Require Numbers'},
+                'password_require_special': {'value': 'false', 'type': 'boolean', 'desc': 'Require Special Characters'},
+                'session_timeout': {'value': '480', 'type': 'integer', 'desc': 'Session Timeout (minutes)'},
+                'max_login_attempts': {'value': '5', 'type': 'integer', 'desc': 'Max Login Attempts'},
+                'lockout_duration': {'value': '30', 'type': 'integer', 'desc': 'Lockout Duration (minutes)'},
+                'two_factor_enabled': {'value': 'false', 'type': 'boolean', 'desc': 'Two-Factor Authentication'},
+                'audit_logging': {'value': 'true', 'type': 'boolean', 'desc': 'Audit Logging Enabled'}
+            },
+            'organization': {
+                'default_employee_limit': {'value': '100', 'type': 'integer', 'desc': 'Default Employee Limit'},
+                'auto_assign_courses': {'value': 'true', 'type': 'boolean', 'desc': 'Auto-assign Organization Courses'},
+                'allow_self_registration': {'value': 'false', 'type': 'boolean', 'desc': 'Allow Self Registration'},
+                'require_domain_verification': {'value': 'true', 'type': 'boolean', 'desc': 'Require Domain Verification'},
+                'default_subscription_plan': {'value': 'basic', 'type': 'string', 'desc': 'Default Subscription Plan'}
+            },
+            'course': {
+                'auto_publish': {'value': 'false', 'type': 'boolean', 'desc': 'Auto-publish Courses'},
+                'require_approval': {'value': 'true', 'type': 'boolean', 'desc': 'Require Course Approval'},
+                'default_quiz_time_limit': {'value': '30', 'type': 'integer', 'desc': 'Default Quiz Time Limit (minutes)'},
+                'default_passing_score': {'value': '70', 'type': 'integer', 'desc': 'Default Passing Score (%)'},
+                'max_quiz_attempts': {'value': '3', 'type': 'integer', 'desc': 'Maximum Quiz Attempts'},
+                'allow_content_download': {'value': 'false', 'type': 'boolean', 'desc': 'Allow Content Downloads'}
+            },
+            'file_upload': {
+                'max_file_size_mb': {'value': '100', 'type': 'integer', 'desc': 'Max File Size (MB)'},
+                'max_video_size_mb': {'value': '500', 'type': 'integer', 'desc': 'Max Video Size (MB)'},
+                'allowed_image_types': {'value': '["jpg", "jpeg", "png", "gif"]', 'type': 'json', 'desc': 'Allowed Image Types'},
+                'allowed_video_types': {'value': '["mp4", "avi", "mov", "wmv"]', 'type': 'json', 'desc': 'Allowed Video Types'},
+                'allowed_document_types': {'value': '["pdf", "doc", "docx", "ppt", "pptx"]', 'type': 'json', 'desc': 'Allowed Document Types'},
+                'storage_quota_gb': {'value': '10', 'type': 'integer', 'desc': 'Storage Quota per Organization (GB)'}
+            },
+            'system': {
+                'maintenance_mode': {'value': 'false', 'type': 'boolean', 'desc': 'Maintenance Mode'},
+                'system_name': {'value': 'Learning Management System', 'type': 'string', 'desc': 'System Name'},
+                'support_email': {'value': 'support@lms.com', 'type': 'string', 'desc': 'Support Email'},
+                'backup_enabled': {'value': 'true', 'type': 'boolean', 'desc': 'Automated Backups Enabled'},
+                'backup_frequency_hours': {'value': '24', 'type': 'integer', 'desc': 'Backup Frequency (hours)'},
+                'log_retention_days': {'value': '90', 'type': 'integer', 'desc': 'Log Retention (days)'}
+            },
+            'database': {
+                'pool_size': {'value': str(pool_size), 'type': 'integer', 'desc': 'Connection Pool Size (per worker)'},
+                'max_overflow': {'value': str(max_overflow), 'type': 'integer', 'desc': 'Connection Pool Overflow (per worker)'},
+                'pool_timeout': {'value': '30', 'type': 'integer', 'desc': 'Connection Wait Timeout (seconds)'},
+                'pool_recycle': {'value': '1800', 'type': 'integer', 'desc': 'Connection Recycle Age (seconds)'},
+                'pool_pre_ping': {'value': 'true', 'type': 'boolean', 'desc': 'Check Connections Before Use'},
+                'statement_timeout_ms': {'value': '30000', 'type': 'integer', 'desc': 'Statement Timeout (ms, 0 = none)'}
+            }
+        }
+        
+        initialized_count = 0
+        for category, settings in default_settings.items():
+            for key, config in settings.items():
+                # Only create if doesn't exist
+                existing = SystemSettings.query.filter_by(category=category, setting_key=key).first()
+                if not existing:
+                    set_setting_value(category, key, config['value'], config['type'], config['desc'])
+                    initialized_count += 1
+        
+        return jsonify({
+            'success': True,
+            'message': f'Initialized {initialized_count} settings',
+            'initialized_count': initialized_count
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/db_pool_stats', methods=['GET'])
+def get_db_pool_stats():
+    """Report this worker's connection pool usage for sizing against Postgres max_connections"""
+    try:
+        username = request.args.get('username')
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+
+        user = resolve_principal(username, role='admin')
+        if not user:
+            return jsonify({'error': 'Unauthorized access - Admin role required'}), 403
+
+        stats = pool_stats(db.engine)
+        options = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        stats['settings'] = {key: value for key, value in options.items() if key in POOL_SETTINGS}
+        stats['settings']['statement_timeout'] = options.get('connect_args', {}).get('options')
+
+        workers = web_concurrency()
+        stats['workers'] = workers
+        if 'max_connections_per_worker' in stats:
+            stats['max_connections_all_workers'] = workers * stats['max_connections_per_worker']
+        if db.engine.dialect.name == 'postgresql':
+            stats['postgres_max_connections'] = int(db.session.execute(text('SHOW max_connections')).scalar())
+            stats['postgres_open_connections'] = db.session.execute(
+                text('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()')
+            ).scalar()
+        stats['replica'] = replica_stats()
+
+        return jsonify({
+            'success': True,
+            'data': stats
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/email_templates', methods=['GET'])
+def get_email_templates():
+    """Get all email templates"""
+    try:
+        templates = EmailTemplate.query.filter_by(is_active=True).all()
+        
+        templates_data = []
+        for template in templates:
+            templates_data.append({
+                'id': template.id,
+                'template_name': template.template_name,
+                'subject': template.subject,
+                'html_content': template.html_content,
+                'text_content': template.text_content,
+                'variables': json.loads(template.variables) if template.variables else [],
+                'updated_at': template.updated_at.isoformat()
+            })
+        
+        return jsonify({
+            'success': True,
+            'templates': templates_data
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/email_templates', methods=['POST'])
+def create_email_template():
+    """Create or update email template"""
+    try:
+        data = request.json
+        
+        required_fields = ['template_name', 'subject', 'html_content']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'success': False, 'error': f'{field} is required'}), 400
+        
+        # Check if template exists
+        existing = EmailTemplate.query.filter_by(template_name=data['template_name']).first()
+        
+        if existing:
+            # Update existing
+            existing.subject = data['subject']
+            existing.html_content = data['html_content']
+            existing.text_content = data.get('text_content', '')
+            existing.variables = json.dumps(data.get('variables', []))
+            existing.updated_at = datetime.datetime.utcnow()
+            template = existing
+        else:
+            # Create new
+            template = EmailTemplate(
+                template_name=data['template_name'],
+                subject=data['subject'],
+                html_content=data['html_content'],
+                text_content=data.get('text_content', ''),
+                variables=json.dumps(data.get('variables', []))
+            )
+            db.session.add(template)
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Email template {"updated" if existing else "created"} successfully',
+            'template_id': template.id
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/email_templates/<template_name>', methods=['DELETE'])
+def delete_email_template(template_name):
+    """Delete an email template"""
+    try:
+        template = EmailTemplate.query.filter_by(template_name=template_name).first()
+        if not template:
+            return jsonify({'success': False, 'error': 'Template not found'}), 404
+        
+        db.session.delete(template)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Email template "{template_name}" deleted successfully'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/announcements', methods=['GET'])
+def get_system_announcements():
+    """Get all system announcements"""
+    try:
+        announcements = SystemAnnouncement.query.filter_by(is_active=True).order_by(SystemAnnouncement.created_at.desc()).all()
+        
+        announcements_data = []
+        for announcement in announcements:
+            announcements_data.append({
+                'id': announcement.id,
+                'title': announcement.title,
+                'content': announcement.content,
+                'announcement_type': announcement.announcement_type,
+                'target_roles': json.loads(announcement.target_roles) if announcement.target_roles else [],
+                'target_organizations': json.loads(announcement.target_organizations) if announcement.target_organizations else [],
+                'show_until': announcement.show_until.isoformat() if announcement.show_until else None,
+                'created_by': announcement.creator.username if announcement.creator else 'System',
+                'created_at': announcement.created_at.isoformat()
+            })
+        
+        return jsonify({
+            'success': True,
+            'announcements': announcements_data
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@settings_bp.route('/api/admin/announcements', methods=['POST'])
+def create_system_announcement():
+    """Create a new system announcement"""
+    try:
+        data = request.json
+        
+        required_fields = ['title', 'content', 'created_by_username']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'success': False, 'error': f'{field} is required'}), 400
+        
+        # Find the creator
+        creator = resolve_principal(data['created_by_username'])
+        if not creator:
+            return jsonify({'success': False, 'error': 'Creator not found'}), 404
+        
+        # Parse show_until date if provided
+        show_until = None
+        if data.get('show_until'):
+            try:
+                show_until = datetime.datetime.fromisoformat(data['show_until'])
+            except:
+                return jsonify({'success': False, 'error': 'Invalid show_until date format'}), 400
+        
+        announcement = SystemAnnouncement(
+            title=data['title'],
+            content=data['content'],
+            announcement_type=data.get('announcement_type', 'info'),
+            target_roles=json.dumps(data.get('target_roles', [])),
+            target_organizations=json.dumps(data.get('target_organizations', [])),
+            show_until=show_until,
+            created_by=creator.id
+        )
+        
+        db.session.add(announcement)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Announcement created successfully',
+            'announcement_id': announcement.id
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def log_audit_action(user_id, action, resource_type, resource_id=None, details=None, ip_address=None):
+    """Helper function to log audit actions"""
+    try:
+        audit_log = AuditLog(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            details=json.dumps(details) if details else None,
+            ip_address=ip_address or request.remote_addr if request else None,
+            user_agent=request.headers.get('User-Agent') if request else None
+        )
+        db.session.add(audit_log)
+        db.session.commit()
+    except Exception as e:
+        print(f"Failed to log audit action: {e}")
+
+@settings_bp.route('/api/admin/audit_logs', methods=['GET'])
+def get_audit_logs():
+    """Get audit logs with filtering"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
+        user_id = request.args.get('user_id', type=int)
+        resource_type = request.args.get('resource_type')
+        action = request.args.get('action')
+        
+        query = AuditLog.query
+        
+        if user_id:
+            query = query.filter_by(user_id=user_id)
+        if resource_type:
+            query = query.filter_by(resource_type=resource_type)
+        if action:
+            query = query.filter(AuditLog.action.ilike(f'%{action}%'))
+        
+        logs = query.order_by(AuditLog.timestamp.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        
+        logs_data = []
+        for log in logs.items:
+            logs_data.append({
+                'id': log.id,
+                'user': log.user.username if log.user else 'System',
+                'action': log.action,
+                'resource_type': log.resource_type,
+                'resource_id': log.resource_id,
+                'details': json.loads(log.details) if log.details else None,
+                'ip_address': log.ip_address,
+                'timestamp': log.timestamp.isoformat()
+            })
+        
+        return jsonify({
+            'success': True,
+            'logs': logs_data,
+            'pagination': {
+                'page': logs.page,
+                'pages': logs.pages,
+                'per_page': logs.per_page,
+                'total': logs.total
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
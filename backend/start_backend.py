@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
 """
 Script to check if the backend is running and start it if needed
+
+Production serving:
+    python start_backend.py serve     # preforking gunicorn server, app preloaded in the master
+    python start_backend.py reload    # rolling restart onto freshly loaded code, no dropped connections
+
+Workers default to 2 x CPU cores + 1 and can be tuned with the WEB_* variables below.
+Each worker answers GET /api/ready with 200 only while it can reach the database.
 """
 import os
 import sys
@@ -8,14 +15,27 @@ import socket
 import subprocess
 import time
 import signal
+import urllib.request
 import psutil
 
+from db_pool import web_concurrency
+
 # Configuration
-BACKEND_PORT = 5000
+BACKEND_PORT = int(os.getenv('PORT', 5000))
 BACKEND_HOST = '127.0.0.1'
 BACKEND_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
 CHECK_INTERVAL = 2  # seconds
 
+# Production server configuration
+WEB_BIND = os.getenv('WEB_BIND', f'0.0.0.0:{BACKEND_PORT}')
+WEB_CONCURRENCY = web_concurrency()
+WEB_THREADS = int(os.getenv('WEB_THREADS', 1))
+WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 60))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 5000))
+WEB_PIDFILE = os.getenv('WEB_PIDFILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.pid'))
+READY_URL = f'http://{BACKEND_HOST}:{BACKEND_PORT}/api/ready'
+
 def is_port_in_use(port, host='127.0.0.1'):
     """Check if a port is in use by trying to bind to it"""
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -123,10 +143,123 @@ def stop_backend():
         print("❓ No backend process found to stop")
         return True
 
+def is_backend_ready(timeout=2):
+    """Ask the readiness probe whether a worker can serve requests (database reachable)"""
+    try:
+        with urllib.request.urlopen(READY_URL, timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+def serve():
+    """Run the preforking production server in the foreground"""
+    from gunicorn.app.base import BaseApplication
+
+    class LMSServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import create_app
+            return create_app()
+
+    def post_fork(server, worker):
+        # Connections opened while preloading belong to the master; never share them with workers
+        from models import db
+        flask_app = server.app.wsgi()
+        with flask_app.app_context():
+            db.engine.dispose(close=False)
+            if 'lms_replica' in flask_app.extensions:
+                flask_app.extensions['lms_replica']['engine'].dispose(close=False)
+
+    def worker_exit(server, worker):
+        # Write out progress heartbeats still held in this worker's buffer (see progress_buffer.py)
+        import progress_buffer
+        progress_buffer.shutdown()
+
+    options = {
+        'bind': WEB_BIND,
+        'workers': WEB_CONCURRENCY,
+        'threads': WEB_THREADS,
+        'worker_class': 'gthread' if WEB_THREADS > 1 else 'sync',
+        'preload_app': True,
+        'timeout': WEB_TIMEOUT,
+        'graceful_timeout': WEB_GRACEFUL_TIMEOUT,
+        # Recycle workers gradually so they do not all restart at once
+        'max_requests': WEB_MAX_REQUESTS,
+        'max_requests_jitter': max(1, WEB_MAX_REQUESTS // 10),
+        'pidfile': WEB_PIDFILE,
+        'accesslog': '-',
+        'errorlog': '-',
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }
+    # Workers build their pools (and report them) from the same count, see db_pool.web_concurrency
+    os.environ['WEB_CONCURRENCY'] = str(WEB_CONCURRENCY)
+    print(f"🚀 Serving on {WEB_BIND} with {WEB_CONCURRENCY} workers x {WEB_THREADS} threads")
+    LMSServer(options).run()
+
+def read_pid(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def reload_backend(timeout=60):
+    """
+    Graceful rolling restart of the production server.
+
+    USR2 makes the running master start a new master (re-importing the app) that
+    shares the listening socket and writes its PID to "<pidfile>.2". Once the new
+    workers are up and ready, the old master is sent TERM and lets its workers
+    finish in-flight requests; the new master then takes over the pidfile.
+    """
+    old_pid = read_pid(WEB_PIDFILE)
+    if not old_pid or not psutil.pid_exists(old_pid):
+        print(f"❌ No running server found (pidfile {WEB_PIDFILE})")
+        return False
+
+    print(f"🔄 Starting new master next to PID {old_pid}...")
+    os.kill(old_pid, signal.SIGUSR2)
+
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        time.sleep(1)
+        new_pid = read_pid(WEB_PIDFILE + '.2')
+        if new_pid and new_pid != old_pid and psutil.pid_exists(new_pid):
+            workers = psutil.Process(new_pid).children()
+            if len(workers) >= WEB_CONCURRENCY and is_backend_ready():
+                print(f"✅ New master PID {new_pid} is ready with {len(workers)} workers")
+                os.kill(old_pid, signal.SIGTERM)
+                print(f"⏹️ Old master PID {old_pid} is draining (up to {WEB_GRACEFUL_TIMEOUT}s)")
+                return True
+        print(".", end="", flush=True)
+
+    print(f"\n⚠️ New master did not become ready, keeping PID {old_pid}")
+    new_pid = read_pid(WEB_PIDFILE + '.2')
+    if new_pid and new_pid != old_pid and psutil.pid_exists(new_pid):
+        os.kill(new_pid, signal.SIGTERM)
+    return False
+
 def main():
     # Check if arguments were provided
     if len(sys.argv) > 1:
-        if sys.argv[1] == "stop":
+        if sys.argv[1] == "serve":
+            serve()
+            sys.exit(0)
+        elif sys.argv[1] == "reload":
+            sys.exit(0 if reload_backend() else 1)
+        elif sys.argv[1] == "ready":
+            ready = is_backend_ready()
+            print("✅ Backend is ready" if ready else "❌ Backend is not ready")
+            sys.exit(0 if ready else 1)
+        elif sys.argv[1] == "stop":
             stop_backend()
             sys.exit(0)
         elif sys.argv[1] == "restart":
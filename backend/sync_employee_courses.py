@@ -1,64 +1,162 @@
 #!/usr/bin/env python3
 """
-Script to sync employee courses with their organization's assigned courses.
-This should be run after updating the course assignment logic to clean up any existing data.
+Reconcile employee course overrides with their organization's courses.
+
+Employees get their organization's courses without rows of their own (see
+course_access.py), so this job only cleans up: grants the organization
+already covers (migration 0003_course_revocations leaves one per former
+assignment) or that are outside its courses, and revocations of courses the
+organization no longer has.
+
+Each organization is processed on its own: its employees are walked in id
+chunks of --chunk-size, and only stale rows are deleted (see
+course_assignments.sync_org_courses). The organization is then committed
+together with a CourseSyncCheckpoint row. If a run stops or an organization
+fails, the others stay committed. "--resume <run_id>" skips every
+organization that run already finished. Run "python migrations.py" once first
+to create the checkpoint table on existing databases.
+
+    python sync_employee_courses.py                    # new run over all organizations
+    python sync_employee_courses.py --dry-run          # print the per-course diff, change nothing
+    python sync_employee_courses.py --workers 4        # organizations in parallel worker processes
+    python sync_employee_courses.py --resume 20240101T120000-1a2b
+    python sync_employee_courses.py --org 3 --org 7
 """
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from app import app, db
-from models import User, Organization
-
-def sync_employee_courses():
-    """Sync all employees' courses with their organization's courses."""
-    with app.app_context():
-        try:
-            # Get all organizations
-            organizations = Organization.query.all()
-            total_employees_updated = 0
-            
-            print("Starting employee course synchronization...")
-            print(f"Found {len(organizations)} organizations")
-            
-            for org in organizations:
-                print(f"\nProcessing organization: {org.name}")
-                print(f"Organization has {len(org.courses)} assigned courses:")
-                for course in org.courses:
-                    print(f"  - {course.title} (ID: {course.id})")
-                
-                # Get all employees in this organization
-                employees = User.query.filter_by(org_id=org.id, role='employee').all()
-                print(f"Found {len(employees)} employees in this organization")
-                
-                for employee in employees:
-                    print(f"  Processing employee: {employee.username}")
-                    
-                    # Clear existing courses
-                    old_course_count = len(employee.courses)
-                    employee.courses.clear()
-                    
-                    # Assign organization's courses
-                    for course in org.courses:
-                        employee.courses.append(course)
-                    
-                    new_course_count = len(employee.courses)
-                    print(f"    Updated courses: {old_course_count} -> {new_course_count}")
-                    
-                total_employees_updated += len(employees)
-            
-            # Commit all changes
-            db.session.commit()
-            print(f"\n✅ Successfully updated {total_employees_updated} employees")
-            print("Employee courses are now synced with organization assignments!")
-            
-        except Exception as e:
+from models import db, Organization, CourseSyncCheckpoint
+from course_assignments import employee_id_chunks, sync_org_courses, diff_org_courses
+
+DEFAULT_CHUNK_SIZE = int(os.getenv('COURSE_SYNC_CHUNK_SIZE', '5000'))
+
+_worker_app = None
+
+
+def new_run_id():
+    return f"{datetime.datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:4]}"
+
+
+def reconcile_org(org_id, run_id, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Reconcile one organization in one transaction. Returns a result dict (never raises)."""
+    start = time.perf_counter()
+    result = {'org_id': org_id, 'rows_inserted': 0, 'rows_deleted': 0, 'chunks': 0, 'diff': {}, 'error': None}
+    try:
+        for employees in employee_id_chunks(org_id, chunk_size):
+            result['chunks'] += 1
+            if dry_run:
+                for course_id, change in diff_org_courses(org_id, employees).items():
+                    total = result['diff'].setdefault(course_id, {'add': 0, 'remove': 0})
+                    total['add'] += change['add']
+                    total['remove'] += change['remove']
+            else:
+                synced = sync_org_courses(org_id, employees=employees)
+                result['rows_inserted'] += synced['rows_inserted']
+                result['rows_deleted'] += synced['rows_deleted']
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if dry_run:
+            result['rows_inserted'] = sum(change['add'] for change in result['diff'].values())
+            result['rows_deleted'] = sum(change['remove'] for change in result['diff'].values())
             db.session.rollback()
-            print(f"❌ Error during synchronization: {str(e)}")
-            return False
-    
-    return True
+        else:
+            db.session.add(CourseSyncCheckpoint(
+                run_id=run_id, organization_id=org_id, rows_inserted=result['rows_inserted'],
+                rows_deleted=result['rows_deleted'], elapsed_ms=result['elapsed_ms']
+            ))
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        result['error'] = str(e)
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def pending_org_ids(run_id, only=None):
+    """Organizations the run still has to do, in id order."""
+    query = db.select(Organization.id).where(
+        ~db.select(CourseSyncCheckpoint.organization_id)
+        .where(CourseSyncCheckpoint.run_id == run_id, CourseSyncCheckpoint.organization_id == Organization.id)
+        .exists()
+    ).order_by(Organization.id)
+    if only:
+        query = query.where(Organization.id.in_(only))
+    return list(db.session.execute(query).scalars())
+
+
+def _init_worker():
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+    _worker_app.app_context().push()
+
+
+def _report(result, dry_run):
+    if result['error']:
+        print(f"  ❌ org {result['org_id']}: {result['error']}")
+        return
+    print(f"  org {result['org_id']}: +{result['rows_inserted']} / -{result['rows_deleted']} rows, "
+          f"{result['chunks']} chunk(s), {result['elapsed_ms']} ms")
+    if dry_run:
+        for course_id, change in sorted(result['diff'].items()):
+            print(f"      course {course_id}: +{change['add']} / -{change['remove']}")
+
+
+def sync_employee_courses(run_id=None, org_ids=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Reconcile every (or each given) organization. Returns True if no organization failed."""
+    run_id = run_id or new_run_id()
+    start = time.perf_counter()
+    pending = pending_org_ids(run_id, org_ids)
+    db.session.rollback()
+
+    mode = 'Dry run' if dry_run else 'Run'
+    print(f"{mode} {run_id}: {len(pending)} organization(s) to reconcile with {workers} worker(s)")
+
+    results = []
+    if workers <= 1:
+        for org_id in pending:
+            results.append(reconcile_org(org_id, run_id, chunk_size, dry_run))
+            _report(results[-1], dry_run)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker) as pool:
+            futures = [pool.submit(reconcile_org, org_id, run_id, chunk_size, dry_run) for org_id in pending]
+            for future in as_completed(futures):
+                results.append(future.result())
+                _report(results[-1], dry_run)
+
+    failed = [r['org_id'] for r in results if r['error']]
+    inserted = sum(r['rows_inserted'] for r in results if not r['error'])
+    deleted = sum(r['rows_deleted'] for r in results if not r['error'])
+    verb = 'Would touch' if dry_run else 'Touched'
+    print(f"\n✅ {verb} {inserted + deleted} rows ({inserted} added, {deleted} removed) "
+          f"in {time.perf_counter() - start:.2f}s")
+    if failed:
+        print(f"❌ {len(failed)} organization(s) failed: {failed}. "
+              f"Rerun with --resume {run_id} to retry just those.")
+    return not failed
+
 
 if __name__ == "__main__":
-    success = sync_employee_courses()
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Reconcile employee courses with organization courses')
+    parser.add_argument('--dry-run', action='store_true', help='print the per-course diff without changing anything')
+    parser.add_argument('--workers', type=int, default=1, help='organizations processed in parallel')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='employees per statement')
+    parser.add_argument('--resume', metavar='RUN_ID', help='continue a run, skipping organizations it finished')
+    parser.add_argument('--org', type=int, action='append', help='only this organization (repeatable)')
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        success = sync_employee_courses(args.resume, args.org, args.workers, args.chunk_size, args.dry_run)
     if success:
         print("\n🎉 Synchronization completed successfully!")
     else:
         print("\n💥 Synchronization failed!")
+        sys.exit(1)
@@ -58,8 +58,14 @@ function CourseEmployeeAssignment({ course, onClose }) {
   const [error, setError] = useState(null);
   const [actionLoading, setActionLoading] = useState(null);
   const [debug, setDebug] = useState(null);
+  // Server-side search and paging of the assignment matrix
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalEmployees, setTotalEmployees] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  const fetchEmployees = async () => {
+  const fetchEmployees = async (cursor = null) => {
     try {
       setDebug(null);
       const token = getToken();
@@ -87,26 +93,10 @@ function CourseEmployeeAssignment({ course, onClose }) {
         return;
       }
 
-      const response = await fetch(`/api/portal_admin/organizations/${orgId}/employees`);
-      if (!response.ok) {
-        const text = await response.text();
-        setError(`Failed to fetch employees (status ${response.status}): ${text}`);
-        setDebug('Response not ok for employees fetch: ' + text);
-        setLoading(false);
-        return;
-      }
-      const data = await response.json();
-      let employeesArr = [];
-      if (Array.isArray(data)) {
-        employeesArr = data;
-      } else if (Array.isArray(data.employees)) {
-        employeesArr = data.employees;
-      } else {
-        setDebug('employees is not an array: ' + JSON.stringify(data));
-      }
-      setEmployees(employeesArr);
-      // Always include organization_id in course assignments API call
-      const assignmentResponse = await fetch(`/api/portal_admin/course_assignments/${course.id}?organization_id=${orgId}`);
+      // One page of employees with their assignment flag for this course
+      const cursorParam = cursor !== null ? `&cursor=${cursor}` : '';
+      const searchParam = search ? `&search=${encodeURIComponent(search)}` : '';
+      const assignmentResponse = await fetch(`/api/portal_admin/assignment_matrix?organization_id=${orgId}&course_ids=${course.id}&limit=50${searchParam}${cursorParam}`);
       if (!assignmentResponse.ok) {
         const text = await assignmentResponse.text();
         setError(`Failed to fetch course assignments (status ${assignmentResponse.status}): ${text}`);
@@ -115,10 +105,19 @@ function CourseEmployeeAssignment({ course, onClose }) {
         return;
       }
       const assignmentData = await assignmentResponse.json();
-      // Use the new API response structure
       if (assignmentData.success && Array.isArray(assignmentData.employees)) {
-        setAssignedEmployees(assignmentData.employees.filter(emp => emp.is_assigned).map(emp => emp.id));
+        const pageAssigned = assignmentData.employees.filter(emp => emp.assignments[course.id]).map(emp => emp.id);
+        if (cursor === null) {
+          setEmployees(assignmentData.employees);
+          setAssignedEmployees(pageAssigned);
+        } else {
+          setEmployees(prev => [...prev, ...assignmentData.employees]);
+          setAssignedEmployees(prev => [...prev, ...pageAssigned]);
+        }
+        setNextCursor(assignmentData.next_cursor);
+        setTotalEmployees(assignmentData.total);
       } else {
+        setEmployees([]);
         setAssignedEmployees([]);
         setDebug('assignmentData.employees is not array: ' + JSON.stringify(assignmentData));
       }
@@ -127,12 +126,18 @@ function CourseEmployeeAssignment({ course, onClose }) {
       setDebug(err?.stack || String(err));
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
   useEffect(() => {
     fetchEmployees();
-  }, [course.id]);
+  }, [course.id, search]);
+
+  const handleLoadMore = () => {
+    setLoadingMore(true);
+    fetchEmployees(nextCursor);
+  };
 
   const handleAssignToggle = async (employeeId, isCurrentlyAssigned) => {
     const token = getToken();
@@ -384,7 +389,7 @@ function CourseEmployeeAssignment({ course, onClose }) {
               fontSize: '14px',
               fontWeight: '600'
             }}>
-              👥 {employees.length} Total Employees
+              👥 {totalEmployees} Total Employees
             </div>
           </div>
         </div>
@@ -416,6 +421,40 @@ function CourseEmployeeAssignment({ course, onClose }) {
           </button>
         </div>
 
+        {/* Search by username or designation (filtered on the server) */}
+        <form
+          onSubmit={e => { e.preventDefault(); setSearch(searchInput.trim()); }}
+          style={{ display: 'flex', gap: '8px', marginBottom: '18px' }}
+        >
+          <input
+            type="text"
+            value={searchInput}
+            onChange={e => setSearchInput(e.target.value)}
+            placeholder="Search by username or designation"
+            style={{
+              flex: 1,
+              padding: '10px 14px',
+              border: '1px solid #d1d5db',
+              borderRadius: '8px',
+              fontSize: '14px'
+            }}
+          />
+          <button
+            type="submit"
+            style={{
+              background: '#f3f4f6',
+              color: '#374151',
+              border: '1px solid #d1d5db',
+              borderRadius: '8px',
+              padding: '10px 18px',
+              fontWeight: '600',
+              cursor: 'pointer'
+            }}
+          >
+            🔍 Search
+          </button>
+        </form>
+
         {employees.length === 0 ? (
           <div style={{
             textAlign: 'center',
@@ -426,7 +465,7 @@ function CourseEmployeeAssignment({ course, onClose }) {
             borderRadius: '12px',
             border: '2px dashed #d1d5db'
           }}>
-            👤 No employees found in your organization
+            👤 {search ? `No employees match "${search}"` : 'No employees found in your organization'}
             {debug && (
               <details style={{ margin: '1em 0', color: '#555', background: '#f9f9f9', padding: '0.5em', borderRadius: '4px' }}>
                 <summary>Debug Info</summary>
@@ -514,6 +553,26 @@ function CourseEmployeeAssignment({ course, onClose }) {
           </div>
         )}
 
+        {nextCursor !== null && nextCursor !== undefined && (
+          <div style={{ marginTop: '20px', textAlign: 'center' }}>
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              style={{
+                background: loadingMore ? '#9ca3af' : '#f3f4f6',
+                color: '#374151',
+                border: '1px solid #d1d5db',
+                borderRadius: '8px',
+                padding: '10px 24px',
+                fontWeight: '600',
+                cursor: loadingMore ? 'not-allowed' : 'pointer'
+              }}
+            >
+              {loadingMore ? '⏳ Loading...' : `Load more (${employees.length} of ${totalEmployees})`}
+            </button>
+          </div>
+        )}
+
         <div style={{ 
           marginTop: '32px', 
           padding: '16px', 
@@ -197,7 +197,7 @@ function CourseViewer() {
     
     try {
       setLoading(true);
-      const response = await fetch(`/api/employee/my_courses?username=${userInfo.username}`);
+      const response = await fetch(`/api/employee/my_courses?username=${userInfo.username}&summary=true&cursor=${parseInt(courseId) - 1}&limit=1&expand=${courseId}`);
       const data = await response.json();
       
       if (data.success) {
@@ -51,14 +51,22 @@ function EmployeeDashboard() {
   const fetchCourses = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`/api/employee/my_courses?username=${userInfo.username}`);
-      const data = await response.json();
-      
-      if (data.success) {
-        setCourses(data.courses);
-      } else {
-        setError(data.error || 'Failed to fetch courses');
-      }
+      // Summary mode: counts only, fetched page by page
+      let allCourses = [];
+      let cursor = null;
+      do {
+        const cursorParam = cursor !== null ? `&cursor=${cursor}` : '';
+        const response = await fetch(`/api/employee/my_courses?username=${userInfo.username}&summary=true&limit=100${cursorParam}`);
+        const data = await response.json();
+        
+        if (!data.success) {
+          setError(data.error || 'Failed to fetch courses');
+          return;
+        }
+        allCourses = allCourses.concat(data.courses);
+        cursor = data.next_cursor;
+      } while (cursor !== null && cursor !== undefined);
+      setCourses(allCourses);
     } catch (err) {
       setError('Network error while fetching courses');
     } finally {
@@ -238,7 +246,7 @@ function EmployeeDashboard() {
                 gap: '12px',
                 marginBottom: '16px'
               }}>
-                {course.modules.some(m => m.contents.some(c => c.content_type === 'video')) && (
+                {course.content_counts?.video > 0 && (
                   <div title="Video content" style={{
                     display: 'flex',
                     alignItems: 'center',
@@ -254,7 +262,7 @@ function EmployeeDashboard() {
                   </div>
                 )}
                 
-                {course.modules.some(m => m.contents.some(c => c.content_type === 'pdf')) && (
+                {course.content_counts?.pdf > 0 && (
                   <div title="PDF content" style={{
                     display: 'flex',
                     alignItems: 'center',
@@ -270,7 +278,7 @@ function EmployeeDashboard() {
                   </div>
                 )}
                 
-                {course.modules.some(m => m.contents.some(c => c.content_type === 'quiz')) && (
+                {course.content_counts?.quiz > 0 && (
                   <div title="Quiz content" style={{
                     display: 'flex',
                     alignItems: 'center',